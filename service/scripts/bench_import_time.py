@@ -0,0 +1,80 @@
+"""
+Mede o tempo de inicialização de um worker: `django.setup()` + `import utils`.
+
+Compara o carregamento sob demanda atual com o carregamento antecipado
+(importando também `utils.emails` e o Pynliner, como o pacote fazia antes).
+Cada medição roda em um interpretador novo.
+
+Uso (a partir de service/):
+    python scripts/bench_import_time.py [--runs 15] [--settings armoreddjango.settings]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+import utils
+{extra}
+print((time.perf_counter() - start) * 1000)
+"""
+
+VARIANTS = {
+    "lazy": "",
+    "eager": "import utils.emails, pynliner",
+}
+
+
+def measure(extra: str, runs: int, env: dict) -> list:
+    """Executa o script `runs` vezes e retorna os tempos em ms."""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(extra=extra)],
+            capture_output=True,
+            text=True,
+            cwd=SRC_DIR,
+            env=env,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument(
+        "--settings",
+        default=os.getenv("DJANGO_SETTINGS_MODULE", "armoreddjango.settings"),
+    )
+    args = parser.parse_args()
+
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": args.settings}
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.abspath(SRC_DIR), env.get("PYTHONPATH")])
+    )
+
+    medians = {}
+    for name, extra in VARIANTS.items():
+        timings = measure(extra, args.runs, env)
+        medians[name] = statistics.median(timings)
+        print(
+            f"{name:>5}: mediana {medians[name]:7.1f} ms "
+            f"(min {min(timings):.1f}, max {max(timings):.1f}, {args.runs} execuções)"
+        )
+
+    saved = medians["eager"] - medians["lazy"]
+    print(f"Redução: {saved:.1f} ms ({saved / medians['eager']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
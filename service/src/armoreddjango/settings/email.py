@@ -2,6 +2,7 @@
 Configurações de e-mail.
 """
 
+import json
 import os
 
 # Email Configuration
@@ -15,3 +16,116 @@ EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False").lower() in ("true", "1", "ye
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@example.com")
+
+# Outbox assíncrona (send_email grava na fila e o comando email_worker envia)
+EMAIL_ASYNC_ENABLED = os.getenv("EMAIL_ASYNC_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+EMAIL_WORKER_CONCURRENCY = int(os.getenv("EMAIL_WORKER_CONCURRENCY", 4))
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 20))
+EMAIL_OUTBOX_LOCK_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_LOCK_TIMEOUT", 300))  # segundos
+
+# Pool de conexões SMTP persistentes (por processo)
+EMAIL_POOL_ENABLED = os.getenv("EMAIL_POOL_ENABLED", "True").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+EMAIL_POOL_MAX_SIZE = int(os.getenv("EMAIL_POOL_MAX_SIZE", 4))
+EMAIL_POOL_IDLE_TIMEOUT = float(os.getenv("EMAIL_POOL_IDLE_TIMEOUT", 30))  # segundos
+
+# CSS inline: "full" processa o documento inteiro; "fragments" processa o template
+# base uma única vez e depois só os fragmentos de cada email (mesmo resultado)
+EMAIL_INLINE_CSS_MODE = os.getenv("EMAIL_INLINE_CSS_MODE", "full")
+EMAIL_INLINE_CSS_CACHE_SIZE = int(os.getenv("EMAIL_INLINE_CSS_CACHE_SIZE", 256))
+
+# Envio em massa (send_bulk_notification): mensagens enviadas por lote
+EMAIL_BULK_BATCH_SIZE = int(os.getenv("EMAIL_BULK_BATCH_SIZE", 100))
+
+# Boas-vindas automáticas: perfis criados na mesma transação recebem o email
+# em um único envio em lote no commit (authentication.signals)
+EMAIL_WELCOME_ON_SIGNUP = os.getenv("EMAIL_WELCOME_ON_SIGNUP", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Pipeline de campanhas (utils.email_pipeline): processos de renderização
+# (0 = núcleos disponíveis) e tamanho da fila entre renderização e envio
+EMAIL_PIPELINE_WORKERS = int(os.getenv("EMAIL_PIPELINE_WORKERS", 0))
+EMAIL_PIPELINE_QUEUE_SIZE = int(os.getenv("EMAIL_PIPELINE_QUEUE_SIZE", 256))
+
+# Limite de envio compartilhado pelos processos do host (utils.email_ratelimit):
+# mensagens/segundo (0 = sem limite), rajada máxima e conexões SMTP simultâneas
+EMAIL_RATE_LIMIT = float(os.getenv("EMAIL_RATE_LIMIT", 0))
+EMAIL_RATE_BURST = int(os.getenv("EMAIL_RATE_BURST", 0)) or None
+EMAIL_MAX_CONNECTIONS = int(os.getenv("EMAIL_MAX_CONNECTIONS", 0))
+EMAIL_RATE_LIMIT_DIR = os.getenv("EMAIL_RATE_LIMIT_DIR", "")
+
+# Novas tentativas com backoff exponencial (utils.email_retry); esgotadas as
+# tentativas, o email vai para a dead-letter (EmailDeadLetter)
+EMAIL_RETRY_MAX_ATTEMPTS = int(os.getenv("EMAIL_RETRY_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BASE_DELAY = float(os.getenv("EMAIL_RETRY_BASE_DELAY", 30))  # segundos
+EMAIL_RETRY_MAX_DELAY = float(os.getenv("EMAIL_RETRY_MAX_DELAY", 3600))  # segundos
+# Sem a outbox (EMAIL_ASYNC_ENABLED=False), em envios em lote e com anexos as
+# novas tentativas são feitas na hora, com esperas curtas
+EMAIL_RETRY_INLINE_ATTEMPTS = int(os.getenv("EMAIL_RETRY_INLINE_ATTEMPTS", 3))
+EMAIL_RETRY_INLINE_MAX_DELAY = float(
+    os.getenv("EMAIL_RETRY_INLINE_MAX_DELAY", 2)
+)  # segundos
+
+# Deduplicação de envios com chave de idempotência (utils.email_idempotency)
+EMAIL_IDEMPOTENCY_WINDOW = int(os.getenv("EMAIL_IDEMPOTENCY_WINDOW", 600))  # segundos
+EMAIL_IDEMPOTENCY_CACHE = os.getenv("EMAIL_IDEMPOTENCY_CACHE", "default")
+
+# Digest de notificações (utils.email_digest): janela de acúmulo, quantidade e
+# prioridade (constants.EmailDigestPriority) que antecipam o envio
+EMAIL_DIGEST_ENABLED = os.getenv("EMAIL_DIGEST_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+EMAIL_DIGEST_WINDOW = int(os.getenv("EMAIL_DIGEST_WINDOW", 600))  # segundos
+EMAIL_DIGEST_MAX_ITEMS = int(os.getenv("EMAIL_DIGEST_MAX_ITEMS", 20))
+EMAIL_DIGEST_FLUSH_PRIORITY = int(os.getenv("EMAIL_DIGEST_FLUSH_PRIORITY", 3))
+
+# Templates Jinja2 dos emails (utils.email_templates): diretório do cache de
+# bytecode compartilhado pelos workers (vazio = diretório temporário do sistema)
+EMAIL_TEMPLATE_BYTECODE_DIR = os.getenv("EMAIL_TEMPLATE_BYTECODE_DIR", "")
+
+# Métricas das etapas de envio (utils.email_metrics): caminho da classe do sink
+# (ex.: "utils.email_metrics.LoggingEmailMetricsSink"); vazio = desativado
+EMAIL_METRICS_SINK = os.getenv("EMAIL_METRICS_SINK", "")
+
+# Vários servidores SMTP com failover (utils.email_backends.FailoverEmailBackend):
+# lista JSON de backends, estratégia ("failover" ou "latency"), timeout por
+# servidor e parâmetros do circuit breaker
+EMAIL_FAILOVER_BACKENDS = json.loads(os.getenv("EMAIL_FAILOVER_BACKENDS", "[]"))
+EMAIL_FAILOVER_STRATEGY = os.getenv("EMAIL_FAILOVER_STRATEGY", "failover")
+EMAIL_FAILOVER_TIMEOUT = float(os.getenv("EMAIL_FAILOVER_TIMEOUT", 10))  # segundos
+EMAIL_FAILOVER_FAILURE_THRESHOLD = int(os.getenv("EMAIL_FAILOVER_FAILURE_THRESHOLD", 3))
+EMAIL_FAILOVER_MAX_ERROR_RATE = float(os.getenv("EMAIL_FAILOVER_MAX_ERROR_RATE", 0.5))
+EMAIL_FAILOVER_COOLDOWN = float(os.getenv("EMAIL_FAILOVER_COOLDOWN", 30))  # segundos
+EMAIL_FAILOVER_EWMA_ALPHA = float(os.getenv("EMAIL_FAILOVER_EWMA_ALPHA", 0.3))
+
+# Minificação do HTML após o CSS inline (utils.email_minify) e limite de tamanho
+# do HTML em bytes (0 = sem limite; o Gmail corta mensagens acima de ~102KB).
+# Com EMAIL_HTML_BUDGET_STRICT, emails acima do limite não são enviados
+EMAIL_HTML_MINIFY = os.getenv("EMAIL_HTML_MINIFY", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+EMAIL_HTML_BYTE_BUDGET = int(os.getenv("EMAIL_HTML_BYTE_BUDGET", 102400))
+EMAIL_HTML_BUDGET_STRICT = os.getenv("EMAIL_HTML_BUDGET_STRICT", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Pré-visualização de emails (utils.email_previews, /api/email-previews):
+# cache do HTML renderizado e validade em segundos
+EMAIL_PREVIEW_CACHE = os.getenv("EMAIL_PREVIEW_CACHE", "default")
+EMAIL_PREVIEW_CACHE_TIMEOUT = int(os.getenv("EMAIL_PREVIEW_CACHE_TIMEOUT", 3600))
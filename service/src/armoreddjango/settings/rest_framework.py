@@ -2,6 +2,7 @@
 Configurações do Django REST Framework e JWT.
 """
 
+import os
 import sys
 from datetime import timedelta
 
@@ -14,10 +15,63 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.backends.CachedJWTAuthentication",
     ),
 }
 
+# Usuário autenticado por JWT em cache (authentication.backends.CachedJWTAuthentication):
+# evita o SELECT em Profile a cada requisição. Invalidado ao salvar/apagar o perfil.
+# Só é usado se AUTH_USER_CACHE for compartilhado entre os processos (Redis,
+# Memcached...); com LocMemCache o usuário vem sempre do banco (authentication.cache).
+AUTH_USER_CACHE = os.getenv("AUTH_USER_CACHE", "default")
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))  # segundos
+
+# Modo só-claims (authentication.backends.ClaimsJWTAuthentication) nas rotas de
+# leitura do perfil: request.user vem das claims do token, sem consulta ao banco.
+# A versão das permissões de cada usuário fica em cache por este tempo. Requer um
+# AUTH_USER_CACHE compartilhado: com LocMemCache ela é lida do banco a cada
+# requisição (system check authentication.W001).
+AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+AUTH_CLAIMS_VERSION_TIMEOUT = int(
+    os.getenv("AUTH_CLAIMS_VERSION_TIMEOUT", 30)
+)  # segundos
+
+# Filtro de Bloom dos jtis na blacklist (authentication.blacklist): consultas
+# negativas não vão ao banco. Reconstruído a cada REBUILD_INTERVAL segundos; as
+# linhas novas são buscadas com PULL_OVERLAP segundos de sobreposição. Requer um
+# AUTH_USER_CACHE compartilhado entre os processos (Redis, Memcached...).
+AUTH_BLACKLIST_BLOOM_ENABLED = os.getenv(
+    "AUTH_BLACKLIST_BLOOM_ENABLED", "False"
+).lower() in ("true", "1", "yes")
+AUTH_BLACKLIST_BLOOM_CAPACITY = int(os.getenv("AUTH_BLACKLIST_BLOOM_CAPACITY", 100000))
+AUTH_BLACKLIST_BLOOM_ERROR_RATE = float(
+    os.getenv("AUTH_BLACKLIST_BLOOM_ERROR_RATE", 0.001)
+)
+AUTH_BLACKLIST_BLOOM_REBUILD_INTERVAL = int(
+    os.getenv("AUTH_BLACKLIST_BLOOM_REBUILD_INTERVAL", 300)
+)  # segundos
+AUTH_BLACKLIST_BLOOM_PULL_OVERLAP = int(
+    os.getenv("AUTH_BLACKLIST_BLOOM_PULL_OVERLAP", 60)
+)  # segundos
+
+# Métricas da autenticação (utils.metrics), como `auth.blacklist_bloom.lookups`:
+# caminho da classe do sink (ex.: "utils.metrics.LoggingMetricsSink"); vazio = desativado
+AUTH_METRICS_SINK = os.getenv("AUTH_METRICS_SINK", "")
+
+# Escritas do login (OutstandingToken, last_login) gravadas em lote por uma thread
+# do processo (authentication.login_buffer), a cada INTERVAL segundos ou MAX_ENTRIES
+AUTH_LOGIN_WRITE_BUFFER = os.getenv("AUTH_LOGIN_WRITE_BUFFER", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+AUTH_LOGIN_BUFFER_INTERVAL = float(os.getenv("AUTH_LOGIN_BUFFER_INTERVAL", 0.2))
+AUTH_LOGIN_BUFFER_MAX_ENTRIES = int(os.getenv("AUTH_LOGIN_BUFFER_MAX_ENTRIES", 200))
+
 # Aplica rate limiting apenas em produção, não em testes
 if not TESTING:
     REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"] = [
@@ -34,6 +88,10 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(days=7),  # 7 Days
     "SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER": timedelta(days=7),  # 7 Days
     "SLIDING_TOKEN_LIFETIME_LATE_USER": timedelta(days=7),  # 7 Days
+    # Tokens com as claims do perfil (authentication.tokens)
+    "TOKEN_OBTAIN_SERIALIZER": "authentication.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "authentication.serializers.ClaimsTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "authentication.serializers.ClaimsTokenBlacklistSerializer",
 }
 
 # Swagger/OpenAPI Configuration
@@ -14,6 +14,7 @@ from rest_framework_simplejwt.views import (
 )
 
 from authentication.api import CreateProfileRestView, ProfileRestView
+from utils.api import EmailPreviewRestView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -57,6 +58,9 @@ if not settings.PRODUCTION:
 router = DefaultRouter(trailing_slash=False)
 router.register("api/register", CreateProfileRestView, basename="CreateProfileRestView")
 router.register("api/profile", ProfileRestView, basename="ProfileRestView")
+router.register(
+    "api/email-previews", EmailPreviewRestView, basename="EmailPreviewRestView"
+)
 
 urlpatterns += router.urls
 
@@ -1,11 +1,12 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status, viewsets
 from rest_framework.exceptions import MethodNotAllowed, NotFound, PermissionDenied
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from authentication.backends import CachedJWTAuthentication, ClaimsJWTAuthentication
 from authentication.models import Profile
 from authentication.serializers import ProfileSerializer
 
@@ -25,11 +26,17 @@ class ProfileRestView(viewsets.ModelViewSet):
     ```
     """
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = ProfileSerializer
     queryset = Profile.objects.none()
 
+    def get_authenticators(self):
+        # Leituras com AUTH_CLAIMS_ONLY: request.user vem das claims do token
+        if settings.AUTH_CLAIMS_ONLY and self.request.method in SAFE_METHODS:
+            return [ClaimsJWTAuthentication()]
+        return super().get_authenticators()
+
     def get_object(self):
         pk = self.kwargs.get("pk")
         obj = get_object_or_404(Profile, pk=pk)
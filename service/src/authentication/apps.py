@@ -6,3 +6,6 @@ class AuthenticationConfig(AppConfig):
     name = "authentication"
     icon_name = "person"
     verbose_name = "02 - Autenticação"
+
+    def ready(self):
+        from authentication import checks, signals  # noqa: F401
@@ -0,0 +1,154 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from authentication.cache import get_auth_cache, is_shared_cache
+
+CACHE_PREFIX = "auth:user:"
+
+# Campos do perfil guardados no cache; os demais são carregados sob demanda
+CACHED_USER_FIELDS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "profileType",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def _version_key(user_id) -> str:
+    return f"{CACHE_PREFIX}{user_id}:version"
+
+
+def _user_version(user_id) -> int:
+    """Versão atual do perfil no cache, criada na primeira consulta."""
+    cache = get_auth_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Valor novo (e não 1): uma versão que expirou do cache não é reaproveitada
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_cached_user(user_id):
+    """
+    Invalida o usuário em cache trocando a versão do perfil.
+
+    As entradas antigas ficam órfãs e expiram pelo TTL; uma requisição que leu
+    o banco antes da alteração grava na versão antiga e não é mais usada.
+
+    Args:
+        user_id: Valor de USER_ID_FIELD do usuário (por padrão, o id)
+    """
+    cache = get_auth_cache()
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Autenticação JWT que busca o usuário no cache antes do banco.
+
+    O `JWTAuthentication` do simplejwt faz um SELECT em Profile a cada
+    requisição só para montar o `request.user`. Aqui os campos de
+    CACHED_USER_FIELDS (e o hash MD5 da senha, para CHECK_REVOKE_TOKEN, nunca
+    a senha) ficam no cache AUTH_USER_CACHE por AUTH_USER_CACHE_TIMEOUT
+    segundos, indexados pelo id e pela versão do perfil; `post_save`/
+    `post_delete` em Profile trocam a versão (`authentication.signals`). O
+    `request.user` é um Profile com só esses campos carregados: os demais são
+    lidos do banco no primeiro acesso. As verificações de usuário ativo e de
+    senha alterada (CHECK_USER_IS_ACTIVE, CHECK_REVOKE_TOKEN) continuam sendo
+    feitas em toda requisição.
+
+    Só usa o cache se AUTH_USER_CACHE for compartilhado entre os processos
+    (`authentication.cache`): com um cache por processo, a invalidação não
+    chegaria aos outros workers e a autenticação é a do simplejwt.
+    """
+
+    def get_user(self, validated_token):
+        if not is_shared_cache():
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        entry = self.get_cached_entry(user_id)
+        if entry is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        user = _user_from_entry(entry)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if (
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+                != entry["password_hash"]
+            ):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def get_cached_entry(self, user_id):
+        """
+        Retorna os campos do usuário do cache ou, se ausentes, do banco.
+
+        Returns:
+            dict: "fields" (CACHED_USER_FIELDS e a pk) e "password_hash", ou
+            None se o usuário não existe
+        """
+        cache = get_auth_cache()
+        key = f"{CACHE_PREFIX}{user_id}:v{_user_version(user_id)}"
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+
+        fields = _cached_field_names()
+        row = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*fields, "password")
+            .first()
+        )
+        if row is None:
+            return None
+
+        entry = {
+            "fields": {name: row[name] for name in fields},
+            "password_hash": get_md5_hash_password(row["password"]),
+        }
+        cache.set(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        return entry
+
+
+def _cached_field_names() -> list:
+    # Na ordem dos campos do model, como `Model.from_db` espera
+    opts = get_user_model()._meta
+    wanted = {opts.pk.attname, api_settings.USER_ID_FIELD, *CACHED_USER_FIELDS}
+    return [f.attname for f in opts.concrete_fields if f.attname in wanted]
+
+
+def _user_from_entry(entry):
+    user_model = get_user_model()
+    fields = entry["fields"]
+    return user_model.from_db(
+        user_model.objects.db, list(fields), list(fields.values())
+    )
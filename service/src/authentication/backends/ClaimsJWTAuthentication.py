@@ -0,0 +1,53 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.backends.CachedJWTAuthentication import CachedJWTAuthentication
+from authentication.tokens import (
+    PERMISSIONS_VERSION_CLAIM,
+    PROFILE_CLAIMS,
+    ClaimsProfile,
+    get_permissions_version,
+)
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """Autenticação JWT sem consulta ao banco, usando só as claims do token.
+
+    O `request.user` é um `ClaimsProfile` montado a partir das claims
+    (`authentication.tokens`); o Profile completo só é carregado se a rota
+    acessar algo fora do token. A cada requisição a claim
+    `permissions_version` é comparada com a versão atual do usuário (em
+    cache compartilhado por AUTH_CLAIMS_VERSION_TIMEOUT segundos): se grupos,
+    `is_superuser`, `is_active` ou a senha mudaram, o token é recusado e o
+    cliente precisa fazer o refresh. Se a versão não puder ser conferida (cache ou
+    banco indisponível), o token também é recusado. Tokens sem as claims
+    (emitidos antes delas) seguem o caminho de `CachedJWTAuthentication`.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in PROFILE_CLAIMS.values()):
+            return super().get_user(validated_token)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        try:
+            version = get_permissions_version(user_id)
+        except Exception as e:
+            print(f"Erro ao conferir a versão das permissões do token: {e}")
+            raise AuthenticationFailed(
+                _("Token claims could not be verified."),
+                code="claims_unverifiable",
+            ) from e
+        if version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if validated_token[PERMISSIONS_VERSION_CLAIM] != version:
+            raise AuthenticationFailed(
+                _("Token claims are outdated, refresh the token."),
+                code="claims_outdated",
+            )
+
+        return ClaimsProfile(validated_token)
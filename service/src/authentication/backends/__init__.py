@@ -0,0 +1,7 @@
+from authentication.backends.CachedJWTAuthentication import (  # noqa: F401
+    CachedJWTAuthentication,
+    invalidate_cached_user,
+)
+from authentication.backends.ClaimsJWTAuthentication import (  # noqa: F401
+    ClaimsJWTAuthentication,
+)
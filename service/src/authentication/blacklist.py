@@ -0,0 +1,266 @@
+"""
+Filtro de Bloom na frente da blacklist de tokens do simplejwt.
+
+Com `rest_framework_simplejwt.token_blacklist`, todo refresh (e todo logout)
+consulta `BlacklistedToken` pelo jti, e quase nenhum token está na
+blacklist. Aqui cada processo mantém um filtro de Bloom com os jtis da
+blacklist: se o jti não está no filtro, o token com certeza não está na
+blacklist e a consulta ao banco é pulada; se está, a consulta é feita
+normalmente (o filtro pode dar falso positivo, nunca falso negativo).
+
+Atualização do filtro:
+
+- reconstruído a cada AUTH_BLACKLIST_BLOOM_REBUILD_INTERVAL segundos, só
+  com os tokens ainda não expirados;
+- tokens colocados na blacklist neste processo (`/api/logout/`, refresh com
+  BLACKLIST_AFTER_ROTATION, admin) entram na hora, pelo `post_save` de
+  `BlacklistedToken`, que também troca uma geração no cache AUTH_USER_CACHE;
+- os outros processos veem a geração nova na próxima consulta e buscam as
+  linhas com `blacklisted_at` a partir da mais recente já lida, menos
+  AUTH_BLACKLIST_BLOOM_PULL_OVERLAP segundos: linhas gravadas com atraso
+  (commit fora de ordem, relógios diferentes) ainda são encontradas;
+- se a atualização falhar, a consulta vai ao banco.
+
+A geração só chega aos outros processos por um cache compartilhado: com
+AUTH_USER_CACHE por processo (LocMemCache), o filtro não é usado e a
+blacklist é sempre consultada no banco (`authentication.checks` acusa a
+configuração). Por isso AUTH_BLACKLIST_BLOOM_ENABLED é desligado por padrão.
+
+Métricas: `token_blacklist_filter_stats()` retorna os contadores do processo
+e, com AUTH_METRICS_SINK (`utils.metrics`), cada consulta vai para o contador
+`auth.blacklist_bloom.lookups` (tag `result`: negative, positive ou
+false_positive).
+"""
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.cache import get_auth_cache, is_shared_cache
+from utils.metrics import get_metrics
+
+LOOKUPS_METRIC = "auth.blacklist_bloom.lookups"
+GENERATION_KEY = "auth:token-blacklist:generation"
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de strings, em um bytearray.
+
+    Args:
+        capacity (int): Quantidade de itens esperada
+        error_rate (float): Taxa de falsos positivos com `capacity` itens
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(
+            64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenBlacklistFilter:
+    """Filtro de Bloom dos jtis na blacklist, um por processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Descarta o filtro (reconstruído na próxima consulta) e os contadores."""
+        self._bloom = None
+        self._built_at = 0.0
+        # blacklisted_at da linha mais recente lida e ids lidos na sobreposição
+        self._watermark = None
+        self._recent = {}
+        self._generation = None
+        self.negatives = 0
+        self.positives = 0
+        self.false_positives = 0
+
+    def might_contain(self, jti: str) -> bool:
+        """False se o jti com certeza não está na blacklist."""
+        try:
+            self._sync()
+        except Exception as e:
+            print(f"Erro ao atualizar o filtro da blacklist de tokens: {e}")
+            return True
+        return jti in self._bloom
+
+    def add(self, jti: str):
+        """Adiciona um jti recém-colocado na blacklist."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def record(self, result: str):
+        """Conta o resultado de uma consulta (negative, positive ou false_positive)."""
+        with self._lock:
+            if result == "negative":
+                self.negatives += 1
+            elif result == "positive":
+                self.positives += 1
+            else:
+                self.false_positives += 1
+
+        metrics = get_metrics("AUTH_METRICS_SINK")
+        if metrics.enabled:
+            metrics.increment(LOOKUPS_METRIC, tags={"result": result})
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.negatives + self.positives + self.false_positives
+            return {
+                "negatives": self.negatives,
+                "positives": self.positives,
+                "false_positives": self.false_positives,
+                # Fração das consultas resolvidas sem ir ao banco
+                "hit_rate": round(self.negatives / lookups, 4) if lookups else 0.0,
+                "size": self._bloom.count if self._bloom is not None else 0,
+            }
+
+    def _sync(self):
+        # Lida antes da reconstrução: uma blacklist concorrente força nova leitura
+        generation = get_auth_cache().get(GENERATION_KEY)
+        with self._lock:
+            expired = (
+                time.monotonic() - self._built_at
+                >= settings.AUTH_BLACKLIST_BLOOM_REBUILD_INTERVAL
+            )
+            if self._bloom is None or expired:
+                self._rebuild()
+            elif generation == self._generation:
+                return
+            else:
+                self._pull_new()
+            self._generation = generation
+
+    def _rebuild(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        rows = list(
+            BlacklistedToken.objects.filter(
+                token__expires_at__gt=timezone.now()
+            ).values_list("id", "token__jti", "blacklisted_at")
+        )
+        bloom = BloomFilter(
+            max(settings.AUTH_BLACKLIST_BLOOM_CAPACITY, 2 * len(rows)),
+            settings.AUTH_BLACKLIST_BLOOM_ERROR_RATE,
+        )
+        self._bloom = bloom
+        self._recent = {}
+        self._add_rows(rows)
+        self._built_at = time.monotonic()
+
+    def _pull_new(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        rows = BlacklistedToken.objects.all()
+        if self._watermark is not None:
+            rows = rows.filter(blacklisted_at__gte=self._watermark - self._overlap())
+        self._add_rows(rows.values_list("id", "token__jti", "blacklisted_at"))
+
+    def _add_rows(self, rows):
+        for row_id, jti, blacklisted_at in rows:
+            if row_id in self._recent:
+                continue
+            self._bloom.add(jti)
+            self._recent[row_id] = blacklisted_at
+            if self._watermark is None or blacklisted_at > self._watermark:
+                self._watermark = blacklisted_at
+
+        # Só os ids ainda dentro da sobreposição evitam contar a linha duas vezes
+        if self._watermark is not None:
+            cutoff = self._watermark - self._overlap()
+            self._recent = {
+                row_id: blacklisted_at
+                for row_id, blacklisted_at in self._recent.items()
+                if blacklisted_at >= cutoff
+            }
+
+    @staticmethod
+    def _overlap() -> timedelta:
+        return timedelta(seconds=settings.AUTH_BLACKLIST_BLOOM_PULL_OVERLAP)
+
+
+token_blacklist_filter = TokenBlacklistFilter()
+
+
+def token_blacklist_filter_stats() -> dict:
+    """
+    Retorna os contadores do filtro de Bloom deste processo.
+
+    Example:
+        >>> token_blacklist_filter_stats()
+        {"negatives": 9812, "positives": 3, "false_positives": 9,
+         "hit_rate": 0.9988, "size": 1204}
+    """
+    return token_blacklist_filter.stats()
+
+
+def notify_token_blacklisted(jti: str, using: str = None):
+    """Adiciona o jti ao filtro deste processo e avisa os outros pelo cache."""
+    token_blacklist_filter.add(jti)
+
+    def bump_generation():
+        get_auth_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+    bump_generation()
+    # De novo no commit: antes dele os outros processos não veem a linha nova
+    transaction.on_commit(bump_generation, using=using)
+
+
+class BloomBlacklistMixin:
+    """Mixin de token que consulta o filtro de Bloom antes da blacklist no banco.
+
+    Só usa o filtro com AUTH_BLACKLIST_BLOOM_ENABLED e um AUTH_USER_CACHE
+    compartilhado entre os processos; caso contrário, a consulta vai direto
+    ao banco, como no simplejwt.
+    """
+
+    def check_blacklist(self):
+        if not settings.AUTH_BLACKLIST_BLOOM_ENABLED or not is_shared_cache():
+            return super().check_blacklist()
+
+        if not token_blacklist_filter.might_contain(
+            self.payload[api_settings.JTI_CLAIM]
+        ):
+            token_blacklist_filter.record("negative")
+            return
+
+        try:
+            super().check_blacklist()
+        except TokenError:
+            token_blacklist_filter.record("positive")
+            raise
+        token_blacklist_filter.record("false_positive")
@@ -0,0 +1,40 @@
+"""
+Cache da autenticação JWT (AUTH_USER_CACHE).
+
+O usuário em cache (`CachedJWTAuthentication`), a versão das permissões
+(`authentication.tokens`) e a geração do filtro da blacklist
+(`authentication.blacklist`) são invalidados por signals, que só alcançam o
+cache do processo que fez a alteração. Com um cache por processo
+(LocMemCache, o padrão em `settings/cache.py`), os outros workers
+continuariam usando os valores antigos; por isso esses caches só são usados
+quando AUTH_USER_CACHE aponta para um backend compartilhado (Redis,
+Memcached, banco de dados, ...).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Backends em que cada processo tem o seu próprio cache
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get_auth_cache():
+    """Retorna o cache AUTH_USER_CACHE."""
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def is_shared_cache(alias: str = None) -> bool:
+    """
+    Indica se o cache é compartilhado entre os processos.
+
+    Args:
+        alias (str, optional): Alias em CACHES. Se None, usa AUTH_USER_CACHE
+
+    Returns:
+        bool: False para LocMemCache e DummyCache
+    """
+    backend = settings.CACHES[alias or settings.AUTH_USER_CACHE]["BACKEND"]
+    return backend not in PROCESS_LOCAL_CACHE_BACKENDS
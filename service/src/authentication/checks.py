@@ -0,0 +1,46 @@
+"""
+System checks do app de autenticação (`python manage.py check`).
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from authentication.cache import is_shared_cache
+
+
+@register(Tags.security, Tags.caches)
+def check_blacklist_bloom_cache(app_configs, **kwargs):
+    """O filtro de Bloom da blacklist precisa de um AUTH_USER_CACHE compartilhado."""
+    if settings.AUTH_BLACKLIST_BLOOM_ENABLED and not is_shared_cache():
+        return [
+            Error(
+                "AUTH_BLACKLIST_BLOOM_ENABLED requer um AUTH_USER_CACHE "
+                "compartilhado entre os processos.",
+                hint=(
+                    f"O cache '{settings.AUTH_USER_CACHE}' é por processo: um "
+                    "logout em um worker não chegaria ao filtro dos outros. "
+                    "Use Redis, Memcached ou o cache em banco de dados."
+                ),
+                id="authentication.E001",
+            )
+        ]
+    return []
+
+
+@register(Tags.caches)
+def check_claims_version_cache(app_configs, **kwargs):
+    """O modo só-claims só evita o banco com um AUTH_USER_CACHE compartilhado."""
+    if settings.AUTH_CLAIMS_ONLY and not is_shared_cache():
+        return [
+            Warning(
+                "AUTH_CLAIMS_ONLY com um AUTH_USER_CACHE por processo consulta "
+                "a versão das permissões no banco a cada requisição.",
+                hint=(
+                    f"O cache '{settings.AUTH_USER_CACHE}' é por processo e não "
+                    "recebe as invalidações dos outros workers. Use Redis, "
+                    "Memcached ou o cache em banco de dados."
+                ),
+                id="authentication.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,132 @@
+"""
+Escritas do login (OutstandingToken e last_login) em lote, fora da requisição.
+
+Cada `POST /api/login/` faz, além da verificação da senha, um INSERT em
+`OutstandingToken` (e um UPDATE de `last_login` com UPDATE_LAST_LOGIN). Em
+picos de login (ex.: após um deploy que derruba as sessões) essas escritas
+disputam o banco. Com AUTH_LOGIN_WRITE_BUFFER, o login só enfileira as
+escritas em memória e uma thread do processo as grava em lote
+(`bulk_create`/`bulk_update`) a cada AUTH_LOGIN_BUFFER_INTERVAL segundos ou
+quando AUTH_LOGIN_BUFFER_MAX_ENTRIES escritas se acumulam.
+
+Limitações (o motivo de ser opcional):
+
+- se o processo morrer antes da gravação (ou a gravação do lote falhar), os
+  registros do lote se perdem. O token continua válido e o logout funciona, porque
+  `blacklist()` cria o OutstandingToken que faltar;
+- até a gravação, o token não aparece na lista de tokens do usuário, e o
+  `last_login` fica atrasado no máximo um intervalo.
+"""
+
+import atexit
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from authentication.backends import invalidate_cached_user
+
+
+class LoginWriteBuffer:
+    """Fila por processo das escritas do login, gravadas em lote por uma thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._tokens = []
+        self._last_logins = {}
+
+    def add_outstanding_token(self, token, user):
+        """Enfileira o OutstandingToken de um refresh token recém-emitido."""
+        self._add(
+            tokens=[
+                OutstandingToken(
+                    user=user,
+                    jti=token[api_settings.JTI_CLAIM],
+                    token=str(token),
+                    created_at=token.current_time,
+                    expires_at=datetime_from_epoch(token["exp"]),
+                )
+            ]
+        )
+
+    def add_last_login(self, user):
+        """Atualiza `user.last_login` em memória e enfileira a gravação."""
+        user.last_login = timezone.now()
+        self._add(last_logins={user.pk: user.last_login})
+
+    def _add(self, tokens=(), last_logins=None):
+        with self._lock:
+            self._tokens.extend(tokens)
+            self._last_logins.update(last_logins or {})
+            pending = len(self._tokens) + len(self._last_logins)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="login-write-buffer", daemon=True
+                )
+                self._thread.start()
+        if pending >= settings.AUTH_LOGIN_BUFFER_MAX_ENTRIES:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._tokens) + len(self._last_logins)
+
+    def flush(self) -> dict:
+        """
+        Grava as escritas pendentes.
+
+        Returns:
+            dict: "tokens" e "last_logins" gravados
+        """
+        with self._lock:
+            tokens, self._tokens = self._tokens, []
+            last_logins, self._last_logins = self._last_logins, {}
+
+        if tokens:
+            # O logout pode ter criado o OutstandingToken antes (mesmo jti)
+            OutstandingToken.objects.bulk_create(tokens, ignore_conflicts=True)
+
+        if last_logins:
+            user_model = get_user_model()
+            user_model.objects.bulk_update(
+                [
+                    user_model(pk=pk, last_login=last_login)
+                    for pk, last_login in last_logins.items()
+                ],
+                ["last_login"],
+            )
+            # bulk_update não dispara post_save: invalida o usuário em cache aqui
+            for pk in last_logins:
+                invalidate_cached_user(pk)
+
+        return {"tokens": len(tokens), "last_logins": len(last_logins)}
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.AUTH_LOGIN_BUFFER_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Erro ao gravar as escritas do login em lote: {e}")
+            finally:
+                close_old_connections()
+
+
+login_write_buffer = LoginWriteBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    if login_write_buffer.pending():
+        try:
+            login_write_buffer.flush()
+        except Exception as e:
+            print(f"Erro ao gravar as escritas do login em lote: {e}")
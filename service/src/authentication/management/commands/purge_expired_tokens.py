@@ -0,0 +1,85 @@
+"""
+Comando Django que apaga os tokens JWT expirados em lotes pequenos.
+
+Alternativa ao `flushexpiredtokens` do simplejwt (um único DELETE que trava a
+tabela): pode rodar continuamente ao lado do tráfego normal.
+
+Uso:
+    python manage.py purge_expired_tokens
+    python manage.py purge_expired_tokens --batch-size=500 --pause=1
+    python manage.py purge_expired_tokens --loop --interval=3600
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from authentication.token_purge import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Apaga os tokens JWT expirados (outstanding e blacklist) em lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tokens apagados por lote (padrão: 1000)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.5,
+            help="Segundos de pausa entre os lotes (padrão: 0.5)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Continua executando, com uma limpeza a cada --interval segundos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=3600.0,
+            help="Segundos entre limpezas no modo --loop (padrão: 3600)",
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        if options["loop"]:
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+        outstanding = blacklisted = 0
+        try:
+            while True:
+                if options["loop"]:
+                    close_old_connections()
+                summary = purge_expired_tokens(
+                    batch_size=options["batch_size"],
+                    pause=options["pause"],
+                    stop_event=stop_event,
+                    progress=self.report_progress,
+                )
+                outstanding += summary["outstanding"]
+                blacklisted += summary["blacklisted"]
+
+                if not options["loop"] or stop_event.wait(options["interval"]):
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Tokens expirados apagados: {outstanding} "
+                f"| Na blacklist: {blacklisted}"
+            )
+        )
+
+    def report_progress(self, summary):
+        self.stdout.write(
+            f"Lote {summary['batches']}: {summary['outstanding']} tokens apagados "
+            f"({summary['blacklisted']} na blacklist) em {summary['duration']:.1f}s"
+        )
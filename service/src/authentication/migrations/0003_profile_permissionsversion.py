@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_alter_historicalprofile_email_alter_profile_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="historicalprofile",
+            name="permissionsVersion",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Versão das Permissões"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="permissionsVersion",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Versão das Permissões"
+            ),
+        ),
+    ]
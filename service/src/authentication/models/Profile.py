@@ -25,6 +25,9 @@ class Profile(AbstractUser):
         [contants.ProfileType](../../utils/constants.md#service.src.utils.constants.ProfileType).
         - groups (Group): Grupos de permissões aos quais este usuário pertence.
         - user_permissions (Permission): Permissões específicas para este usuário
+        - permissionsVersion (int): Versão das claims do token de acesso; muda
+        quando grupos, `is_superuser` ou outro campo presente no token mudam,
+        invalidando os tokens emitidos antes (ver `authentication.tokens`).
     """
 
     history = HistoricalRecords()
@@ -37,6 +40,10 @@ class Profile(AbstractUser):
         default=ProfileType.EARUSER,
     )
 
+    permissionsVersion = models.PositiveIntegerField(
+        "Versão das Permissões", default=0, editable=False
+    )
+
     groups = models.ManyToManyField(
         Group,
         verbose_name="Grupos de Permissões",
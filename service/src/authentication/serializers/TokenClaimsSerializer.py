@@ -0,0 +1,50 @@
+from django.conf import settings
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenObtainSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.login_buffer import login_write_buffer
+from authentication.tokens import ClaimsRefreshToken
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login (`/api/login/`) com as claims do perfil nos tokens emitidos.
+
+    Claims: `username`, `profileType`, `is_superuser` e `permissions_version`
+    (ver `authentication.tokens`). Com AUTH_LOGIN_WRITE_BUFFER, o
+    OutstandingToken e o `last_login` são gravados em lote
+    (`authentication.login_buffer`).
+    """
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        if not settings.AUTH_LOGIN_WRITE_BUFFER:
+            return super().validate(attrs)
+
+        # Mesmo fluxo do TokenObtainPairSerializer, com o last_login em lote
+        data = TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(refresh.access_token)
+
+        if api_settings.UPDATE_LAST_LOGIN:
+            login_write_buffer.add_last_login(self.user)
+
+        return data
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh (`/api/login/refresh/`) que relê as claims do perfil no banco."""
+
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """Logout (`/api/logout/`) com a blacklist consultada pelo filtro de Bloom."""
+
+    token_class = ClaimsRefreshToken
@@ -1 +1,6 @@
 from authentication.serializers.ProfileSerializer import ProfileSerializer  # noqa: F401
+from authentication.serializers.TokenClaimsSerializer import (  # noqa: F401
+    ClaimsTokenBlacklistSerializer,
+    ClaimsTokenObtainPairSerializer,
+    ClaimsTokenRefreshSerializer,
+)
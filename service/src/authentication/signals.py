@@ -0,0 +1,222 @@
+"""
+Signals de Profile: email de boas-vindas em lote, invalidação do cache de
+usuários da autenticação JWT (`CachedJWTAuthentication`) e versão das
+permissões usada para revogar as claims dos tokens (`authentication.tokens`).
+Também mantém o filtro de Bloom da blacklist de tokens (`authentication.blacklist`).
+
+Com EMAIL_WELCOME_ON_SIGNUP, cada Profile criado entra em um lote da
+transação atual; no commit, o lote inteiro é enviado de uma vez por
+`send_bulk_welcome_email` (HTML preparado uma vez, mensagens em lotes pela
+mesma conexão SMTP). Uma importação de milhares de perfis dentro de
+`transaction.atomic()` gera um único envio em lote, e não N envios na hora.
+Se a transação for desfeita, nada é enviado.
+
+`bulk_create` não dispara `post_save`: nesse caso, chame
+`queue_welcome_emails(perfis)` dentro da mesma transação.
+
+Example:
+    >>> with transaction.atomic():
+    ...     for row in planilha:
+    ...         Profile.objects.create_user(**row)
+    # no commit: um único send_bulk_welcome_email com todos os perfis
+"""
+
+import threading
+import weakref
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from authentication.backends import invalidate_cached_user
+from authentication.blacklist import notify_token_blacklisted
+from authentication.models import Groups, Profile
+from authentication.tokens import (
+    VERSION_FIELDS,
+    bump_permissions_version,
+    forget_permissions_version,
+)
+
+# Lote pendente por banco de dados, por thread (as conexões também são por thread)
+_local = threading.local()
+
+
+class WelcomeEmailBatch:
+    """
+    IDs dos perfis criados em uma transação, enviados juntos no commit.
+
+    O envio é registrado no `on_commit` por um `_WelcomeEmailHook`, e o lote
+    guarda só uma referência fraca a ele: se a transação (ou o savepoint em
+    que o lote foi criado) for desfeita, o Django descarta o callback, a
+    referência morre e o próximo perfil inicia um lote novo.
+
+    Args:
+        using (str): Alias do banco de dados da transação
+    """
+
+    def __init__(self, using: str):
+        self.using = using
+        self.profile_ids = []
+        self._hook = None
+
+    def schedule(self):
+        """Registra o envio do lote no commit da transação atual."""
+        hook = _WelcomeEmailHook(self)
+        self._hook = weakref.ref(hook)
+        transaction.on_commit(hook, using=self.using)
+
+    def is_pending(self) -> bool:
+        """Se o envio ainda está agendado (não foi feito nem descartado)."""
+        return self._hook is not None and self._hook() is not None
+
+    def send(self) -> dict:
+        from utils.emails import send_bulk_welcome_email
+
+        self._hook = None
+        pending = getattr(_local, "batches", {})
+        if pending.get(self.using) is self:
+            del pending[self.using]
+
+        # Perfis criados em savepoints desfeitos não existem mais e são ignorados
+        return send_bulk_welcome_email(self.profile_ids)
+
+
+class _WelcomeEmailHook:
+    """Callback do `on_commit`; só existe enquanto o Django o mantém registrado."""
+
+    def __init__(self, batch: WelcomeEmailBatch):
+        self.batch = batch
+
+    def __call__(self):
+        return self.batch.send()
+
+
+def queue_welcome_emails(profiles, using: str = None):
+    """
+    Agenda o email de boas-vindas dos perfis para o commit da transação atual.
+
+    Fora de uma transação (autocommit), o envio acontece na hora.
+
+    Args:
+        profiles: Perfis (ou IDs) recém-criados
+        using (str, optional): Alias do banco de dados. Se None, usa o padrão
+    """
+    using = using or DEFAULT_DB_ALIAS
+    profile_ids = [getattr(profile, "pk", profile) for profile in profiles]
+    if not profile_ids:
+        return
+
+    pending = _local.__dict__.setdefault("batches", {})
+    batch = pending.get(using)
+    if batch is not None and batch.is_pending():
+        batch.profile_ids.extend(profile_ids)
+        return
+
+    batch = pending[using] = WelcomeEmailBatch(using)
+    batch.profile_ids.extend(profile_ids)
+    batch.schedule()
+
+
+@receiver(post_save, sender=Profile)
+def queue_welcome_email_on_signup(
+    sender, instance, created, raw=False, using=None, **kwargs
+):
+    if created and not raw and settings.EMAIL_WELCOME_ON_SIGNUP:
+        queue_welcome_emails([instance], using=using)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile(sender, instance, using=None, **kwargs):
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    invalidate_cached_user(user_id)
+    # De novo no commit: uma requisição concorrente pode ter lido (e guardado
+    # no cache) a linha antiga enquanto a transação ainda estava aberta
+    transaction.on_commit(lambda: invalidate_cached_user(user_id), using=using)
+
+
+@receiver(pre_save, sender=Profile)
+def bump_permissions_version_on_change(
+    sender, instance, raw=False, using=None, update_fields=None, **kwargs
+):
+    """Incrementa a versão das permissões se a senha ou um campo do token mudou.
+
+    A versão é sempre a do banco (grupos alterados a incrementam direto na
+    tabela), então um `save()` com a instância antiga não a faz voltar.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(VERSION_FIELDS):
+        return
+
+    current = (
+        Profile.objects.using(using)
+        .filter(pk=instance.pk)
+        .values("permissionsVersion", *VERSION_FIELDS)
+        .first()
+    )
+    if current is None:
+        return
+
+    instance.permissionsVersion = current["permissionsVersion"]
+    if any(current[field] != getattr(instance, field) for field in VERSION_FIELDS):
+        instance.permissionsVersion += 1
+        if update_fields is not None and "permissionsVersion" not in update_fields:
+            # save(update_fields=...) não grava o campo: grava aqui
+            Profile.objects.using(using).filter(pk=instance.pk).update(
+                permissionsVersion=instance.permissionsVersion
+            )
+        forget_permissions_version([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Profile)
+def forget_permissions_version_on_delete(sender, instance, using=None, **kwargs):
+    forget_permissions_version([instance.pk], using=using)
+
+
+@receiver(m2m_changed, sender=Profile.groups.through)
+def bump_permissions_version_on_groups_change(
+    sender, instance, action, reverse, pk_set, using=None, **kwargs
+):
+    # reverse=True: alteração feita pelo grupo (group.usuario_set.add(...))
+    if action == "pre_clear" and reverse:
+        instance._cleared_profile_ids = list(
+            instance.usuario_set.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action != "post_clear" and not pk_set:
+        return
+
+    if not reverse:
+        profile_ids = [instance.pk]
+    elif action == "post_clear":
+        profile_ids = instance.__dict__.pop("_cleared_profile_ids", [])
+    else:
+        profile_ids = pk_set
+    bump_permissions_version(profile_ids, using=using)
+
+
+@receiver(pre_delete, sender=Group)
+@receiver(pre_delete, sender=Groups)
+def bump_permissions_version_on_group_delete(sender, instance, using=None, **kwargs):
+    bump_permissions_version(
+        instance.usuario_set.values_list("pk", flat=True), using=using
+    )
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_blacklisted_token_to_filter(sender, instance, created, using=None, **kwargs):
+    if created:
+        notify_token_blacklisted(instance.token.jti, using=using)
@@ -0,0 +1,124 @@
+"""
+Testes para a autenticação JWT com usuário em cache.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.backends import CachedJWTAuthentication
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings, tmp_path):
+    """Cache compartilhado entre processos (em arquivos), como Redis em produção."""
+    settings.CACHES = {
+        **settings.CACHES,
+        "auth": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "auth-cache"),
+        },
+    }
+    settings.AUTH_USER_CACHE = "auth"
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="joao",
+        email="joao@example.com",
+        password="SenhaForte123!",
+        first_name="João",
+        last_name="Pereira",
+    )
+
+
+def authenticate(user):
+    token = AccessToken.for_user(user)
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+def profile_queries(queries):
+    return [q for q in queries if 'FROM "authentication_profile"' in q["sql"]]
+
+
+class TestCachedJWTAuthentication:
+    """Testes para CachedJWTAuthentication."""
+
+    def test_second_request_skips_profile_query(self, user):
+        """Testa que o usuário vem do cache a partir da segunda requisição."""
+        with CaptureQueriesContext(connection) as first:
+            assert authenticate(user).pk == user.pk
+        with CaptureQueriesContext(connection) as second:
+            cached = authenticate(user)
+
+        assert len(profile_queries(first.captured_queries)) == 1
+        assert profile_queries(second.captured_queries) == []
+        assert cached.pk == user.pk
+        assert cached.get_full_name() == "João Pereira"
+
+    def test_cache_keeps_only_needed_fields(self, user):
+        """Testa que o cache guarda só alguns campos e o hash da senha, não o Profile."""
+        authenticate(user)
+
+        entry = CachedJWTAuthentication().get_cached_entry(user.pk)
+        assert set(entry) == {"fields", "password_hash"}
+        assert "password" not in entry["fields"]
+        assert user.password not in str(entry)
+        assert entry["fields"]["username"] == "joao"
+
+        cached = authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            assert cached.date_joined == user.date_joined
+        assert len(profile_queries(queries.captured_queries)) == 1
+
+    def test_save_invalidates_cache(self, user):
+        """Testa que salvar o perfil descarta o usuário em cache."""
+        authenticate(user)
+        user.first_name = "Joana"
+        user.save()
+
+        assert authenticate(user).first_name == "Joana"
+
+        user.is_active = False
+        user.save()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(user)
+
+    def test_delete_invalidates_cache(self, user):
+        """Testa que apagar o perfil faz o token deixar de autenticar."""
+        token_user = get_user_model()(pk=user.pk)
+        authenticate(user)
+        user.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(token_user)
+
+    def test_profile_endpoint(self, user):
+        """Testa o endpoint de perfil com uma query a menos na segunda chamada."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        with CaptureQueriesContext(connection) as first:
+            assert client.get("/api/profile").status_code == 200
+        with CaptureQueriesContext(connection) as second:
+            response = client.get("/api/profile")
+
+        assert response.json()["username"] == "joao"
+        assert len(second.captured_queries) == len(first.captured_queries) - 1
+
+
+def test_process_local_cache_is_not_used(user, settings):
+    """Testa que, com um cache por processo (LocMemCache), o usuário vem sempre do banco."""
+    settings.AUTH_USER_CACHE = "default"
+    authenticate(user)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert authenticate(user).pk == user.pk
+
+    assert len(profile_queries(queries.captured_queries)) == 1
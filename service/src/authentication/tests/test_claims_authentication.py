@@ -0,0 +1,295 @@
+"""
+Testes para a autenticação só com as claims do token.
+"""
+
+import importlib
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.backends import ClaimsJWTAuthentication
+from authentication.checks import check_claims_version_cache
+from authentication.tokens import (
+    ClaimsProfile,
+    ClaimsRefreshToken,
+    bump_permissions_version,
+)
+
+
+@pytest.fixture(autouse=True)
+def _claims_settings(settings, tmp_path):
+    settings.AUTH_CLAIMS_ONLY = True
+    # Cache compartilhado entre processos (em arquivos), como Redis em produção
+    settings.CACHES = {
+        **settings.CACHES,
+        "auth": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "auth-cache"),
+        },
+    }
+    settings.AUTH_USER_CACHE = "auth"
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="joao",
+        email="joao@example.com",
+        password="SenhaForte123!",
+        first_name="João",
+        last_name="Pereira",
+    )
+
+
+def login(user):
+    response = APIClient().post(
+        "/api/login/",
+        {"username": user.username, "password": "SenhaForte123!"},
+        format="json",
+    )
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def authenticate(access):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+    return ClaimsJWTAuthentication().authenticate(request)[0]
+
+
+def profile_queries(queries):
+    return [q for q in queries if 'FROM "authentication_profile"' in q["sql"]]
+
+
+class TestClaimsTokens:
+    """Testes para as claims emitidas no login e no refresh."""
+
+    def test_login_adds_profile_claims(self, user):
+        """Testa que o access token do login leva as claims do perfil."""
+        token = AccessToken(login(user)["access"])
+
+        assert token["username"] == "joao"
+        assert token["profileType"] == user.profileType
+        assert token["is_superuser"] is False
+        assert token["is_active"] is True
+        assert token["permissions_version"] == 0
+
+    def test_refresh_reads_current_claims(self, user):
+        """Testa que o refresh emite claims atualizadas."""
+        refresh = login(user)["refresh"]
+        user.is_superuser = True
+        user.save()
+
+        response = APIClient().post(
+            "/api/login/refresh/", {"refresh": refresh}, format="json"
+        )
+        token = AccessToken(response.json()["access"])
+
+        assert token["is_superuser"] is True
+        assert token["permissions_version"] == 1
+
+
+class TestClaimsJWTAuthentication:
+    """Testes para ClaimsJWTAuthentication e ClaimsProfile."""
+
+    def test_user_from_claims_without_query(self, user):
+        """Testa o request.user montado só com as claims, sem consulta."""
+        access = login(user)["access"]
+        authenticate(access)
+
+        with CaptureQueriesContext(connection) as queries:
+            request_user = authenticate(access)
+            assert request_user.username == "joao"
+            assert request_user.is_superuser is False
+            assert request_user.is_authenticated
+        assert isinstance(request_user, ClaimsProfile)
+        assert queries.captured_queries == []
+
+        with CaptureQueriesContext(connection) as queries:
+            assert request_user.get_full_name() == "João Pereira"
+            assert request_user.email == "joao@example.com"
+        assert len(queries.captured_queries) == 1
+        assert request_user == user
+
+    def test_group_change_revokes_claims(self, user):
+        """Testa que entrar ou sair de um grupo revoga os tokens emitidos."""
+        group = Group.objects.create(name="Financeiro")
+        access = login(user)["access"]
+        authenticate(access)
+
+        user.groups.add(group)
+        with pytest.raises(AuthenticationFailed) as exc:
+            authenticate(access)
+        assert exc.value.detail["code"] == "claims_outdated"
+
+        access = login(user)["access"]
+        assert authenticate(access).pk == user.pk
+
+        group.usuario_set.remove(user)
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_group_delete_revokes_claims(self, user):
+        """Testa que apagar um grupo revoga os tokens dos seus membros."""
+        group = Group.objects.create(name="Suporte")
+        user.groups.add(group)
+        access = login(user)["access"]
+
+        group.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_only_claim_fields_bump_version(self, user):
+        """Testa que campos fora do token não revogam, mas is_superuser sim."""
+        access = login(user)["access"]
+
+        user.first_name = "Joana"
+        user.last_login = timezone.now()
+        user.save()
+        user.save(update_fields=["last_login"])
+        assert authenticate(access).pk == user.pk
+
+        user.is_superuser = True
+        user.save(update_fields=["is_superuser"])
+        user.refresh_from_db()
+        assert user.permissionsVersion == 1
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_password_change_revokes_claims(self, user):
+        """Testa que trocar a senha revoga os tokens só-claims já emitidos."""
+        access = login(user)["access"]
+        authenticate(access)
+
+        user.set_password("OutraSenha456!")
+        user.save(update_fields=["password"])
+
+        with pytest.raises(AuthenticationFailed) as exc:
+            authenticate(access)
+        assert exc.value.detail["code"] == "claims_outdated"
+
+    def test_stale_instance_does_not_restore_version(self, user):
+        """Testa que salvar uma instância antiga não volta a versão."""
+        group = Group.objects.create(name="Financeiro")
+        access = login(user)["access"]
+        user.groups.add(group)
+
+        user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_bulk_deactivation_with_version_bump(self, user):
+        """Testa a desativação por QuerySet.update seguida de bump_permissions_version."""
+        access = login(user)["access"]
+        authenticate(access)
+
+        get_user_model().objects.filter(pk=user.pk).update(is_active=False)
+        bump_permissions_version([user.pk])
+
+        with pytest.raises(AuthenticationFailed) as exc:
+            authenticate(access)
+        assert exc.value.detail["code"] == "claims_outdated"
+
+    def test_inactive_claim_is_rejected(self, user):
+        """Testa que is_active vem da claim do token, não é fixo em True."""
+        access = ClaimsRefreshToken.for_user(user).access_token
+        access["is_active"] = False
+
+        with pytest.raises(AuthenticationFailed) as exc:
+            authenticate(str(access))
+        assert exc.value.detail["code"] == "user_inactive"
+
+    def test_process_local_cache_reads_version_from_db(self, user, settings):
+        """Testa que, com LocMemCache, a versão é conferida no banco a cada requisição."""
+        settings.AUTH_USER_CACHE = "default"
+        access = login(user)["access"]
+        authenticate(access)
+
+        # Sem signal: um cache por processo não saberia da mudança
+        get_user_model().objects.filter(pk=user.pk).update(permissionsVersion=5)
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_check_warns_without_shared_cache(self, settings):
+        """Testa o system check do modo só-claims com um cache por processo."""
+        assert check_claims_version_cache(None) == []
+
+        settings.AUTH_USER_CACHE = "default"
+        warnings = check_claims_version_cache(None)
+
+        assert [warning.id for warning in warnings] == ["authentication.W001"]
+
+    def test_unverifiable_version_fails_closed(self, user, monkeypatch):
+        """Testa que um erro ao conferir a versão recusa o token."""
+        access = login(user)["access"]
+
+        def get_permissions_version(user_id):
+            raise ConnectionError("cache indisponível")
+
+        # O pacote backends reexporta a classe com o mesmo nome do módulo
+        module = importlib.import_module(
+            "authentication.backends.ClaimsJWTAuthentication"
+        )
+        monkeypatch.setattr(module, "get_permissions_version", get_permissions_version)
+
+        with pytest.raises(AuthenticationFailed) as exc:
+            authenticate(access)
+        assert exc.value.detail["code"] == "claims_unverifiable"
+
+    def test_deleted_user_is_rejected(self, user):
+        """Testa que o token de um usuário apagado deixa de autenticar."""
+        access = login(user)["access"]
+        authenticate(access)
+
+        user.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authenticate(access)
+
+    def test_token_without_claims_falls_back(self, user):
+        """Testa que tokens sem as claims usam o caminho com o banco."""
+        access = AccessToken.for_user(user)
+
+        request_user = authenticate(str(access))
+
+        assert request_user.pk == user.pk
+        assert not isinstance(request_user, ClaimsProfile)
+
+
+class TestProfileEndpointClaimsOnly:
+    """Testes para GET /api/profile com AUTH_CLAIMS_ONLY."""
+
+    def test_read_without_auth_query(self, user):
+        """Testa que a leitura do perfil só consulta o Profile para a resposta."""
+        client = APIClient()
+        access = str(ClaimsRefreshToken.for_user(user).access_token)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        client.get("/api/profile")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/profile")
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "joao"
+        assert len(profile_queries(queries.captured_queries)) == 1
+
+    def test_writes_use_full_authentication(self, user):
+        """Testa que as escritas continuam usando o Profile do banco."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {login(user)['access']}")
+
+        response = client.patch(
+            f"/api/profile/{user.pk}", {"first_name": "Joana"}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert response.json()["first_name"] == "Joana"
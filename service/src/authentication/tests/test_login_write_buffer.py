@@ -0,0 +1,131 @@
+"""
+Testes para as escritas do login gravadas em lote.
+"""
+
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+import authentication.login_buffer
+import authentication.serializers.TokenClaimsSerializer
+from authentication.login_buffer import LoginWriteBuffer
+
+
+@pytest.fixture(autouse=True)
+def buffer(settings, monkeypatch):
+    settings.AUTH_LOGIN_WRITE_BUFFER = True
+    settings.AUTH_LOGIN_BUFFER_INTERVAL = 60
+    cache.clear()
+    # O simplejwt recria api_settings ao mudar SIMPLE_JWT; o serializer usa o original
+    monkeypatch.setattr(
+        authentication.serializers.TokenClaimsSerializer.api_settings,
+        "UPDATE_LAST_LOGIN",
+        True,
+    )
+
+    login_write_buffer = LoginWriteBuffer()
+    for module in (
+        authentication.login_buffer,
+        authentication.serializers.TokenClaimsSerializer,
+    ):
+        monkeypatch.setattr(module, "login_write_buffer", login_write_buffer)
+    return login_write_buffer
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="joao",
+        email="joao@example.com",
+        password="SenhaForte123!",
+    )
+
+
+def login():
+    response = APIClient().post(
+        "/api/login/",
+        {"username": "joao", "password": "SenhaForte123!"},
+        format="json",
+    )
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+class TestLoginWriteBuffer:
+    """Testes para LoginWriteBuffer e o login com AUTH_LOGIN_WRITE_BUFFER."""
+
+    def test_login_defers_writes(self, user, buffer):
+        """Testa que o login não grava OutstandingToken nem last_login na hora."""
+        with CaptureQueriesContext(connection) as queries:
+            tokens = login()
+
+        writes = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        assert writes == []
+        assert buffer.pending() == 2
+
+        assert buffer.flush() == {"tokens": 1, "last_logins": 1}
+        user.refresh_from_db()
+        assert user.last_login is not None
+        assert (
+            OutstandingToken.objects.get().jti == RefreshToken(tokens["refresh"])["jti"]
+        )
+
+    def test_many_logins_flush_in_bulk(self, user, buffer):
+        """Testa que vários logins viram um INSERT e um UPDATE."""
+        for _ in range(5):
+            login()
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = buffer.flush()
+
+        assert summary == {"tokens": 5, "last_logins": 1}
+        assert OutstandingToken.objects.count() == 5
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 1
+
+    def test_logout_before_flush(self, user, buffer):
+        """Testa o logout de um token cujo OutstandingToken ainda não foi gravado."""
+        refresh = login()["refresh"]
+
+        response = APIClient().post("/api/logout/", {"refresh": refresh}, format="json")
+        buffer.flush()
+
+        assert response.status_code == 200
+        assert OutstandingToken.objects.count() == 1
+
+    def test_disabled_by_setting(self, user, buffer, settings):
+        """Testa que, desligado, o login grava na hora."""
+        settings.AUTH_LOGIN_WRITE_BUFFER = False
+
+        login()
+
+        assert buffer.pending() == 0
+        assert OutstandingToken.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_flush(buffer, settings):
+    """Testa que a thread do processo grava o lote após o intervalo."""
+    settings.AUTH_LOGIN_BUFFER_INTERVAL = 0.05
+    get_user_model().objects.create_user(
+        username="joao", email="joao@example.com", password="SenhaForte123!"
+    )
+
+    login()
+
+    deadline = time.monotonic() + 5
+    while not OutstandingToken.objects.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert OutstandingToken.objects.count() == 1
+    assert buffer.pending() == 0
@@ -0,0 +1,87 @@
+"""
+Testes para a remoção em lotes dos tokens expirados.
+"""
+
+import threading
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from authentication.token_purge import purge_expired_tokens
+
+
+def make_tokens(count, expires_in, blacklist=False):
+    now = timezone.now()
+    tokens = OutstandingToken.objects.bulk_create(
+        [
+            OutstandingToken(
+                jti=uuid.uuid4().hex,
+                token="token",
+                created_at=now - timedelta(days=8),
+                expires_at=now + expires_in,
+            )
+            for _ in range(count)
+        ]
+    )
+    if blacklist:
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=token) for token in tokens]
+        )
+    return tokens
+
+
+@pytest.mark.django_db
+class TestPurgeExpiredTokens:
+    """Testes para purge_expired_tokens e o comando purge_expired_tokens."""
+
+    def test_deletes_only_expired_in_batches(self):
+        """Testa que só os expirados saem, em lotes, junto com a blacklist."""
+        make_tokens(5, timedelta(days=-1))
+        make_tokens(2, timedelta(days=-1), blacklist=True)
+        valid = make_tokens(3, timedelta(days=1), blacklist=True)
+        batches = []
+
+        summary = purge_expired_tokens(
+            batch_size=3, pause=0, progress=lambda s: batches.append(dict(s))
+        )
+
+        assert summary["outstanding"] == 7
+        assert summary["blacklisted"] == 2
+        assert summary["batches"] == 3
+        assert [b["outstanding"] for b in batches] == [3, 6, 7]
+        assert set(OutstandingToken.objects.values_list("pk", flat=True)) == {
+            token.pk for token in valid
+        }
+        assert BlacklistedToken.objects.count() == 3
+
+    def test_stop_event_interrupts_between_batches(self):
+        """Testa que o stop_event interrompe a limpeza após o lote atual."""
+        make_tokens(6, timedelta(days=-1))
+        stop_event = threading.Event()
+        stop_event.set()
+
+        summary = purge_expired_tokens(batch_size=2, stop_event=stop_event)
+
+        assert summary["batches"] == 1
+        assert OutstandingToken.objects.count() == 4
+
+    def test_command_reports_progress(self):
+        """Testa o comando com o progresso de cada lote e o resumo final."""
+        make_tokens(4, timedelta(days=-1), blacklist=True)
+        out = StringIO()
+
+        call_command("purge_expired_tokens", batch_size=2, pause=0, stdout=out)
+
+        output = out.getvalue()
+        assert "Lote 1: 2 tokens apagados (2 na blacklist)" in output
+        assert "Lote 2: 4 tokens apagados (4 na blacklist)" in output
+        assert "Tokens expirados apagados: 4 | Na blacklist: 4" in output
+        assert not OutstandingToken.objects.exists()
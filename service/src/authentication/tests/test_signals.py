@@ -0,0 +1,127 @@
+"""
+Testes para o email de boas-vindas em lote após o cadastro.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import transaction
+
+import utils.emails
+from authentication.signals import queue_welcome_emails
+
+
+@pytest.fixture(autouse=True)
+def _welcome_settings(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_ASYNC_ENABLED = False
+    settings.EMAIL_WELCOME_ON_SIGNUP = True
+    mail.outbox = []
+
+
+@pytest.fixture
+def bulk_calls(monkeypatch):
+    """Registra os IDs recebidos por cada chamada de send_bulk_welcome_email."""
+    calls = []
+    original = utils.emails.send_bulk_welcome_email
+
+    def spy(queryset_or_ids, *args, **kwargs):
+        calls.append(sorted(queryset_or_ids))
+        return original(queryset_or_ids, *args, **kwargs)
+
+    monkeypatch.setattr(utils.emails, "send_bulk_welcome_email", spy)
+    return calls
+
+
+def create_profile(index):
+    return get_user_model().objects.create_user(
+        username=f"usuario{index}",
+        email=f"usuario{index}@example.com",
+        password="SenhaForte123!",
+        first_name="Usuário",
+        last_name=str(index),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWelcomeEmailOnSignup:
+    """Testes para o envio de boas-vindas no commit da transação."""
+
+    def test_profiles_in_transaction_are_sent_in_one_batch(self, bulk_calls):
+        """Testa que os perfis da transação geram um único envio em lote."""
+        with transaction.atomic():
+            profiles = [create_profile(i) for i in range(5)]
+            assert mail.outbox == []
+
+        assert bulk_calls == [sorted(p.pk for p in profiles)]
+        assert len(mail.outbox) == 5
+        assert mail.outbox[0].subject == "Bem-vindo(a) ao ArmoredDjango!"
+        assert "Usuário 0" in mail.outbox[0].body
+        assert mail.outbox[0].to == ["usuario0@example.com"]
+
+    def test_rollback_sends_nothing(self, bulk_calls):
+        """Testa que a transação desfeita não envia e não trava o próximo lote."""
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                create_profile(1)
+                raise RuntimeError
+
+        with transaction.atomic():
+            profile = create_profile(2)
+
+        assert bulk_calls == [[profile.pk]]
+        assert [m.to for m in mail.outbox] == [["usuario2@example.com"]]
+
+    def test_rolled_back_savepoint_is_skipped(self, bulk_calls):
+        """Testa que perfis de um savepoint desfeito ficam fora do envio."""
+        with transaction.atomic():
+            create_profile(1)
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    create_profile(2)
+                    raise RuntimeError
+            create_profile(3)
+
+        assert len(bulk_calls) == 1
+        assert sorted(m.to[0] for m in mail.outbox) == [
+            "usuario1@example.com",
+            "usuario3@example.com",
+        ]
+
+    def test_batch_started_in_rolled_back_savepoint(self, bulk_calls):
+        """Testa que um lote descartado com o savepoint não engole os próximos perfis."""
+        with transaction.atomic():
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    create_profile(1)
+                    raise RuntimeError
+            profile = create_profile(2)
+
+        assert len(bulk_calls) == 1
+        assert profile.pk in bulk_calls[0]
+        assert [m.to for m in mail.outbox] == [["usuario2@example.com"]]
+
+    def test_disabled_by_setting(self, settings, bulk_calls):
+        """Testa que nada é enviado com EMAIL_WELCOME_ON_SIGNUP desligado."""
+        settings.EMAIL_WELCOME_ON_SIGNUP = False
+        with transaction.atomic():
+            create_profile(1)
+
+        assert bulk_calls == []
+        assert mail.outbox == []
+
+    def test_queue_after_bulk_create(self, settings, bulk_calls):
+        """Testa o agendamento manual para perfis criados com bulk_create."""
+        settings.EMAIL_WELCOME_ON_SIGNUP = False
+        User = get_user_model()
+        with transaction.atomic():
+            profiles = User.objects.bulk_create(
+                [
+                    User(username=f"lote{i}", email=f"lote{i}@example.com")
+                    for i in range(3)
+                ]
+            )
+            queue_welcome_emails(profiles)
+
+        assert len(bulk_calls) == 1
+        assert len(mail.outbox) == 3
@@ -0,0 +1,231 @@
+"""
+Testes para o filtro de Bloom na frente da blacklist de tokens.
+"""
+
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+import authentication.blacklist
+from authentication.blacklist import (
+    LOOKUPS_METRIC,
+    BloomFilter,
+    TokenBlacklistFilter,
+    token_blacklist_filter,
+    token_blacklist_filter_stats,
+)
+from authentication.checks import check_blacklist_bloom_cache
+from utils.email_metrics import get_email_metrics
+from utils.metrics import get_metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_filter(settings, tmp_path):
+    settings.AUTH_BLACKLIST_BLOOM_ENABLED = True
+    # Cache compartilhado entre processos (em arquivos), como Redis em produção
+    settings.CACHES = {
+        **settings.CACHES,
+        "auth": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "auth-cache"),
+        },
+    }
+    settings.AUTH_USER_CACHE = "auth"
+    token_blacklist_filter.reset()
+    yield
+    token_blacklist_filter.reset()
+
+
+@pytest.fixture
+def refresh(db):
+    user = get_user_model().objects.create_user(
+        username="joao",
+        email="joao@example.com",
+        password="SenhaForte123!",
+    )
+    response = APIClient().post(
+        "/api/login/",
+        {"username": "joao", "password": "SenhaForte123!"},
+        format="json",
+    )
+    assert response.status_code == 200, response.content
+    return user, response.json()["refresh"]
+
+
+def post_refresh(token):
+    return APIClient().post("/api/login/refresh/", {"refresh": token}, format="json")
+
+
+def post_logout(token):
+    return APIClient().post("/api/logout/", {"refresh": token}, format="json")
+
+
+def blacklist_queries(queries):
+    return [q for q in queries if "token_blacklist_blacklistedtoken" in q["sql"]]
+
+
+def blacklist_row(row_id, blacklisted_at):
+    outstanding = OutstandingToken.objects.create(
+        jti=uuid.uuid4().hex,
+        token="token",
+        expires_at=timezone.now() + timedelta(days=1),
+    )
+    BlacklistedToken.objects.create(id=row_id, token=outstanding)
+    BlacklistedToken.objects.filter(pk=row_id).update(blacklisted_at=blacklisted_at)
+    return outstanding.jti
+
+
+class TestBloomFilter:
+    """Testes para BloomFilter."""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Testa que itens adicionados sempre são encontrados e a taxa de erro."""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        assert all(f"jti-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"outro-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestTokenBlacklistFilter:
+    """Testes para a verificação da blacklist pelo filtro."""
+
+    def test_negative_lookup_skips_database(self, refresh):
+        """Testa que um token fora da blacklist não consulta BlacklistedToken."""
+        _, token = refresh
+        assert post_refresh(token).status_code == 200
+
+        with CaptureQueriesContext(connection) as queries:
+            assert post_refresh(token).status_code == 200
+
+        assert blacklist_queries(queries.captured_queries) == []
+        stats = token_blacklist_filter_stats()
+        assert stats["negatives"] == 2
+        assert stats["hit_rate"] == 1.0
+
+    def test_lookups_go_to_auth_metrics_sink(self, settings, refresh):
+        """Testa que as consultas vão para AUTH_METRICS_SINK, não para o de emails."""
+        settings.AUTH_METRICS_SINK = "utils.metrics.MemoryMetricsSink"
+        settings.EMAIL_METRICS_SINK = "utils.email_metrics.MemoryEmailMetricsSink"
+        _, token = refresh
+
+        assert post_refresh(token).status_code == 200
+
+        assert (
+            get_metrics("AUTH_METRICS_SINK").count(LOOKUPS_METRIC, result="negative")
+            == 1
+        )
+        assert not get_email_metrics().counters
+
+    def test_logout_updates_filter_incrementally(self, refresh):
+        """Testa que o logout entra no filtro sem reconstruí-lo."""
+        _, token = refresh
+        post_refresh(token)
+        built_at = token_blacklist_filter._built_at
+
+        assert post_logout(token).status_code == 200
+        assert post_refresh(token).status_code == 401
+
+        assert token_blacklist_filter._built_at == built_at
+        assert token_blacklist_filter_stats()["positives"] == 1
+
+    def test_other_process_pulls_new_entries(self, refresh):
+        """Testa que outro processo busca as linhas novas ao ver a geração nova."""
+        _, token = refresh
+        other_worker = TokenBlacklistFilter()
+        jti = RefreshToken(token)["jti"]
+        assert not other_worker.might_contain(jti)
+        built_at = other_worker._built_at
+
+        post_logout(token)
+
+        assert other_worker.might_contain(jti)
+        assert other_worker._built_at == built_at
+
+    def test_rows_committed_out_of_order_are_pulled(self, db):
+        """Testa que uma linha gravada depois, com id menor, ainda entra no filtro."""
+        now = timezone.now()
+        other_worker = TokenBlacklistFilter()
+        newer = blacklist_row(100, now)
+        assert other_worker.might_contain(newer)
+
+        # Transação mais lenta: id menor e blacklisted_at anterior, commit depois
+        older = blacklist_row(50, now - timedelta(seconds=5))
+
+        assert other_worker.might_contain(older)
+        assert other_worker.stats()["size"] == 2
+
+    def test_process_local_cache_uses_database(self, refresh, settings, monkeypatch):
+        """Testa dois workers sem cache compartilhado: o logout vale no outro na hora."""
+        settings.AUTH_USER_CACHE = "default"
+        _, token = refresh
+        worker_a, worker_b = TokenBlacklistFilter(), TokenBlacklistFilter()
+        monkeypatch.setattr(
+            authentication.blacklist, "token_blacklist_filter", worker_b
+        )
+        assert post_refresh(token).status_code == 200
+
+        monkeypatch.setattr(
+            authentication.blacklist, "token_blacklist_filter", worker_a
+        )
+        assert post_logout(token).status_code == 200
+
+        monkeypatch.setattr(
+            authentication.blacklist, "token_blacklist_filter", worker_b
+        )
+        with CaptureQueriesContext(connection) as queries:
+            assert post_refresh(token).status_code == 401
+        assert blacklist_queries(queries.captured_queries)
+        assert worker_b.stats()["positives"] == 0
+
+    def test_check_requires_shared_cache(self, settings):
+        """Testa que o system check recusa o filtro com um cache por processo."""
+        assert check_blacklist_bloom_cache(None) == []
+
+        settings.AUTH_USER_CACHE = "default"
+        errors = check_blacklist_bloom_cache(None)
+
+        assert [error.id for error in errors] == ["authentication.E001"]
+
+    def test_sync_error_falls_back_to_database(self, refresh, monkeypatch):
+        """Testa que, se o filtro não puder ser atualizado, a consulta vai ao banco."""
+        _, token = refresh
+
+        def rebuild():
+            raise ConnectionError("banco indisponível")
+
+        monkeypatch.setattr(token_blacklist_filter, "_rebuild", rebuild)
+
+        assert token_blacklist_filter.might_contain(RefreshToken(token)["jti"])
+
+    def test_false_positive_falls_back_to_database(self, refresh, monkeypatch):
+        """Testa que um falso positivo do filtro é resolvido pelo banco."""
+        _, token = refresh
+        monkeypatch.setattr(token_blacklist_filter, "might_contain", lambda jti: True)
+
+        assert post_refresh(token).status_code == 200
+        assert token_blacklist_filter_stats()["false_positives"] == 1
+
+    def test_disabled_by_setting(self, refresh, settings):
+        """Testa que, desligado, a blacklist é consultada direto no banco."""
+        settings.AUTH_BLACKLIST_BLOOM_ENABLED = False
+        _, token = refresh
+
+        with CaptureQueriesContext(connection) as queries:
+            assert post_refresh(token).status_code == 200
+
+        assert len(blacklist_queries(queries.captured_queries)) == 1
+        assert token_blacklist_filter_stats()["negatives"] == 0
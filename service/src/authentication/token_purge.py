@@ -0,0 +1,82 @@
+"""
+Remoção em lotes dos tokens JWT expirados.
+
+Cada login grava um `OutstandingToken` e a tabela cresce sem parar. O
+`flushexpiredtokens` do simplejwt apaga tudo em um único DELETE, que trava a
+tabela por muito tempo. Aqui os tokens expirados são apagados em lotes
+pequenos, em ordem de id (keyset: cada lote começa depois do último id
+apagado, sem OFFSET), cada lote na sua própria transação curta e com uma
+pausa entre os lotes, para não competir com o tráfego normal. Os
+`BlacklistedToken` dos tokens apagados saem junto (cascade).
+
+Example:
+    >>> purge_expired_tokens(batch_size=1000, pause=0.5)
+    {"outstanding": 48211, "blacklisted": 3120, "batches": 49, "duration": 31.8}
+"""
+
+import time
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+def purge_expired_tokens(
+    batch_size: int = 1000,
+    pause: float = 0.5,
+    stop_event=None,
+    progress=None,
+) -> dict:
+    """
+    Apaga os tokens expirados (outstanding e blacklist) em lotes.
+
+    Args:
+        batch_size (int, optional): Tokens apagados por lote
+        pause (float, optional): Segundos de pausa entre os lotes
+        stop_event (threading.Event, optional): Interrompe entre dois lotes
+            quando setado
+        progress (callable, optional): Chamado após cada lote com o resumo
+            parcial (mesmo formato do retorno)
+
+    Returns:
+        dict: "outstanding" e "blacklisted" (tokens apagados), "batches" e
+        "duration" (segundos)
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    summary = {"outstanding": 0, "blacklisted": 0, "batches": 0}
+    last_id = 0
+
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=now, id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+
+        last_id = ids[-1]
+        summary["outstanding"] += deleted.get(OutstandingToken._meta.label, 0)
+        summary["blacklisted"] += deleted.get(BlacklistedToken._meta.label, 0)
+        summary["batches"] += 1
+        summary["duration"] = round(time.monotonic() - started, 3)
+        if progress is not None:
+            progress(summary)
+
+        if len(ids) < batch_size:
+            break
+        if stop_event is not None:
+            if stop_event.wait(pause):
+                break
+        elif pause:
+            time.sleep(pause)
+
+    summary["duration"] = round(time.monotonic() - started, 3)
+    return summary
@@ -0,0 +1,212 @@
+"""
+Tokens JWT com as claims do perfil, para autenticar sem consultar o banco.
+
+Os tokens emitidos no login (e no refresh) levam, além do `user_id`, as
+claims `username`, `profileType`, `is_superuser`, `is_active` e
+`permissions_version`.
+Com elas, `ClaimsJWTAuthentication` monta o `request.user` como um
+`ClaimsProfile`, sem SELECT em Profile; o perfil completo só é carregado se
+a rota acessar algum atributo que não está no token.
+
+Revogação: `Profile.permissionsVersion` muda quando grupos, `is_superuser`,
+`is_active`, outro campo presente no token ou a senha mudam
+(`authentication.signals`) e tokens com versão diferente são recusados; o cliente obtém claims novas em
+`/api/login/refresh/`. A versão atual de cada usuário é lida do banco a cada
+requisição ou, se AUTH_USER_CACHE for compartilhado entre os processos
+(`authentication.cache`), fica nele por AUTH_CLAIMS_VERSION_TIMEOUT segundos e
+é descartada pelos signals. Sem um cache compartilhado cada requisição faz uma
+consulta ao banco, e o system check `authentication.W001` avisa.
+
+Alterações em massa (`QuerySet.update`, `bulk_update`) não disparam signals:
+ao mudar grupos ou um campo de VERSION_FIELDS assim, chame
+`bump_permissions_version` com os IDs alterados, na mesma transação.
+
+Example:
+    >>> ids = list(inativos.values_list("pk", flat=True))
+    >>> Profile.objects.filter(pk__in=ids).update(is_active=False)
+    >>> bump_permissions_version(ids)
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+
+from authentication.blacklist import BloomBlacklistMixin
+from authentication.cache import get_auth_cache, is_shared_cache
+
+PERMISSIONS_VERSION_CLAIM = "permissions_version"
+
+# Campo do perfil -> claim do token
+PROFILE_CLAIMS = {
+    "username": "username",
+    "profileType": "profileType",
+    "is_superuser": "is_superuser",
+    "is_active": "is_active",
+    "permissionsVersion": PERMISSIONS_VERSION_CLAIM,
+}
+
+# Campos cuja alteração deixa as claims dos tokens já emitidos desatualizadas
+CLAIM_FIELDS = ("username", "profileType", "is_superuser", "is_staff", "is_active")
+
+# Campos que incrementam permissionsVersion: as claims e a senha, já que o
+# modo só-claims não confere o hash da senha (CHECK_REVOKE_TOKEN do simplejwt)
+VERSION_FIELDS = CLAIM_FIELDS + ("password",)
+
+CACHE_PREFIX = "auth:claims-version:"
+
+
+def add_profile_claims(token, user):
+    """Grava no token as claims do perfil `user`."""
+    for field, claim in PROFILE_CLAIMS.items():
+        token[claim] = getattr(user, field)
+    return token
+
+
+def get_permissions_version(user_id):
+    """
+    Versão atual das permissões do usuário, do cache ou do banco.
+
+    O cache só é usado se for compartilhado entre os processos: os signals
+    que descartam a versão antiga precisam alcançar todos os workers.
+
+    Returns:
+        int: Versão atual, ou None se o usuário não existe
+    """
+    cache = get_auth_cache() if is_shared_cache() else None
+    key = f"{CACHE_PREFIX}{user_id}"
+    version = cache.get(key) if cache is not None else None
+    if version is None:
+        version = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list("permissionsVersion", flat=True)
+            .first()
+        )
+        if version is not None and cache is not None:
+            cache.set(key, version, settings.AUTH_CLAIMS_VERSION_TIMEOUT)
+    return version
+
+
+def forget_permissions_version(user_ids, using: str = None):
+    """Descarta a versão em cache dos usuários, agora e no commit da transação."""
+    keys = [f"{CACHE_PREFIX}{user_id}" for user_id in user_ids]
+    if not keys:
+        return
+    get_auth_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_auth_cache().delete_many(keys), using=using)
+
+
+def bump_permissions_version(user_ids, using: str = None):
+    """
+    Incrementa `permissionsVersion` dos usuários, revogando as claims dos
+    tokens já emitidos. Os signals de Profile chamam esta função; alterações
+    em massa (`QuerySet.update`, `bulk_update`) precisam chamá-la também.
+
+    Args:
+        user_ids: IDs dos usuários
+        using (str, optional): Alias do banco de dados
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    get_user_model().objects.using(using).filter(pk__in=user_ids).update(
+        permissionsVersion=F("permissionsVersion") + 1
+    )
+    forget_permissions_version(user_ids, using=using)
+
+
+class ClaimsRefreshToken(BloomBlacklistMixin, RefreshToken):
+    """Refresh token cujos access tokens levam as claims do perfil.
+
+    No refresh, as claims são lidas de novo do banco, então o access token
+    novo sempre reflete as permissões atuais do usuário. A verificação da
+    blacklist passa antes pelo filtro de Bloom (`authentication.blacklist`).
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        if settings.AUTH_LOGIN_WRITE_BUFFER:
+            from authentication.login_buffer import login_write_buffer
+
+            # Pula o BlacklistMixin.for_user (INSERT síncrono do OutstandingToken)
+            token = super(BlacklistMixin, cls).for_user(user)
+            login_write_buffer.add_outstanding_token(token, user)
+        else:
+            token = super().for_user(user)
+
+        token = add_profile_claims(token, user)
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = getattr(self, "_user", None)
+        if user is None:
+            user = (
+                get_user_model()
+                .objects.filter(
+                    **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+                )
+                .first()
+            )
+        if user is not None:
+            add_profile_claims(access, user)
+        return access
+
+
+class ClaimsProfile:
+    """Usuário autenticado montado só com as claims do token.
+
+    Expõe `id`/`pk`, `username`, `profileType`, `is_superuser` e `is_active`
+    sem consultar o banco. Qualquer outro atributo (`email`, `get_full_name()`,
+    `has_perm()`, ...) carrega o Profile completo na primeira vez e é
+    repassado a ele. Não é uma instância de Profile: use `.profile` quando
+    precisar do objeto do model (ex.: em chaves estrangeiras).
+
+    Args:
+        token: Token de acesso já validado
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        # O simplejwt grava o user_id como string no token
+        id_field = get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
+        self.id = self.pk = id_field.to_python(token[api_settings.USER_ID_CLAIM])
+        self.username = token["username"]
+        self.profileType = token["profileType"]
+        self.is_superuser = token["is_superuser"]
+        self.is_active = token["is_active"]
+        self.permissionsVersion = token[PERMISSIONS_VERSION_CLAIM]
+        self._profile = None
+
+    @property
+    def profile(self):
+        """Profile completo, carregado do banco no primeiro acesso."""
+        if self._profile is None:
+            self._profile = get_user_model().objects.get(
+                **{api_settings.USER_ID_FIELD: self.pk}
+            )
+        return self._profile
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name == "_profile":
+            raise AttributeError(name)
+        return getattr(self.profile, name)
+
+    def __str__(self):
+        return f"ClaimsProfile {self.username} ({self.pk})"
+
+    def __eq__(self, other):
+        return getattr(other, "pk", None) == self.pk and isinstance(
+            other, (ClaimsProfile, get_user_model())
+        )
+
+    def __hash__(self):
+        return hash(self.pk)
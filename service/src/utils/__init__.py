@@ -6,24 +6,56 @@ This module provides utility functions and constants for the application.
 Remember to import specific functions or constants as needed.
 Remember import cache_utils functions from service/src/utils/cache_utils.py
 
+As funções de email e validação são carregadas sob demanda (`__getattr__`):
+`import utils` não importa `utils.emails` nem o Pynliner, que só são
+carregados no primeiro acesso (ex.: `utils.send_email`).
+
 Para exemplos de uso de email, veja:
 - utils/email_examples.py - Exemplos práticos prontos para copiar
 - utils/EMAIL_QUICK_START.md - Guia rápido de uso
 """
 
+import importlib
+
+from utils import constants as _constants
 from utils.constants import *  # noqa F401 F403
 
-# Email functions
-from utils.emails import build_email_html  # noqa F401
-from utils.emails import load_email_template  # noqa F401
-from utils.emails import send_email  # noqa F401
-from utils.emails import send_notification_email  # noqa F401
-from utils.emails import send_password_reset_email  # noqa F401
-from utils.emails import send_welcome_email  # noqa F401
-
-# Validation and formatting functions
-from utils.useful_functions import format_cpf  # noqa F401
-from utils.useful_functions import format_phone  # noqa F401
-from utils.useful_functions import sanitize_string  # noqa F401
-from utils.useful_functions import validate_cpf  # noqa F401
-from utils.useful_functions import validate_phone  # noqa F401
+# Nome público -> módulo que o define
+_LAZY_ATTRIBUTES = {
+    # Email functions
+    "make_idempotency_key": "utils.email_idempotency",
+    "build_email_html": "utils.emails",
+    "email_template_cache_stats": "utils.emails",
+    "load_email_template": "utils.emails",
+    "send_bulk_notification": "utils.emails",
+    "send_bulk_welcome_email": "utils.emails",
+    "send_email": "utils.emails",
+    "send_notification_email": "utils.emails",
+    "send_password_reset_email": "utils.emails",
+    "send_welcome_email": "utils.emails",
+    # Validation and formatting functions
+    "format_cpf": "utils.useful_functions",
+    "format_phone": "utils.useful_functions",
+    "sanitize_string": "utils.useful_functions",
+    "validate_cpf": "utils.useful_functions",
+    "validate_phone": "utils.useful_functions",
+}
+
+
+# `from utils import *`: constantes + funções carregadas sob demanda
+__all__ = [name for name in dir(_constants) if not name.startswith("_")]
+__all__ += list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Guarda no módulo: os próximos acessos não passam por __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,48 @@
+from django.contrib import admin
+
+from utils.email_retry import replay_dead_letters
+from utils.models import EmailDeadLetter
+
+
+class EmailDeadLetterAdmin(admin.ModelAdmin):
+    """Admin da dead-letter de emails.
+
+    Permite inspecionar emails que falharam definitivamente e reenviá-los.
+
+    Atributos:
+      - list_display (tuple): Campos exibidos na lista de registros.
+      - search_fields (tuple): Campos pesquisáveis na lista de registros.
+      - list_filter (tuple): Campos filtráveis na lista de registros.
+      - exclude (tuple): Campos ocultos no formulário (payload MIME).
+      - actions (list): Reenvio dos registros selecionados.
+    """
+
+    list_display = ("id", "subject", "attempts", "created_at", "replayed_at")
+    search_fields = ("subject", "recipients", "error")
+    list_filter = ("replayed_at",)
+    ordering = ("-id",)
+    exclude = ("payload",)
+    readonly_fields = (
+        "subject",
+        "from_email",
+        "recipients",
+        "error",
+        "attempts",
+        "outbox",
+        "created_at",
+        "replayed_at",
+    )
+    actions = ["replay_selected"]
+    icon_name = "report"
+
+    @admin.action(description="Reenviar emails selecionados")
+    def replay_selected(self, request, queryset):
+        summary = replay_dead_letters(queryset)
+        self.message_user(
+            request,
+            f"Reenviados: {summary['sent']} | Falhas: {summary['failed']}"
+            f" | Sem payload: {summary['skipped']}",
+        )
+
+
+admin.site.register(EmailDeadLetter, EmailDeadLetterAdmin)
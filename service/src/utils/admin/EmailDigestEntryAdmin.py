@@ -0,0 +1,23 @@
+from django.contrib import admin
+
+from utils.models import EmailDigestEntry
+
+
+class EmailDigestEntryAdmin(admin.ModelAdmin):
+    """Admin das notificações aguardando envio no digest.
+
+    Atributos:
+      - list_display (tuple): Campos exibidos na lista de registros.
+      - search_fields (tuple): Campos pesquisáveis na lista de registros.
+      - list_filter (tuple): Campos filtráveis na lista de registros.
+    """
+
+    list_display = ("id", "user", "title", "priority", "created_at")
+    search_fields = ("title", "user__username", "user__email")
+    list_filter = ("priority",)
+    ordering = ("-id",)
+    raw_id_fields = ("user",)
+    icon_name = "inbox"
+
+
+admin.site.register(EmailDigestEntry, EmailDigestEntryAdmin)
@@ -0,0 +1,33 @@
+from django.contrib import admin
+
+from utils.models import EmailOutbox
+
+
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin da outbox de emails.
+
+    Permite acompanhar a fila de envio assíncrono e inspecionar falhas.
+
+    Atributos:
+      - list_display (tuple): Campos exibidos na lista de registros.
+      - search_fields (tuple): Campos pesquisáveis na lista de registros.
+      - list_filter (tuple): Campos filtráveis na lista de registros.
+      - readonly_fields (tuple): Campos preenchidos pelo worker.
+    """
+
+    list_display = ("id", "subject", "status", "attempts", "created_at", "sent_at")
+    search_fields = ("subject", "recipient_list")
+    list_filter = ("status",)
+    ordering = ("-id",)
+    readonly_fields = (
+        "attempts",
+        "last_error",
+        "locked_at",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    )
+    icon_name = "outbox"
+
+
+admin.site.register(EmailOutbox, EmailOutboxAdmin)
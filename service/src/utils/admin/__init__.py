@@ -0,0 +1,5 @@
+from django.contrib import admin  # noqa: F401
+
+from utils.admin.EmailDeadLetterAdmin import EmailDeadLetterAdmin  # noqa: F401
+from utils.admin.EmailDigestEntryAdmin import EmailDigestEntryAdmin  # noqa: F401
+from utils.admin.EmailOutboxAdmin import EmailOutboxAdmin  # noqa: F401
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import viewsets
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from authentication.backends import CachedJWTAuthentication
+from utils.email_previews import get_email_preview_types, render_email_preview
+
+# Parâmetros da query string que não são repassados ao tipo de email
+RESERVED_PARAMS = {"user_id", "output", "refresh"}
+
+
+class EmailPreviewRestView(viewsets.ViewSet):
+    """Endpoint (somente staff) para pré-visualizar os emails do sistema.
+
+    - `GET /api/email-previews`: tipos de email registrados e seus parâmetros.
+    - `GET /api/email-previews/<tipo>`: assunto, texto e HTML renderizados
+      (com CSS inline), usando os valores de exemplo ou os informados na
+      query string. `user_id` usa os dados de um usuário real, `refresh=1`
+      ignora o cache e `output=html` retorna só o HTML (para exibir em iframe).
+
+    Exemplo:
+    ```
+        GET /api/email-previews/notification?title=Fatura&user_id=42
+    ```
+    """
+
+    authentication_classes = [CachedJWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    lookup_field = "email_type"
+    lookup_value_regex = r"[\w-]+"
+
+    @swagger_auto_schema(
+        tags=["Emails"],
+        operation_summary="List email types",
+        operation_description="List the email types available for preview.",
+    )
+    def list(self, request, *args, **kwargs):
+        return Response([item.as_dict() for item in get_email_preview_types()])
+
+    @swagger_auto_schema(
+        tags=["Emails"],
+        operation_summary="Preview an email",
+        operation_description="""Render an email type with sample or real user data.
+        Extra query parameters are passed to the email type.""",
+        manual_parameters=[
+            openapi.Parameter("user_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter("refresh", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter(
+                "output", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["html"]
+            ),
+        ],
+    )
+    def retrieve(self, request, email_type=None, *args, **kwargs):
+        query = request.query_params
+        user = None
+        if query.get("user_id"):
+            if not query["user_id"].isdigit():
+                raise ValidationError({"user_id": "Informe um ID numérico."})
+            user = get_object_or_404(get_user_model(), pk=query["user_id"])
+
+        params = {
+            key: value for key, value in query.items() if key not in RESERVED_PARAMS
+        }
+        try:
+            preview = render_email_preview(
+                email_type,
+                user=user,
+                params=params,
+                refresh=query.get("refresh", "").lower() in ("1", "true", "yes"),
+            )
+        except KeyError:
+            raise NotFound(detail=f"Email type '{email_type}' not found")
+        except ValueError as e:
+            raise ValidationError({"params": str(e)})
+
+        if query.get("output") == "html":
+            response = HttpResponse(
+                preview["html"], content_type="text/html; charset=utf-8"
+            )
+            # Permite exibir a pré-visualização em um iframe do próprio admin
+            response["X-Frame-Options"] = "SAMEORIGIN"
+            response["X-Email-Preview-Cache"] = "hit" if preview["cached"] else "miss"
+            return response
+        return Response(preview)
@@ -0,0 +1 @@
+from utils.api.EmailPreviewRestView import EmailPreviewRestView  # noqa: F401
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "utils"
+    icon_name = "build"
+    verbose_name = "03 - Utilitários"
@@ -0,0 +1,588 @@
+"""
+Cliente SMTP assíncrono (asyncio) com pool de conexões.
+
+Em deploys ASGI, `send_email` bloqueia uma thread do `sync_to_async` durante
+todo o diálogo SMTP. Aqui o envio usa streams do asyncio: enquanto espera o
+servidor, o event loop segue atendendo outras requisições.
+
+- `AsyncSMTPConnection`: uma sessão SMTP (EHLO, STARTTLS/SSL, AUTH, envio).
+  Os erros são os mesmos do `smtplib` (`SMTPRecipientsRefused`,
+  `SMTPServerDisconnected`, ...), então `is_transient_email_error` e a
+  outbox tratam as falhas como no envio síncrono.
+- `AsyncSMTPConnectionPool`: conexões persistentes por event loop, com os
+  mesmos limites do pool síncrono (EMAIL_POOL_MAX_SIZE,
+  EMAIL_POOL_IDLE_TIMEOUT), verificação com NOOP, uma reconexão por mensagem
+  e o limitador de taxa do host (`utils.email_ratelimit`).
+
+Só o backend SMTP do Django tem versão assíncrona; com outros EMAIL_BACKEND
+(locmem, console, `FailoverEmailBackend`), `async_send_email_messages` usa o
+envio síncrono em uma thread.
+
+Example:
+    >>> await async_send_email_messages([msg])
+    1
+"""
+
+import asyncio
+import base64
+import re
+import smtplib
+import ssl
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parseaddr
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail.utils import DNS_NAME
+from django.core.signals import setting_changed
+
+from utils.email_metrics import email_stage
+from utils.email_pool import RECONNECT_ERRORS, send_email_messages, should_reconnect
+from utils.email_ratelimit import get_email_rate_limiter
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+CRLF = b"\r\n"
+_LINE_ENDINGS = re.compile(rb"\r\n|\n|\r(?!\n)")
+_LEADING_PERIOD = re.compile(rb"(?m)^\.")
+
+
+class AsyncSMTPConnection:
+    """
+    Sessão SMTP sobre streams do asyncio.
+
+    Args:
+        host (str): Servidor SMTP
+        port (int): Porta
+        username (str, optional): Usuário para AUTH (vazio = sem autenticação)
+        password (str, optional): Senha para AUTH
+        use_tls (bool, optional): Se True, usa STARTTLS
+        use_ssl (bool, optional): Se True, conecta direto por TLS (SMTPS)
+        timeout (float, optional): Segundos máximos de espera por resposta
+        ssl_context (ssl.SSLContext, optional): Contexto TLS. Se None, usa o padrão
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        timeout: float = None,
+        ssl_context: ssl.SSLContext = None,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+
+        self.extensions = {}
+        self._reader = None
+        self._writer = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        """Abre a conexão, faz EHLO, STARTTLS e AUTH conforme configurado."""
+        context = None
+        if self.use_ssl or self.use_tls:
+            context = self.ssl_context or ssl.create_default_context()
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                self.host, self.port, ssl=context if self.use_ssl else None
+            ),
+            self.timeout,
+        )
+        try:
+            code, message = await self._read_reply()
+            if code != 220:
+                raise smtplib.SMTPConnectError(code, message)
+            await self.ehlo()
+
+            if self.use_tls:
+                if "starttls" not in self.extensions:
+                    raise smtplib.SMTPNotSupportedError(
+                        "STARTTLS não suportado pelo servidor"
+                    )
+                await self._expect("STARTTLS", (220,))
+                await asyncio.wait_for(
+                    self._writer.start_tls(context, server_hostname=self.host),
+                    self.timeout,
+                )
+                await self.ehlo()
+
+            if self.username and self.password:
+                await self.login()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def ehlo(self):
+        """Envia EHLO (ou HELO, se o servidor não aceitar) e lê as extensões."""
+        code, message = await self.command(f"EHLO {DNS_NAME}")
+        if code != 250:
+            await self._expect(f"HELO {DNS_NAME}", (250,))
+            self.extensions = {}
+            return
+
+        self.extensions = {}
+        for line in message.decode("latin-1").splitlines()[1:]:
+            name, _, params = line.partition(" ")
+            self.extensions[name.lower()] = params
+
+    async def login(self):
+        """Autentica com AUTH PLAIN ou AUTH LOGIN."""
+        methods = self.extensions.get("auth", "").upper().split()
+        if "PLAIN" in methods:
+            token = f"\0{self.username}\0{self.password}".encode()
+            code, message = await self.command(
+                "AUTH PLAIN " + base64.b64encode(token).decode("ascii")
+            )
+        elif "LOGIN" in methods:
+            await self._expect("AUTH LOGIN", (334,))
+            await self._expect(
+                base64.b64encode(self.username.encode()).decode(), (334,)
+            )
+            code, message = await self.command(
+                base64.b64encode(self.password.encode()).decode()
+            )
+        else:
+            raise smtplib.SMTPNotSupportedError(
+                "Nenhum método de autenticação suportado pelo servidor"
+            )
+        if code not in (235, 503):
+            raise smtplib.SMTPAuthenticationError(code, message)
+
+    async def noop(self) -> int:
+        code, _ = await self.command("NOOP")
+        return code
+
+    async def sendmail(self, from_addr: str, recipients: list, data: bytes) -> dict:
+        """
+        Envia uma mensagem (MAIL, RCPT, DATA), como `smtplib.SMTP.sendmail`.
+
+        Returns:
+            dict: Destinatários recusados ({endereço: (código, resposta)})
+
+        Raises:
+            SMTPSenderRefused, SMTPRecipientsRefused, SMTPDataError
+        """
+        options = ""
+        if not all(address.isascii() for address in [from_addr, *recipients]):
+            if "smtputf8" not in self.extensions:
+                raise smtplib.SMTPNotSupportedError(
+                    "Endereço não ASCII e o servidor não suporta SMTPUTF8"
+                )
+            options = " SMTPUTF8"
+
+        code, message = await self.command(f"MAIL FROM:<{from_addr}>{options}")
+        if code != 250:
+            await self._reset()
+            raise smtplib.SMTPSenderRefused(code, message, from_addr)
+
+        refused = {}
+        for recipient in recipients:
+            code, message = await self.command(f"RCPT TO:<{recipient}>")
+            if code not in (250, 251):
+                refused[recipient] = (code, message)
+        if len(refused) == len(recipients):
+            await self._reset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, message = await self.command("DATA")
+        if code != 354:
+            await self._reset()
+            raise smtplib.SMTPDataError(code, message)
+
+        payload = _LEADING_PERIOD.sub(b"..", _LINE_ENDINGS.sub(CRLF, data))
+        if not payload.endswith(CRLF):
+            payload += CRLF
+        self._writer.write(payload + b"." + CRLF)
+        await self._drain()
+        code, message = await self._read_reply()
+        if code != 250:
+            await self._reset()
+            raise smtplib.SMTPDataError(code, message)
+        return refused
+
+    async def quit(self):
+        try:
+            await self.command("QUIT")
+        finally:
+            await self.close()
+
+    async def close(self):
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def command(self, line: str) -> tuple:
+        """Envia um comando e retorna a resposta (código, mensagem)."""
+        if not self.is_connected:
+            raise smtplib.SMTPServerDisconnected("Conexão SMTP não está aberta")
+        self._writer.write(line.encode("utf-8") + CRLF)
+        await self._drain()
+        return await self._read_reply()
+
+    async def _expect(self, line: str, codes: tuple):
+        code, message = await self.command(line)
+        if code not in codes:
+            raise smtplib.SMTPResponseException(code, message)
+        return code, message
+
+    async def _reset(self):
+        try:
+            await self.command("RSET")
+        except (smtplib.SMTPServerDisconnected, OSError):
+            pass
+
+    async def _drain(self):
+        await asyncio.wait_for(self._writer.drain(), self.timeout)
+
+    async def _read_reply(self) -> tuple:
+        lines = []
+        while True:
+            try:
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            except ConnectionError as e:
+                await self.close()
+                raise smtplib.SMTPServerDisconnected(str(e)) from e
+            if not line:
+                await self.close()
+                raise smtplib.SMTPServerDisconnected("Conexão fechada pelo servidor")
+            try:
+                code = int(line[:3])
+            except ValueError:
+                await self.close()
+                raise smtplib.SMTPServerDisconnected(f"Resposta inválida: {line!r}")
+            lines.append(line[4:].rstrip(b"\r\n"))
+            if line[3:4] != b"-":
+                return code, b"\n".join(lines)
+
+
+def envelope_address(address: str) -> str:
+    """
+    Extrai o endereço do envelope SMTP de um endereço de cabeçalho.
+
+    Example:
+        >>> envelope_address("João <joao@exemplo.com.br>")
+        "joao@exemplo.com.br"
+    """
+    _, addr = parseaddr(str(address))
+    local, at, domain = addr.rpartition("@")
+    if at and not domain.isascii():
+        domain = domain.encode("idna").decode("ascii")
+        addr = f"{local}@{domain}"
+    return addr
+
+
+def message_bytes(email_message) -> bytes:
+    """Serializa uma `EmailMessage` do Django para o comando DATA."""
+    return email_message.message().as_bytes()
+
+
+@asynccontextmanager
+async def _rate_limited():
+    # Mesmo limitador do envio síncrono, esperando com asyncio.sleep
+    limiter = get_email_rate_limiter()
+    if limiter is None:
+
+        async def throttle():
+            pass
+
+        yield throttle
+        return
+
+    slot = await limiter.aacquire_connection()
+    try:
+        yield limiter.aacquire
+    finally:
+        limiter.release_connection(slot)
+
+
+class AsyncSMTPConnectionPool:
+    """
+    Pool de conexões SMTP assíncronas de um event loop.
+
+    Args:
+        max_size (int, optional): Máximo de conexões abertas ao mesmo tempo
+        idle_timeout (float, optional): Segundos que uma conexão pode ficar
+            ociosa antes de ser descartada
+        **kwargs: Argumentos de `AsyncSMTPConnection` (host, port, ...)
+
+    Atributos:
+        - created (int): Conexões abertas pelo pool.
+        - reused (int): Vezes em que uma conexão ociosa foi reutilizada.
+        - discarded (int): Conexões descartadas (expiradas, mortas ou com erro).
+    """
+
+    def __init__(self, max_size: int = 4, idle_timeout: float = 30.0, **kwargs):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connection_kwargs = kwargs
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(max_size)
+
+    async def acquire(self, timeout: float = None) -> AsyncSMTPConnection:
+        """
+        Retira uma conexão aberta do pool, criando uma nova se necessário.
+
+        Espera (sem bloquear o event loop) enquanto `max_size` conexões
+        estiverem em uso.
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar disponível dentro do timeout
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except TimeoutError:
+            raise TimeoutError("Nenhuma conexão de email disponível no pool")
+
+        try:
+            while self._idle:
+                conn, last_used = self._idle.pop()
+                if (
+                    time.monotonic() - last_used > self.idle_timeout
+                    or not await self._is_alive(conn)
+                ):
+                    await self._close(conn)
+                    continue
+                self.reused += 1
+                return conn
+
+            return await self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn: AsyncSMTPConnection, discard: bool = False):
+        """Devolve uma conexão ao pool (ou a fecha, se `discard`)."""
+        try:
+            if discard or conn is None or not conn.is_connected:
+                await self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Context manager assíncrono que empresta uma conexão do pool.
+
+        Example:
+            >>> async with get_async_email_pool().connection() as conn:
+            ...     await conn.sendmail(from_addr, recipients, data)
+        """
+        async with _rate_limited():
+            conn = await self.acquire()
+            discard = False
+            try:
+                yield conn
+            except RECONNECT_ERRORS:
+                discard = True
+                raise
+            finally:
+                await self.release(conn, discard=discard)
+
+    async def send_messages(self, messages: list, fail_silently: bool = False) -> int:
+        """
+        Envia mensagens por uma conexão do pool, reconectando uma vez por
+        mensagem se a conexão cair (ou o servidor responder 421).
+
+        Args:
+            messages (list): Lista de `EmailMessage`
+            fail_silently (bool, optional): Se True, uma mensagem com erro é
+                registrada e ignorada, e as demais continuam sendo enviadas
+
+        Returns:
+            int: Quantidade de mensagens enviadas
+        """
+        async with _rate_limited() as throttle:
+            sent = 0
+            conn = await self.acquire()
+            try:
+                for message in messages:
+                    try:
+                        await throttle()
+                        try:
+                            if conn is None:
+                                conn = await self._open()
+                            sent += await self._send(conn, message)
+                        except Exception as e:
+                            if not should_reconnect(e):
+                                raise
+                            # Conexão caiu: abre outra e tenta a mensagem novamente
+                            await self._close(conn)
+                            conn = None
+                            conn = await self._open()
+                            sent += await self._send(conn, message)
+                    except Exception as e:
+                        if not fail_silently:
+                            raise
+                        print(f"Erro ao enviar email para {message.recipients()}: {e}")
+            except BaseException:
+                await self.release(conn, discard=True)
+                raise
+
+            await self.release(conn, discard=conn is None)
+            return sent
+
+    async def close_all(self):
+        """Fecha todas as conexões ociosas do pool."""
+        idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            await self._close(conn, graceful=True)
+
+    @staticmethod
+    async def _send(conn: AsyncSMTPConnection, message) -> int:
+        recipients = [envelope_address(addr) for addr in message.recipients()]
+        if not recipients:
+            return 0
+        from_addr = envelope_address(message.from_email)
+        await conn.sendmail(from_addr, recipients, message_bytes(message))
+        return 1
+
+    async def _open(self) -> AsyncSMTPConnection:
+        conn = AsyncSMTPConnection(**self.connection_kwargs)
+        await conn.connect()
+        self.created += 1
+        return conn
+
+    async def _close(self, conn: AsyncSMTPConnection, graceful: bool = False):
+        if conn is None:
+            return
+        self.discarded += 1
+        try:
+            if graceful and conn.is_connected:
+                await conn.quit()
+            else:
+                await conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _is_alive(conn: AsyncSMTPConnection) -> bool:
+        if not conn.is_connected:
+            return False
+        try:
+            return await conn.noop() == 250
+        except Exception:
+            return False
+
+
+_pools = weakref.WeakKeyDictionary()
+
+
+def _connection_kwargs() -> dict:
+    # Mesma configuração do backend SMTP do Django
+    context = None
+    if settings.EMAIL_USE_TLS or settings.EMAIL_USE_SSL:
+        context = ssl.create_default_context()
+        if settings.EMAIL_SSL_CERTFILE:
+            context.load_cert_chain(
+                settings.EMAIL_SSL_CERTFILE, settings.EMAIL_SSL_KEYFILE
+            )
+    return {
+        "host": settings.EMAIL_HOST,
+        "port": settings.EMAIL_PORT,
+        "username": settings.EMAIL_HOST_USER,
+        "password": settings.EMAIL_HOST_PASSWORD,
+        "use_tls": settings.EMAIL_USE_TLS,
+        "use_ssl": settings.EMAIL_USE_SSL,
+        "timeout": settings.EMAIL_TIMEOUT,
+        "ssl_context": context,
+    }
+
+
+def get_async_email_pool() -> AsyncSMTPConnectionPool:
+    """
+    Retorna o pool de conexões assíncronas do event loop atual.
+
+    Conexões do asyncio pertencem ao loop em que foram abertas, então cada
+    loop tem o seu pool (configurado com EMAIL_HOST, EMAIL_PORT, ...).
+
+    Returns:
+        AsyncSMTPConnectionPool: Pool do event loop em execução
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = AsyncSMTPConnectionPool(
+            max_size=settings.EMAIL_POOL_MAX_SIZE,
+            idle_timeout=settings.EMAIL_POOL_IDLE_TIMEOUT,
+            **_connection_kwargs(),
+        )
+        _pools[loop] = pool
+    return pool
+
+
+async def aclose_email_pools():
+    """Fecha as conexões ociosas e descarta o pool do event loop atual."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close_all()
+
+
+async def async_send_email_messages(messages: list, fail_silently: bool = False) -> int:
+    """
+    Versão assíncrona de `utils.email_pool.send_email_messages`.
+
+    Com o backend SMTP do Django, envia pelo cliente assíncrono (pool do
+    event loop, se EMAIL_POOL_ENABLED); com outros backends, usa o envio
+    síncrono em uma thread.
+
+    Args:
+        messages (list): Lista de `EmailMessage`
+        fail_silently (bool, optional): Se True, erros em uma mensagem não
+            interrompem o envio das demais
+
+    Returns:
+        int: Quantidade de mensagens enviadas
+    """
+    if settings.EMAIL_BACKEND != SMTP_BACKEND:
+        return await sync_to_async(send_email_messages)(messages, fail_silently)
+
+    with email_stage("smtp_send"):
+        if settings.EMAIL_POOL_ENABLED:
+            pool = get_async_email_pool()
+            return await pool.send_messages(messages, fail_silently=fail_silently)
+
+        # Sem pool: uma conexão só para estas mensagens
+        pool = AsyncSMTPConnectionPool(max_size=1, **_connection_kwargs())
+        try:
+            return await pool.send_messages(messages, fail_silently=fail_silently)
+        finally:
+            await pool.close_all()
+
+
+def _reset_pools(setting, **kwargs):
+    if setting.startswith("EMAIL_"):
+        # As conexões pertencem aos loops; são fechadas quando o loop as descarta
+        _pools.clear()
+
+
+setting_changed.connect(_reset_pools)
@@ -36,3 +36,49 @@ class EmailType(object):
         (PASSWORD_RESET, "Redefinição de Senha"),
         (NOTIFICATION, "Notificação"),
     )
+
+
+class EmailStatus(object):
+    """Object representando os estados de um email na outbox.
+
+    Atributos:
+        - PENDING (int): Aguardando envio (ou nova tentativa) pelo worker.
+        - SENDING (int): Reservado por um worker e em envio.
+        - SENT (int): Enviado com sucesso.
+        - FAILED (int): Falha definitiva no envio (registrada em EmailDeadLetter).
+    """
+
+    PENDING = 1
+    SENDING = 2
+    SENT = 3
+    FAILED = 4
+
+    EMAIL_STATUS_CHOICES = (
+        (PENDING, "Pendente"),
+        (SENDING, "Enviando"),
+        (SENT, "Enviado"),
+        (FAILED, "Falhou"),
+    )
+
+
+class EmailDigestPriority(object):
+    """Object representando a prioridade de uma notificação no digest.
+
+    Notificações com prioridade a partir de EMAIL_DIGEST_FLUSH_PRIORITY
+    disparam o envio imediato do digest do usuário.
+
+    Atributos:
+        - LOW (int): Pode aguardar a janela do digest.
+        - NORMAL (int): Prioridade padrão.
+        - HIGH (int): Enviada imediatamente, junto com as pendentes.
+    """
+
+    LOW = 1
+    NORMAL = 2
+    HIGH = 3
+
+    EMAIL_DIGEST_PRIORITY_CHOICES = (
+        (LOW, "Baixa"),
+        (NORMAL, "Normal"),
+        (HIGH, "Alta"),
+    )
@@ -0,0 +1,229 @@
+"""
+Anexos de email codificados em blocos e reaproveitados entre mensagens.
+
+Com `EmailMessage.attach()`, o Django guarda o arquivo inteiro em memória e
+codifica o base64 de novo a cada `message()`, ou seja, uma vez por
+destinatário. Aqui o anexo é lido de um caminho ou de um file-like: arquivos
+em disco são mapeados com `mmap` e a codificação é feita em blocos de
+tamanho fixo, sem carregar o arquivo original inteiro. A parte MIME
+resultante (já em base64) é montada uma única vez e anexada como está a todas
+as mensagens que usam o mesmo `EmailAttachment`, como no envio em massa.
+
+Example:
+    >>> report = EmailAttachment("/tmp/relatorio-marco.pdf")
+    >>> send_email(
+    ...     subject="Relatório de março",
+    ...     text_content="Segue o relatório em anexo.",
+    ...     recipient_list=["financeiro@example.com"],
+    ...     attachments=[report],
+    ... )
+    True
+"""
+
+import base64
+import mimetypes
+import mmap
+import os
+import threading
+from email.mime.base import MIMEBase
+from io import BytesIO
+from pathlib import Path
+
+import django
+
+DEFAULT_ATTACHMENT_MIMETYPE = "application/octet-stream"
+
+# Bytes lidos por bloco: múltiplo de 57, para que cada bloco gere linhas
+# completas de 76 caracteres em base64
+ENCODE_CHUNK_SIZE = 57 * 16 * 1024
+
+
+class EmailAttachment:
+    """
+    Anexo lido de um caminho ou file-like, codificado uma única vez.
+
+    A leitura e a codificação acontecem no primeiro `mime_part()`; as chamadas
+    seguintes (em qualquer mensagem) retornam a mesma parte MIME. File-likes
+    são lidos a partir da posição atual e não são fechados.
+
+    Args:
+        source (str | Path | file-like): Caminho do arquivo ou objeto com `read()`
+        filename (str, optional): Nome exibido no email. Se None, usa o nome
+            do arquivo (ou o atributo `name` do file-like)
+        mimetype (str, optional): Tipo MIME. Se None, é deduzido do nome
+
+    Atributos:
+        - filename (str): Nome exibido no email.
+        - mimetype (str): Tipo MIME do anexo.
+        - size (int): Tamanho original em bytes (disponível após a codificação).
+    """
+
+    def __init__(self, source, filename: str = None, mimetype: str = None):
+        if isinstance(source, (str, os.PathLike)):
+            source = Path(source)
+            default_name = source.name
+        else:
+            default_name = os.path.basename(getattr(source, "name", "") or "")
+
+        self.source = source
+        self.filename = filename or default_name or None
+        self.mimetype = (
+            mimetype
+            or (self.filename and mimetypes.guess_type(self.filename)[0])
+            or DEFAULT_ATTACHMENT_MIMETYPE
+        )
+        self.size = None
+        self._part = None
+        self._lock = threading.Lock()
+
+    def mime_part(self):
+        """
+        Retorna a parte MIME do anexo, já codificada em base64.
+
+        Returns:
+            MIMEBase | MIMEPart: Parte aceita por `EmailMessage.attach()`
+        """
+        if self._part is None:
+            with self._lock:
+                if self._part is None:
+                    self._part = self._build_part()
+        return self._part
+
+    def _build_part(self):
+        if isinstance(self.source, Path):
+            payload, self.size = encode_file_base64(self.source)
+        else:
+            payload, self.size = encode_stream_base64(self.source)
+
+        maintype, subtype = self.mimetype.split("/", 1)
+        part = _new_mime_part(maintype, subtype)
+        part.set_payload(payload)
+        part["Content-Transfer-Encoding"] = "base64"
+        if self.filename:
+            try:
+                self.filename.encode("ascii")
+                filename = self.filename
+            except UnicodeEncodeError:
+                filename = ("utf-8", "", self.filename)
+            part.add_header("Content-Disposition", "attachment", filename=filename)
+        return part
+
+    def __getstate__(self):
+        # Permite enviar o anexo já codificado para outros processos
+        state = self.__dict__.copy()
+        del state["_lock"]
+        if state["_part"] is not None:
+            # Depois de codificado, o arquivo de origem não é mais necessário
+            state["source"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _new_mime_part(maintype: str, subtype: str):
+    if django.VERSION >= (6, 0):
+        # Django 6 monta as mensagens com a API moderna (MIMEPart)
+        from email.message import MIMEPart
+
+        part = MIMEPart()
+        part["Content-Type"] = f"{maintype}/{subtype}"
+        return part
+    return MIMEBase(maintype, subtype)
+
+
+def encode_file_base64(path, chunk_size: int = ENCODE_CHUNK_SIZE) -> tuple:
+    """
+    Codifica um arquivo em base64 (linhas de 76 caracteres) usando `mmap`.
+
+    O arquivo é mapeado em memória e codificado em blocos, então só um bloco
+    do original é copiado por vez.
+
+    Args:
+        path (str | Path): Caminho do arquivo
+        chunk_size (int, optional): Bytes por bloco (múltiplo de 57)
+
+    Returns:
+        tuple: (payload base64 como str, tamanho original em bytes)
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # mmap não aceita arquivos vazios
+            return "", 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pieces = [
+                base64.encodebytes(mapped[offset : offset + chunk_size]).decode("ascii")
+                for offset in range(0, size, chunk_size)
+            ]
+    return "".join(pieces), size
+
+
+def encode_stream_base64(stream, chunk_size: int = ENCODE_CHUNK_SIZE) -> tuple:
+    """
+    Codifica em base64 o conteúdo de um file-like, lendo em blocos.
+
+    Args:
+        stream: Objeto com `read(n)`. Texto é codificado em UTF-8
+        chunk_size (int, optional): Bytes por bloco (múltiplo de 57)
+
+    Returns:
+        tuple: (payload base64 como str, tamanho original em bytes)
+    """
+    pieces = []
+    size = 0
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        size += len(chunk)
+        pending += chunk
+        # read() pode retornar menos que chunk_size; só codifica linhas completas
+        complete = len(pending) - len(pending) % 57
+        if complete:
+            pieces.append(base64.encodebytes(pending[:complete]).decode("ascii"))
+            pending = pending[complete:]
+    if pending:
+        pieces.append(base64.encodebytes(pending).decode("ascii"))
+    return "".join(pieces), size
+
+
+def as_email_attachment(attachment) -> EmailAttachment:
+    """
+    Normaliza os formatos aceitos em `attachments` para `EmailAttachment`.
+
+    Args:
+        attachment: `EmailAttachment`, caminho, file-like ou tupla
+            (filename, content, mimetype) no formato do Django
+
+    Returns:
+        EmailAttachment: Anexo pronto para `mime_part()`
+    """
+    if isinstance(attachment, EmailAttachment):
+        return attachment
+    if isinstance(attachment, tuple):
+        filename, content, mimetype = (tuple(attachment) + (None,))[:3]
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return EmailAttachment(BytesIO(content), filename, mimetype)
+    return EmailAttachment(attachment)
+
+
+def prepare_email_attachments(attachments) -> list:
+    """
+    Converte e codifica os anexos uma única vez, para uso em várias mensagens.
+
+    Args:
+        attachments (list): Itens aceitos por `as_email_attachment`
+
+    Returns:
+        list: `EmailAttachment` já codificados
+    """
+    prepared = [as_email_attachment(item) for item in attachments or []]
+    for attachment in prepared:
+        attachment.mime_part()
+    return prepared
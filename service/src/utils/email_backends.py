@@ -0,0 +1,393 @@
+"""
+Backend de email com vários servidores SMTP, failover e roteamento por saúde.
+
+Com um único EMAIL_HOST, um servidor degradado faz cada `send_email` esperar
+o timeout inteiro do socket. O `FailoverEmailBackend` recebe uma lista
+ordenada de backends (EMAIL_FAILOVER_BACKENDS) e, para cada mensagem:
+
+- escolhe um backend saudável, na ordem configurada (estratégia "failover")
+  ou por sorteio com peso inversamente proporcional à latência média
+  (estratégia "latency"): os mais rápidos recebem mais mensagens, mas todos
+  continuam recebendo tráfego e tendo a latência medida;
+- se o envio falhar por um erro do servidor (conexão, timeout, SMTP 4xx),
+  tenta o próximo backend. Erros da própria mensagem (SMTP 5xx) não trocam
+  de backend;
+- acompanha por backend a latência e a taxa de erro (médias móveis
+  exponenciais) e abre o circuit breaker após EMAIL_FAILOVER_FAILURE_THRESHOLD
+  falhas seguidas ou com taxa de erro acima de EMAIL_FAILOVER_MAX_ERROR_RATE.
+  Com o circuito aberto o backend é ignorado por EMAIL_FAILOVER_COOLDOWN
+  segundos; depois disso, uma única mensagem de teste decide se ele volta.
+
+O estado de saúde é compartilhado pelas conexões do mesmo processo (inclusive
+as do pool de `utils.email_pool`).
+
+Example:
+    EMAIL_BACKEND=utils.email_backends.FailoverEmailBackend
+    EMAIL_FAILOVER_BACKENDS='[
+        {"name": "primario", "host": "smtp.provedor-a.com", "port": 587,
+         "username": "...", "password": "...", "use_tls": true},
+        {"name": "reserva", "host": "smtp.provedor-b.com", "port": 587,
+         "username": "...", "password": "...", "use_tls": true}
+    ]'
+"""
+
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.signals import setting_changed
+
+from utils.email_metrics import get_email_metrics
+
+DEFAULT_CHILD_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+FAILOVER_STRATEGY = "failover"
+LATENCY_STRATEGY = "latency"
+
+# Latência mínima considerada no peso da estratégia "latency" (segundos)
+MIN_WEIGHT_LATENCY = 0.001
+
+
+class BackendHealth:
+    """
+    Saúde de um backend: latência e taxa de erro (EWMA) e circuit breaker.
+
+    Args:
+        name (str): Identificação do backend
+        alpha (float): Peso da amostra mais recente nas médias móveis
+        failure_threshold (int): Falhas seguidas que abrem o circuito
+        max_error_rate (float): Taxa de erro média que abre o circuito
+        cooldown (float): Segundos com o circuito aberto antes de um novo teste
+
+    Atributos:
+        - latency (float | None): Latência média dos envios, em segundos.
+        - error_rate (float): Taxa de erro média (0 a 1).
+        - consecutive_failures (int): Falhas desde o último sucesso.
+        - opened_at (float | None): Quando o circuito foi aberto (monotonic).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+    ):
+        self.name = name
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Estado do circuito: "closed", "open" ou "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def try_acquire(self) -> bool:
+        """
+        Indica se o backend pode receber uma mensagem agora.
+
+        No estado "half_open", só uma mensagem de teste é liberada por vez.
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        with self._lock:
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, latency: float):
+        """Registra um envio bem-sucedido e fecha o circuito."""
+        with self._lock:
+            self._update(latency, error=0.0)
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self, latency: float):
+        """Registra uma falha do servidor e abre o circuito se necessário."""
+        with self._lock:
+            self._update(latency, error=1.0)
+            self.consecutive_failures += 1
+            if (
+                self._probing
+                or self.consecutive_failures >= self.failure_threshold
+                or (
+                    self.samples >= self.failure_threshold
+                    and self.error_rate >= self.max_error_rate
+                )
+            ):
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def _update(self, latency: float, error: float):
+        self.samples += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self.error_rate += self.alpha * (error - self.error_rate)
+
+    def snapshot(self) -> dict:
+        """Retorna o estado atual como dict (diagnóstico)."""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 4),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_backend_health(name: str) -> BackendHealth:
+    """Retorna o estado de saúde do backend `name`, compartilhado pelo processo."""
+    health = _health.get(name)
+    if health is None:
+        with _health_lock:
+            health = _health.get(name)
+            if health is None:
+                health = BackendHealth(
+                    name,
+                    alpha=settings.EMAIL_FAILOVER_EWMA_ALPHA,
+                    failure_threshold=settings.EMAIL_FAILOVER_FAILURE_THRESHOLD,
+                    max_error_rate=settings.EMAIL_FAILOVER_MAX_ERROR_RATE,
+                    cooldown=settings.EMAIL_FAILOVER_COOLDOWN,
+                )
+                _health[name] = health
+    return health
+
+
+def email_backend_health() -> list:
+    """
+    Retorna a saúde dos backends usados por este processo.
+
+    Example:
+        >>> email_backend_health()
+        [{"name": "primario", "state": "open", "latency": 9.8, ...},
+         {"name": "reserva", "state": "closed", "latency": 0.21, ...}]
+    """
+    return [health.snapshot() for health in list(_health.values())]
+
+
+def reset_email_backend_health():
+    """Descarta o estado de saúde de todos os backends."""
+    with _health_lock:
+        _health.clear()
+
+
+class _BackendUnavailable(Exception):
+    def __init__(self, error: Exception):
+        super().__init__(str(error))
+        self.error = error
+
+
+class FailoverEmailBackend(BaseEmailBackend):
+    """
+    Backend que distribui as mensagens entre vários backends, com failover.
+
+    As conexões com cada backend são abertas sob demanda e mantidas abertas
+    até `close()`, então o backend pode ser usado pelo pool de conexões.
+
+    Args:
+        backends (list, optional): Configuração de cada backend (dicts com
+            "name", "backend" e os argumentos de `get_connection`, como host,
+            port, username, password, use_tls, use_ssl e timeout). Se None, usa
+            EMAIL_FAILOVER_BACKENDS
+        strategy (str, optional): "failover" ou "latency". Se None, usa
+            EMAIL_FAILOVER_STRATEGY
+        fail_silently (bool, optional): Se True, falhas não geram exceção
+    """
+
+    def __init__(
+        self,
+        backends: list = None,
+        strategy: str = None,
+        fail_silently: bool = False,
+        **kwargs,
+    ):
+        super().__init__(fail_silently=fail_silently)
+        if backends is None:
+            backends = settings.EMAIL_FAILOVER_BACKENDS
+        if not backends:
+            # Sem lista configurada: um único backend com EMAIL_HOST/EMAIL_PORT
+            backends = [{"name": "default", **kwargs}]
+
+        self.strategy = strategy or settings.EMAIL_FAILOVER_STRATEGY
+        self.configs = [self._normalize(i, config) for i, config in enumerate(backends)]
+        self._connections = {}
+
+    @staticmethod
+    def _normalize(index: int, config: dict) -> dict:
+        config = dict(config)
+        config.setdefault("backend", DEFAULT_CHILD_BACKEND)
+        if config["backend"] == DEFAULT_CHILD_BACKEND:
+            config.setdefault("timeout", settings.EMAIL_FAILOVER_TIMEOUT)
+        if "name" not in config:
+            host = config.get("host", settings.EMAIL_HOST)
+            config["name"] = f"{host}:{config.get('port', settings.EMAIL_PORT)}#{index}"
+        return config
+
+    def open(self):
+        # As conexões são abertas na primeira mensagem de cada backend, para
+        # que um servidor fora do ar não atrase quem nem vai usá-lo
+        return False
+
+    def close(self):
+        connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def send_messages(self, email_messages) -> int:
+        """
+        Envia as mensagens, cada uma pelo melhor backend disponível.
+
+        Returns:
+            int: Quantidade de mensagens enviadas
+        """
+        sent = 0
+        for message in email_messages:
+            try:
+                sent += self._send(message)
+            except Exception:
+                if not self.fail_silently:
+                    raise
+        return sent
+
+    def _ordered(self) -> list:
+        healths = [
+            (config, get_backend_health(config["name"])) for config in self.configs
+        ]
+        if self.strategy == LATENCY_STRATEGY:
+            # Backends ainda sem medição primeiro, depois sorteados pela latência
+            unmeasured = [item for item in healths if item[1].latency is None]
+            measured = [item for item in healths if item[1].latency is not None]
+            return unmeasured + _weighted_by_latency(measured)
+        return healths
+
+    def _send(self, message) -> int:
+        ordered = self._ordered()
+        last_error = None
+        for config, health in ordered:
+            if not health.try_acquire():
+                continue
+            try:
+                return self._attempt(config, health, message, last_error is not None)
+            except _BackendUnavailable as e:
+                last_error = e.error
+
+        if last_error is None:
+            # Todos com circuito aberto: tenta o que falhou há mais tempo
+            config, health = min(ordered, key=lambda item: item[1].opened_at or 0.0)
+            try:
+                return self._attempt(config, health, message, False)
+            except _BackendUnavailable as e:
+                last_error = e.error
+        raise last_error
+
+    def _attempt(self, config: dict, health: BackendHealth, message, failover: bool):
+        from utils.email_retry import is_transient_email_error
+
+        metrics = get_email_metrics()
+        started = time.perf_counter()
+        try:
+            sent = self._connection(config).send_messages([message]) or 0
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            if not is_transient_email_error(e):
+                # Erro da mensagem (ex.: destinatário recusado): o servidor respondeu
+                health.record_success(elapsed)
+                raise
+            health.record_failure(elapsed)
+            self._discard(config)
+            print(f"Erro ao enviar email pelo backend {config['name']}: {e}")
+            if metrics.enabled:
+                metrics.increment(
+                    "email.backend.failures", tags={"backend": config["name"]}
+                )
+            raise _BackendUnavailable(e)
+
+        elapsed = time.perf_counter() - started
+        health.record_success(elapsed)
+        if metrics.enabled:
+            metrics.timing(
+                "email.backend.duration",
+                elapsed,
+                {"backend": config["name"], "failover": failover},
+            )
+        return sent
+
+    def _connection(self, config: dict):
+        name = config["name"]
+        conn = self._connections.get(name)
+        if conn is None:
+            kwargs = {
+                key: value
+                for key, value in config.items()
+                if key not in ("name", "backend")
+            }
+            conn = get_connection(config["backend"], fail_silently=False, **kwargs)
+            conn.open()
+            self._connections[name] = conn
+        return conn
+
+    def _discard(self, config: dict):
+        conn = self._connections.pop(config["name"], None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _weighted_by_latency(healths: list) -> list:
+    """
+    Ordena (config, health) por sorteio sem reposição, com peso 1/latência.
+
+    Um backend com metade da latência de outro tem o dobro de chance de vir
+    primeiro; os demais ficam na ordem sorteada, como alternativas de failover.
+    """
+    remaining = list(healths)
+    ordered = []
+    while remaining:
+        weights = [
+            1.0 / max(health.latency, MIN_WEIGHT_LATENCY) for _, health in remaining
+        ]
+        index = random.choices(range(len(remaining)), weights=weights)[0]
+        ordered.append(remaining.pop(index))
+    return ordered
+
+
+def _reset_health(setting, **kwargs):
+    if setting.startswith("EMAIL_FAILOVER_"):
+        reset_email_backend_health()
+
+
+setting_changed.connect(_reset_health)
@@ -0,0 +1,203 @@
+"""
+Digest de notificações: várias notificações do mesmo usuário em um único email.
+
+Com o digest ativo (EMAIL_DIGEST_ENABLED ou `send_notification_email(...,
+digest=True)`), as notificações ficam na tabela `EmailDigestEntry` e são
+enviadas juntas quando:
+
+- a notificação mais antiga do usuário completa EMAIL_DIGEST_WINDOW segundos
+  (comando `python manage.py flush_email_digests`);
+- o usuário acumula EMAIL_DIGEST_MAX_ITEMS notificações; ou
+- chega uma notificação com prioridade a partir de EMAIL_DIGEST_FLUSH_PRIORITY.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from utils.constants import EmailDigestPriority
+from utils.models import EmailDigestEntry
+
+
+def queue_digest_notification(
+    user,
+    notification_title: str,
+    notification_message: str,
+    action_url: str = None,
+    action_label: str = "Ver Detalhes",
+    priority: int = EmailDigestPriority.NORMAL,
+) -> bool:
+    """
+    Acumula uma notificação no digest do usuário, enviando-o se um limite for atingido.
+
+    Args:
+        user: Objeto do usuário (Profile)
+        notification_title (str): Título da notificação
+        notification_message (str): Mensagem da notificação
+        action_url (str, optional): URL para ação relacionada
+        action_label (str, optional): Label do botão de ação
+        priority (int, optional): Prioridade (`EmailDigestPriority`)
+
+    Returns:
+        bool: True se a notificação foi registrada. Uma falha no envio do
+        digest não muda o resultado: a notificação continua pendente ou fica
+        com a outbox/dead-letter (ver `flush_user_digest`)
+    """
+    try:
+        EmailDigestEntry.objects.create(
+            user=user,
+            title=notification_title,
+            message=notification_message,
+            action_url=action_url,
+            action_label=action_label or "",
+            priority=priority,
+        )
+    except Exception as e:
+        print(f"Erro ao registrar notificação no digest: {e}")
+        return False
+
+    if (
+        priority >= settings.EMAIL_DIGEST_FLUSH_PRIORITY
+        or EmailDigestEntry.objects.filter(user=user).count()
+        >= settings.EMAIL_DIGEST_MAX_ITEMS
+    ):
+        flush_user_digest(user.pk)
+    return True
+
+
+def flush_user_digest(user_id: int):
+    """
+    Envia em um único email todas as notificações pendentes do usuário.
+
+    As notificações são reservadas (`SELECT ... FOR UPDATE SKIP LOCKED`) e
+    removidas em uma transação curta, e o email é montado e enviado depois do
+    commit, sem manter locks durante o SMTP; dois processos nunca enviam a
+    mesma notificação. Se a renderização falhar, as notificações voltam para
+    a tabela e são enviadas no próximo flush. Depois que o email foi montado,
+    as novas tentativas ficam com a outbox ou com a dead-letter (ver
+    `utils.email_outbox.retry_failed_email`), e as notificações não voltam,
+    para que o digest não seja enviado duas vezes.
+
+    Args:
+        user_id (int): ID do usuário
+
+    Returns:
+        bool | None: True se o email foi enviado (ou gravado na outbox), False
+        se falhou, ou None se não havia notificações
+    """
+    from utils.email_metrics import record_email_outcome
+    from utils.email_outbox import enqueue_email
+    from utils.emails import _deliver_email_message, build_email_message
+
+    with transaction.atomic():
+        entries = list(
+            EmailDigestEntry.objects.select_for_update(skip_locked=True)
+            .select_related("user")
+            .filter(user_id=user_id)
+            .order_by("id")
+        )
+        if not entries:
+            return None
+        EmailDigestEntry.objects.filter(pk__in=[e.pk for e in entries]).delete()
+
+    user = entries[0].user
+    user_name = user.get_full_name() or user.username
+    try:
+        subject, text_content, html_content = build_digest_content(user_name, entries)
+        if settings.EMAIL_ASYNC_ENABLED:
+            enqueue_email(
+                subject=subject,
+                text_content=text_content,
+                recipient_list=[user.email],
+                html_content=html_content,
+            )
+            record_email_outcome("queued")
+            return True
+        msg = build_email_message(
+            subject=subject,
+            text_content=text_content,
+            recipient_list=[user.email],
+            html_content=html_content,
+        )
+    except Exception as e:
+        print(f"Erro ao montar o digest de notificações: {e}")
+        _restore_entries(entries)
+        return False
+
+    return _deliver_email_message(msg)
+
+
+def _restore_entries(entries: list):
+    # Devolve as notificações reservadas, com os mesmos IDs e datas
+    try:
+        EmailDigestEntry.objects.bulk_create(entries)
+    except Exception as e:
+        print(f"Erro ao devolver notificações ao digest: {e}")
+
+
+def flush_due_digests(window: int = None) -> dict:
+    """
+    Envia os digests cuja notificação mais antiga já completou a janela.
+
+    Args:
+        window (int, optional): Janela em segundos. Se None, usa EMAIL_DIGEST_WINDOW
+
+    Returns:
+        dict: {"sent": int, "failed": int} (quantidade de digests)
+    """
+    if window is None:
+        window = settings.EMAIL_DIGEST_WINDOW
+
+    cutoff = timezone.now() - timedelta(seconds=window)
+    user_ids = (
+        EmailDigestEntry.objects.values("user_id")
+        .annotate(oldest=Min("created_at"))
+        .filter(oldest__lte=cutoff)
+        .values_list("user_id", flat=True)
+    )
+
+    summary = {"sent": 0, "failed": 0}
+    for user_id in list(user_ids):
+        result = flush_user_digest(user_id)
+        if result is None:
+            continue
+        summary["sent" if result else "failed"] += 1
+    return summary
+
+
+def build_digest_content(user_name: str, entries: list) -> tuple:
+    """
+    Monta (assunto, texto plano, HTML) do digest com o template `emails/digest.html`.
+
+    Um digest com uma única notificação usa o mesmo conteúdo de
+    `send_notification_email`.
+
+    Args:
+        user_name (str): Nome exibido na saudação
+        entries (list): Notificações (`EmailDigestEntry`) em ordem de criação
+
+    Returns:
+        tuple: (assunto, texto plano, HTML)
+    """
+    from utils.email_templates import render_email_html, render_email_text
+    from utils.emails import _build_notification_content
+
+    if len(entries) == 1:
+        entry = entries[0]
+        return _build_notification_content(
+            user_name,
+            entry.title,
+            entry.message,
+            entry.action_url,
+            entry.action_label or "Ver Detalhes",
+        )
+
+    subject = f"Você tem {len(entries)} novas notificações - ArmoredDjango"
+    context = {"user_name": user_name, "notifications": entries}
+    text_content = render_email_text("digest", **context)
+    html_content = render_email_html("digest", **context)
+
+    return subject, text_content, html_content
@@ -3,6 +3,10 @@ Exemplos práticos de uso do sistema de emails do ArmoredDjango.
 
 Este arquivo contém scripts de exemplo para os principais cenários de envio de email.
 Copie e adapte conforme necessário para seu projeto.
+
+Os emails customizados usam templates Jinja2 em
+`utils/templates/emails/examples/`, que estendem o layout base
+(ver `utils.email_templates`), em vez de montar o HTML no código.
 """
 
 from django.contrib.auth import get_user_model
@@ -12,15 +16,40 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import default_token_generator
 
+from utils.email_templates import (
+    get_email_environment,
+    render_email_html,
+    render_email_text,
+)
 from utils.emails import (
     send_welcome_email,
     send_password_reset_email,
     send_notification_email,
     send_email,
-    build_email_html,
 )
 
 
+def _render_example(template_name, **context):
+    """
+    Renderiza (HTML, texto plano) de um template de exemplo em
+    `utils/templates/emails/examples/`.
+    """
+    path = f"emails/examples/{template_name}"
+    return (
+        render_email_html(f"{path}.html", **context),
+        render_email_text(f"{path}.txt", **context),
+    )
+
+
+def _render_message(template_name, **context):
+    """
+    Renderiza um trecho HTML (com autoescape) usado como mensagem de
+    `send_notification_email`.
+    """
+    env = get_email_environment()
+    return env.get_template(f"emails/examples/{template_name}.html").render(context)
+
+
 # ==============================================================================
 # 1. EMAIL DE CADASTRO / BOAS-VINDAS
 # ==============================================================================
@@ -69,89 +98,13 @@ def exemplo_email_cadastro_completo_customizado(user, request):
     domain = get_current_site(request).domain
     user_name = user.get_full_name() or user.username
     
-    # Conteúdo do cabeçalho
-    header_content = """
-        <div style="text-align: center;">
-            <h1 style="color: #00529C;">Bem-vindo ao ArmoredDjango!</h1>
-            <p style="color: #666;">Sua jornada começa aqui</p>
-        </div>
-    """
-    
-    # Conteúdo principal
-    body_content = f"""
-        <p style="font-size: 16px;">
-            Olá <strong>{user_name}</strong>,
-        </p>
-        
-        <p style="font-size: 15px;">
-            É um prazer ter você conosco! Seu cadastro foi realizado com sucesso.
-        </p>
-        
-        <div style="background-color: #f0f9ff; border-left: 4px solid #00529C; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-weight: bold; color: #00529C;">
-                🎁 Bônus de Boas-Vindas
-            </p>
-            <p style="margin: 8px 0 0 0; font-size: 14px;">
-                Ganhe 30 dias de acesso premium gratuitamente!
-            </p>
-        </div>
-        
-        <h3 style="color: #00529C; margin-top: 32px;">Próximos Passos:</h3>
-        <ol style="font-size: 14px; line-height: 1.8;">
-            <li>Complete seu perfil</li>
-            <li>Explore nossos recursos</li>
-            <li>Configure suas preferências</li>
-        </ol>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="https://{domain}/dashboard" 
-               style="display: inline-block; padding: 12px 32px;
-                      background-color: #00529C; color: #ffffff;
-                      text-decoration: none; border-radius: 4px; font-size: 16px;">
-                Acessar Meu Painel
-            </a>
-        </div>
-        
-        <p style="font-size: 14px; color: #666; margin-top: 32px;">
-            Se tiver dúvidas, nossa equipe está à disposição para ajudar.
-        </p>
-        
-        <div style="margin-top: 32px; font-size: 14px;">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """
-    
-    # Monta HTML completo
-    html_content = build_email_html(
-        title="Bem-vindo ao ArmoredDjango",
-        header_content=header_content,
-        body_content=body_content,
+    # HTML e texto plano de utils/templates/emails/examples/welcome_bonus.*
+    html_content, text_content = _render_example(
+        "welcome_bonus",
+        user_name=user_name,
+        dashboard_url=f"https://{domain}/dashboard",
     )
     
-    # Versão texto plano (fallback)
-    text_content = f"""
-    Olá {user_name},
-    
-    É um prazer ter você conosco! Seu cadastro foi realizado com sucesso.
-    
-    🎁 BÔNUS DE BOAS-VINDAS
-    Ganhe 30 dias de acesso premium gratuitamente!
-    
-    PRÓXIMOS PASSOS:
-    1. Complete seu perfil
-    2. Explore nossos recursos
-    3. Configure suas preferências
-    
-    Acesse seu painel: https://{domain}/dashboard
-    
-    Se tiver dúvidas, nossa equipe está à disposição para ajudar.
-    
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """
-    
     return send_email(
         subject="🎉 Bem-vindo ao ArmoredDjango!",
         text_content=text_content,
@@ -204,90 +157,14 @@ def exemplo_email_recuperacao_senha_com_expiracao(user, request, tempo_expiracao
     
     user_name = user.get_full_name() or user.username
     
-    # Cabeçalho
-    header_content = """
-        <div style="text-align: center;">
-            <h1 style="color: #00529C;">Redefinição de Senha</h1>
-            <p style="color: #666;">Solicitação de nova senha</p>
-        </div>
-    """
-    
-    # Corpo com informação de expiração
-    body_content = f"""
-        <p style="font-size: 16px;">
-            Olá <strong>{user_name}</strong>,
-        </p>
-        
-        <p style="font-size: 15px;">
-            Recebemos uma solicitação para redefinir sua senha.
-        </p>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="{reset_url}" 
-               style="display: inline-block; padding: 12px 32px;
-                      background-color: #00529C; color: #ffffff;
-                      text-decoration: none; border-radius: 4px; font-size: 16px;">
-                Redefinir Minha Senha
-            </a>
-        </div>
-        
-        <div style="background-color: #fff3cd; border-left: 4px solid #ffc107; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-weight: bold; color: #856404;">
-                ⏰ Atenção ao Prazo
-            </p>
-            <p style="margin: 8px 0 0 0; font-size: 14px; color: #856404;">
-                Este link é válido por apenas <strong>{tempo_expiracao}</strong>.
-                Após esse período, será necessário solicitar um novo link.
-            </p>
-        </div>
-        
-        <p style="font-size: 13px; color: #666;">
-            Ou copie e cole o link abaixo no seu navegador:
-        </p>
-        <p style="font-size: 12px; color: #00529C; word-break: break-all;">
-            {reset_url}
-        </p>
-        
-        <div style="background-color: #f8d7da; border-left: 4px solid #dc3545; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-weight: bold; color: #721c24;">
-                🔒 Aviso de Segurança
-            </p>
-            <p style="margin: 8px 0 0 0; font-size: 14px; color: #721c24;">
-                Se você não solicitou esta redefinição, ignore este email.
-                Sua senha permanecerá a mesma e nenhuma alteração será feita.
-            </p>
-        </div>
-        
-        <div style="margin-top: 32px; font-size: 14px;">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """
-    
-    html_content = build_email_html(
-        title="Redefinição de Senha",
-        header_content=header_content,
-        body_content=body_content,
+    # Corpo com informação de expiração (emails/examples/password_reset_expiring.*)
+    html_content, text_content = _render_example(
+        "password_reset_expiring",
+        user_name=user_name,
+        reset_url=reset_url,
+        tempo_expiracao=tempo_expiracao,
     )
     
-    text_content = f"""
-    Olá {user_name},
-    
-    Recebemos uma solicitação para redefinir sua senha.
-    
-    Para criar uma nova senha, acesse o link abaixo:
-    {reset_url}
-    
-    ⏰ ATENÇÃO: Este link é válido por apenas {tempo_expiracao}.
-    
-    🔒 SEGURANÇA: Se você não solicitou esta redefinição, ignore este email.
-    
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """
-    
     return send_email(
         subject="Redefinição de Senha - ArmoredDjango",
         text_content=text_content,
@@ -334,13 +211,7 @@ def exemplo_notificacao_pagamento_aprovado(user, valor, pedido_id):
     
     Quando usar: Após confirmação de pagamento.
     """
-    mensagem = f"""
-    Seu pagamento de <strong>R$ {valor:.2f}</strong> foi aprovado com sucesso!
-    
-    <p style="font-size: 14px; color: #666; margin-top: 16px;">
-    Você já pode acessar seu pedido e acompanhar o status da entrega.
-    </p>
-    """
+    mensagem = _render_message("payment_approved_message", valor=valor)
     
     return send_notification_email(
         user=user,
@@ -359,94 +230,15 @@ def exemplo_notificacao_login_novo_dispositivo(user, dispositivo, localizacao, i
     """
     user_name = user.get_full_name() or user.username
     
-    header_content = """
-        <div style="text-align: center;">
-            <h1 style="color: #dc3545;">⚠️ Alerta de Segurança</h1>
-            <p style="color: #666;">Novo acesso detectado</p>
-        </div>
-    """
-    
-    body_content = f"""
-        <p style="font-size: 16px;">
-            Olá <strong>{user_name}</strong>,
-        </p>
-        
-        <p style="font-size: 15px;">
-            Detectamos um novo acesso à sua conta de um dispositivo não reconhecido.
-        </p>
-        
-        <div style="background-color: #f8f9fa; border: 1px solid #dee2e6; 
-                    padding: 16px; margin: 24px 0; border-radius: 4px;">
-            <h3 style="margin: 0 0 12px 0; color: #333;">Detalhes do Acesso:</h3>
-            <table style="width: 100%; font-size: 14px;">
-                <tr>
-                    <td style="padding: 8px 0; color: #666;"><strong>Dispositivo:</strong></td>
-                    <td style="padding: 8px 0;">{dispositivo}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 8px 0; color: #666;"><strong>Localização:</strong></td>
-                    <td style="padding: 8px 0;">{localizacao}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 8px 0; color: #666;"><strong>IP:</strong></td>
-                    <td style="padding: 8px 0;">{ip}</td>
-                </tr>
-            </table>
-        </div>
-        
-        <div style="background-color: #f8d7da; border-left: 4px solid #dc3545; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-weight: bold; color: #721c24;">
-                Foi você?
-            </p>
-            <p style="margin: 8px 0 0 0; font-size: 14px; color: #721c24;">
-                Se você reconhece este acesso, pode ignorar este email.
-                Caso contrário, recomendamos alterar sua senha imediatamente.
-            </p>
-        </div>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="https://example.com/security/change-password" 
-               style="display: inline-block; padding: 12px 32px;
-                      background-color: #dc3545; color: #ffffff;
-                      text-decoration: none; border-radius: 4px; font-size: 16px;">
-                Alterar Senha Agora
-            </a>
-        </div>
-        
-        <div style="margin-top: 32px; font-size: 14px;">
-            <p>Atenciosamente,<br>
-            <strong>Equipe de Segurança ArmoredDjango</strong></p>
-        </div>
-    """
-    
-    html_content = build_email_html(
-        title="Alerta de Segurança",
-        header_content=header_content,
-        body_content=body_content,
+    html_content, text_content = _render_example(
+        "new_device_login",
+        user_name=user_name,
+        dispositivo=dispositivo,
+        localizacao=localizacao,
+        ip=ip,
+        change_password_url="https://example.com/security/change-password",
     )
     
-    text_content = f"""
-    ⚠️ ALERTA DE SEGURANÇA
-    
-    Olá {user_name},
-    
-    Detectamos um novo acesso à sua conta de um dispositivo não reconhecido.
-    
-    DETALHES DO ACESSO:
-    - Dispositivo: {dispositivo}
-    - Localização: {localizacao}
-    - IP: {ip}
-    
-    FOI VOCÊ?
-    Se você reconhece este acesso, pode ignorar este email.
-    Caso contrário, altere sua senha imediatamente:
-    https://example.com/security/change-password
-    
-    Atenciosamente,
-    Equipe de Segurança ArmoredDjango
-    """
-    
     return send_email(
         subject="⚠️ Alerta de Segurança - Novo Dispositivo Detectado",
         text_content=text_content,
@@ -467,73 +259,12 @@ def exemplo_email_confirmacao_email(user, confirmation_url):
     """
     user_name = user.get_full_name() or user.username
     
-    header_content = """
-        <div style="text-align: center;">
-            <h1 style="color: #00529C;">Confirme seu Email</h1>
-            <p style="color: #666;">Último passo para ativar sua conta</p>
-        </div>
-    """
-    
-    body_content = f"""
-        <p style="font-size: 16px;">
-            Olá <strong>{user_name}</strong>,
-        </p>
-        
-        <p style="font-size: 15px;">
-            Para ativar sua conta e acessar todos os recursos, 
-            precisamos confirmar seu endereço de email.
-        </p>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="{confirmation_url}" 
-               style="display: inline-block; padding: 12px 32px;
-                      background-color: #28a745; color: #ffffff;
-                      text-decoration: none; border-radius: 4px; font-size: 16px;">
-                Confirmar Meu Email
-            </a>
-        </div>
-        
-        <p style="font-size: 13px; color: #666;">
-            Ou copie e cole o link abaixo no seu navegador:
-        </p>
-        <p style="font-size: 12px; color: #00529C; word-break: break-all;">
-            {confirmation_url}
-        </p>
-        
-        <div style="background-color: #fff8e1; border-left: 4px solid #ffc107; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-size: 14px; color: #856404;">
-                Se você não se cadastrou em nosso sistema, pode ignorar este email.
-            </p>
-        </div>
-        
-        <div style="margin-top: 32px; font-size: 14px;">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """
-    
-    html_content = build_email_html(
-        title="Confirme seu Email",
-        header_content=header_content,
-        body_content=body_content,
+    html_content, text_content = _render_example(
+        "email_confirmation",
+        user_name=user_name,
+        confirmation_url=confirmation_url,
     )
     
-    text_content = f"""
-    Olá {user_name},
-    
-    Para ativar sua conta e acessar todos os recursos, 
-    precisamos confirmar seu endereço de email.
-    
-    Confirme seu email acessando:
-    {confirmation_url}
-    
-    Se você não se cadastrou em nosso sistema, pode ignorar este email.
-    
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """
-    
     return send_email(
         subject="✉️ Confirme seu Email - ArmoredDjango",
         text_content=text_content,
@@ -548,19 +279,9 @@ def exemplo_email_mudanca_senha_confirmacao(user):
     
     Quando usar: Logo após o usuário alterar a senha com sucesso.
     """
-    user_name = user.get_full_name() or user.username
-    
-    mensagem = f"""
-    Sua senha foi alterada com sucesso em {user.last_login or 'agora'}.
-    
-    <div style="background-color: #d1ecf1; border-left: 4px solid #17a2b8; 
-                padding: 16px; margin: 24px 0;">
-        <p style="margin: 0; font-size: 14px; color: #0c5460;">
-            Se você não reconhece esta alteração, entre em contato com 
-            nossa equipe de suporte imediatamente.
-        </p>
-    </div>
-    """
+    mensagem = _render_message(
+        "password_changed_message", alterada_em=user.last_login
+    )
     
     return send_notification_email(
         user=user,
@@ -579,92 +300,13 @@ def exemplo_email_exclusao_conta(user, dias_para_exclusao=30):
     """
     user_name = user.get_full_name() or user.username
     
-    header_content = """
-        <div style="text-align: center;">
-            <h1 style="color: #dc3545;">Exclusão de Conta</h1>
-            <p style="color: #666;">Lamentamos ver você partir</p>
-        </div>
-    """
-    
-    body_content = f"""
-        <p style="font-size: 16px;">
-            Olá <strong>{user_name}</strong>,
-        </p>
-        
-        <p style="font-size: 15px;">
-            Recebemos sua solicitação de exclusão de conta.
-        </p>
-        
-        <div style="background-color: #fff3cd; border-left: 4px solid #ffc107; 
-                    padding: 16px; margin: 24px 0;">
-            <p style="margin: 0; font-weight: bold; color: #856404;">
-                ⏰ Período de Retenção
-            </p>
-            <p style="margin: 8px 0 0 0; font-size: 14px; color: #856404;">
-                Sua conta será mantida inativa por <strong>{dias_para_exclusao} dias</strong>.
-                Durante este período, você pode cancelar a exclusão a qualquer momento
-                fazendo login normalmente.
-            </p>
-        </div>
-        
-        <p style="font-size: 14px;">
-            <strong>O que será excluído:</strong>
-        </p>
-        <ul style="font-size: 14px; line-height: 1.8;">
-            <li>Dados pessoais</li>
-            <li>Histórico de atividades</li>
-            <li>Configurações de perfil</li>
-            <li>Todos os dados associados à sua conta</li>
-        </ul>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="https://example.com/account/cancel-deletion" 
-               style="display: inline-block; padding: 12px 32px;
-                      background-color: #28a745; color: #ffffff;
-                      text-decoration: none; border-radius: 4px; font-size: 16px;">
-                Cancelar Exclusão
-            </a>
-        </div>
-        
-        <p style="font-size: 14px; color: #666; margin-top: 32px;">
-            Gostaríamos de saber o motivo da sua saída. 
-            Sua opinião é muito importante para melhorarmos nossos serviços.
-        </p>
-        
-        <div style="margin-top: 32px; font-size: 14px;">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """
-    
-    html_content = build_email_html(
-        title="Exclusão de Conta",
-        header_content=header_content,
-        body_content=body_content,
+    html_content, text_content = _render_example(
+        "account_deletion",
+        user_name=user_name,
+        dias_para_exclusao=dias_para_exclusao,
+        cancel_url="https://example.com/account/cancel-deletion",
     )
     
-    text_content = f"""
-    Olá {user_name},
-    
-    Recebemos sua solicitação de exclusão de conta.
-    
-    ⏰ PERÍODO DE RETENÇÃO:
-    Sua conta será mantida inativa por {dias_para_exclusao} dias.
-    Durante este período, você pode cancelar a exclusão fazendo login.
-    
-    O QUE SERÁ EXCLUÍDO:
-    - Dados pessoais
-    - Histórico de atividades
-    - Configurações de perfil
-    - Todos os dados associados à sua conta
-    
-    Para cancelar a exclusão:
-    https://example.com/account/cancel-deletion
-    
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """
-    
     return send_email(
         subject="⚠️ Confirmação de Exclusão de Conta - ArmoredDjango",
         text_content=text_content,
@@ -703,6 +345,9 @@ def send_welcome_email_on_signup(sender, instance, created, **kwargs):
     if created:
         exemplo_email_cadastro_simples(instance)
 
+# Para cadastros em massa, prefira EMAIL_WELCOME_ON_SIGNUP=True
+# (authentication.signals): um único envio em lote no commit da transação.
+
 
 # views de autenticação
 from utils.email_examples import exemplo_email_recuperacao_senha_simples
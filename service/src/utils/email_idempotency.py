@@ -0,0 +1,100 @@
+"""
+Chaves de idempotência para evitar emails duplicados.
+
+Quando o cliente repete `POST /api/register` ou um pedido de redefinição de
+senha, o mesmo email pode ser enviado várias vezes. Com uma chave de
+idempotência (ex.: tipo + id do usuário + janela de tempo), `send_email` só
+aceita o primeiro envio dentro da janela de deduplicação; os seguintes são
+ignorados e contabilizados.
+
+As chaves ficam no cache configurado em EMAIL_IDEMPOTENCY_CACHE. Para
+deduplicar entre vários workers, use um cache compartilhado (Redis, banco);
+o LocMemCache só deduplica dentro do mesmo processo.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = "email:idempotency:"
+STATS_PREFIX = "email:idempotency:stats:"
+
+
+def _cache():
+    return caches[settings.EMAIL_IDEMPOTENCY_CACHE]
+
+
+def make_idempotency_key(email_type: str, user_id, window: int = None) -> str:
+    """
+    Monta uma chave de idempotência para um tipo de email, usuário e janela de tempo.
+
+    Args:
+        email_type (str): Tipo do email (ex.: "welcome", "password_reset")
+        user_id: ID do usuário destinatário
+        window (int, optional): Duração da janela em segundos. Se None, usa
+            EMAIL_IDEMPOTENCY_WINDOW
+
+    Returns:
+        str: Chave de idempotência
+
+    Example:
+        >>> make_idempotency_key("password_reset", user.pk)
+        "password_reset:42:2923417"
+    """
+    if window is None:
+        window = settings.EMAIL_IDEMPOTENCY_WINDOW
+    bucket = int(time.time() // window)
+    return f"{email_type}:{user_id}:{bucket}"
+
+
+def claim_idempotency_key(key: str) -> bool:
+    """
+    Reserva a chave para um envio. A operação é atômica (`cache.add`).
+
+    Args:
+        key (str): Chave de idempotência
+
+    Returns:
+        bool: True se o envio deve seguir, False se for duplicado
+    """
+    accepted = _cache().add(
+        KEY_PREFIX + key, 1, timeout=settings.EMAIL_IDEMPOTENCY_WINDOW
+    )
+    _increment("accepted" if accepted else "suppressed")
+    return accepted
+
+
+def release_idempotency_key(key: str):
+    """Libera a chave, permitindo uma nova tentativa (usado quando o envio falha)."""
+    _cache().delete(KEY_PREFIX + key)
+
+
+def email_idempotency_stats() -> dict:
+    """
+    Retorna os contadores de envios aceitos e duplicados suprimidos.
+
+    Os contadores ficam no mesmo cache das chaves e são compartilhados
+    pelos processos que usam esse cache.
+
+    Example:
+        >>> email_idempotency_stats()
+        {"accepted": 1520, "suppressed": 37}
+    """
+    values = _cache().get_many(
+        [STATS_PREFIX + name for name in ("accepted", "suppressed")]
+    )
+    return {
+        name: values.get(STATS_PREFIX + name, 0) for name in ("accepted", "suppressed")
+    }
+
+
+def _increment(name: str):
+    cache = _cache()
+    key = STATS_PREFIX + name
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave expirou ou foi removida entre o add e o incr
+        cache.set(key, 1, timeout=None)
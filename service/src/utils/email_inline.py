@@ -0,0 +1,321 @@
+"""
+Aplicação de CSS inline no HTML dos emails, com memoização.
+
+O Pynliner reinterpreta a folha de estilos e percorre o documento inteiro a
+cada email. Este módulo evita esse custo de duas formas:
+
+- Cache LRU por hash do conteúdo: HTMLs idênticos são processados uma vez só.
+- Modo por fragmentos (EMAIL_INLINE_CSS_MODE="fragments"): o template base é
+  processado uma única vez e, para cada email, só os fragmentos informados em
+  `build_email_html` (título, cabeçalho, corpo, rodapé) passam pelo Pynliner.
+
+O resultado é sempre idêntico, byte a byte, ao de processar o documento
+completo; quando isso não pode ser garantido (seletores que dependem de
+contexto, `<style>` dentro do conteúdo, etc.), o documento completo é usado.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Seletores simples, que não dependem de ancestrais ou irmãos (ex.: "p", ".brand", "a.button")
+SIMPLE_SELECTOR = re.compile(r"^[\w\-]*([.#][\w\-]+)*$")
+
+# Conteúdo que altera a folha de estilos ou a estrutura do documento
+UNSAFE_FRAGMENT = re.compile(r"<\s*(style|link|body|html|head|!doctype)\b", re.I)
+
+# Elementos cujo conteúdo é texto puro para alguns parsers HTML
+RAW_TEXT_ELEMENTS = {"title", "textarea", "style", "script"}
+
+# Elementos em que o BeautifulSoup preserva os espaços em branco
+PRESERVE_WHITESPACE_ELEMENTS = {"pre", "textarea"}
+
+# Marcador usado no lugar de cada slot ao processar o template base
+SENTINEL_PREFIX = "@@email-slot-"
+
+STYLE_RULE = 1
+
+
+class InlineCSSCache:
+    """
+    Cache LRU (por processo) de resultados do Pynliner, indexado pelo hash do HTML.
+
+    Args:
+        max_size (int): Quantidade máxima de resultados guardados
+
+    Atributos:
+        - hits (int): Resultados servidos do cache.
+        - misses (int): Resultados calculados pelo Pynliner.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, namespace: str, content: str, compute) -> str:
+        """
+        Retorna o resultado em cache para `content` ou calcula com `compute(content)`.
+
+        Args:
+            namespace (str): Separa resultados que dependem de contextos diferentes
+            content (str): HTML de entrada
+            compute (callable): Função que gera o resultado a partir do HTML
+        """
+        if self.max_size <= 0:
+            return compute(content)
+
+        key = hashlib.sha256(f"{namespace}\0{content}".encode("utf-8")).digest()
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        result = compute(content)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Remove todos os resultados e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "size": int}
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+_inline_cache = None
+_inline_cache_lock = threading.Lock()
+
+
+def get_inline_css_cache() -> InlineCSSCache:
+    """Retorna o cache LRU de CSS inline do processo (EMAIL_INLINE_CSS_CACHE_SIZE)."""
+    global _inline_cache
+    if _inline_cache is None:
+        with _inline_cache_lock:
+            if _inline_cache is None:
+                _inline_cache = InlineCSSCache(settings.EMAIL_INLINE_CSS_CACHE_SIZE)
+    return _inline_cache
+
+
+def inline_css_cache_stats() -> dict:
+    """
+    Retorna os contadores de hit/miss do cache de CSS inline deste processo.
+
+    Example:
+        >>> inline_css_cache_stats()
+        {"hits": 120, "misses": 8, "size": 8}
+    """
+    return get_inline_css_cache().stats()
+
+
+def inline_email_css(html_content: str) -> str:
+    """
+    Converte o CSS do documento em estilos inline (mesmo resultado do Pynliner).
+
+    Se `html_content` veio de `build_email_html` e EMAIL_INLINE_CSS_MODE for
+    "fragments", apenas os fragmentos do email são processados; o template
+    base já processado é reaproveitado.
+
+    Args:
+        html_content (str): HTML do email
+
+    Returns:
+        str: HTML com CSS inline
+    """
+    if settings.EMAIL_INLINE_CSS_MODE == "fragments":
+        template = getattr(html_content, "template", None)
+        values = getattr(html_content, "values", None)
+        if template is not None and values is not None:
+            output = _inline_fragments(template, values)
+            if output is not None:
+                return output
+
+    return get_inline_css_cache().get_or_compute(
+        "document", str(html_content), _run_pynliner
+    )
+
+
+def _new_inliner():
+    # Importado no primeiro uso: o Pynliner (BeautifulSoup e cssutils) é a
+    # parte mais cara de importar de `utils` e só é necessário ao processar
+    # um email
+    from pynliner import Pynliner
+
+    return Pynliner()
+
+
+def _run_pynliner(html_content: str) -> str:
+    return _new_inliner().from_string(html_content).run()
+
+
+def _inline_fragments(template, values: dict):
+    skeleton = _get_inlined_skeleton(template)
+    if skeleton is None:
+        return None
+
+    output, stylesheet, slots, namespace = skeleton
+    for name, value in values.items():
+        value = str(value)
+        if UNSAFE_FRAGMENT.search(value) or SENTINEL_PREFIX in value:
+            return None
+        if "<" in value and any(slot[0] == name and slot[4] for slot in slots):
+            return None
+
+    return _assemble(output, stylesheet, slots, namespace, values)
+
+
+def _assemble(output, stylesheet, slots, namespace, values) -> str:
+    cache = get_inline_css_cache()
+
+    def compute(fragment):
+        inliner = _new_inliner().from_string(fragment)
+        # Reaproveita a folha de estilos já interpretada do template
+        inliner.stylesheet = stylesheet
+        return inliner.run()
+
+    for name, left, right, sentinel, _ in slots:
+        # O texto do template ao redor do slot entra no fragmento, para que os
+        # nós de texto (e o tratamento de espaços) sejam os mesmos do documento
+        fragment = cache.get_or_compute(
+            namespace, left + str(values[name]) + right, compute
+        )
+        output = output.replace(sentinel, fragment, 1)
+    return output
+
+
+def _split_slots(segments: list):
+    """
+    Separa o template em trechos fixos e slots, junto com o texto ao redor de
+    cada slot até a tag mais próxima.
+
+    Returns:
+        tuple | None: (fonte do esqueleto, [(slot, texto à esquerda, texto à direita,
+        marcador)]), ou None se algum slot não estiver entre tags
+    """
+    parts, slots = [], []
+    for index, (literal, field) in enumerate(segments):
+        start = 0
+        if slots:
+            # Texto à direita do slot anterior, até a próxima tag
+            start = literal.find("<")
+            if start == -1:
+                if field is not None:
+                    return None
+                start = len(literal)
+            right = literal[:start]
+            if ">" in right:
+                return None
+            slots[-1][2] = right
+
+        if field is None:
+            parts.append(literal[start:])
+            continue
+
+        # Texto à esquerda do slot, desde a última tag
+        cut = literal.rfind(">") + 1
+        if cut < start or (slots and cut == 0):
+            return None
+        left = literal[cut:]
+        if "<" in left:
+            return None
+
+        sentinel = f"{SENTINEL_PREFIX}{index}@@"
+        parts.append(literal[start:cut])
+        parts.append(sentinel)
+        slots.append([field, left, "", sentinel])
+
+    return "".join(parts), slots
+
+
+def _get_inlined_skeleton(template):
+    """
+    Processa o template base uma única vez, com marcadores no lugar dos slots.
+
+    Returns:
+        tuple | None: (html, folha de estilos, slots, namespace do cache), ou None
+        se o template não puder ser processado por fragmentos
+    """
+    skeleton = template.__dict__.get("_inlined_skeleton", False)
+    if skeleton is not False:
+        return skeleton
+
+    skeleton = None
+    split = _split_slots(template.segments) if template.plain_slots else None
+    if split is not None:
+        source, slots = split
+        inliner = _new_inliner().from_string(source)
+        output = inliner.run()
+
+        rules = [
+            rule for rule in inliner.stylesheet.cssRules if rule.type != rule.COMMENT
+        ]
+        safe = all(
+            rule.type == STYLE_RULE
+            and all(SIMPLE_SELECTOR.match(s.selectorText) for s in rule.selectorList)
+            for rule in rules
+        ) and all(output.count(slot[3]) == 1 for slot in slots)
+
+        if safe:
+            for slot in slots:
+                parents = {
+                    parent.name
+                    for parent in inliner.soup.find(
+                        string=re.compile(re.escape(slot[3]))
+                    ).parents
+                }
+                if parents & PRESERVE_WHITESPACE_ELEMENTS:
+                    safe = False
+                # Slots em elementos de texto puro não aceitam marcação nos fragmentos
+                slot.append(bool(parents & RAW_TEXT_ELEMENTS))
+
+        if safe:
+            # Fragmentos só podem ser reaproveitados com a mesma folha de estilos
+            namespace = (
+                "fragment:"
+                + hashlib.sha256(template.source.encode("utf-8")).hexdigest()
+            )
+            skeleton = (
+                output,
+                inliner.stylesheet,
+                [tuple(slot) for slot in slots],
+                namespace,
+            )
+            if not _matches_full_document(template, skeleton):
+                skeleton = None
+
+    template._inlined_skeleton = skeleton
+    return skeleton
+
+
+def _matches_full_document(template, skeleton) -> bool:
+    # Conferência única: o modo por fragmentos precisa reproduzir o documento completo
+    output, stylesheet, slots, namespace = skeleton
+    probe = {
+        slot[0]: (
+            "probe" if slot[4] else '\n  <p class="probe">probe &amp; <b>1</b></p>\n'
+        )
+        for slot in slots
+    }
+    expected = _run_pynliner(template.render(**probe))
+    return _assemble(output, stylesheet, slots, namespace, probe) == expected
@@ -0,0 +1,124 @@
+"""
+Métricas de tempo e resultado das etapas de envio de email.
+
+Cada etapa de `send_email` é medida separadamente:
+
+- template_load: obtenção do template compilado (Jinja2 / layout base)
+- format: renderização dos blocos e montagem do HTML
+- inline: aplicação do CSS inline (Pynliner)
+- minify: minificação do HTML (só com EMAIL_HTML_MINIFY)
+- mime_build: montagem da `EmailMultiAlternatives` (headers, alternativas, anexos)
+- smtp_send: serialização MIME e envio pelo backend (um lote por medição)
+
+As durações vão para o sink configurado em EMAIL_METRICS_SINK como a
+métrica `email.stage.duration` (tags `stage` e `outcome`), e o resultado de
+cada `send_email` como o contador `email.messages` (tag `outcome`: sent,
+queued, retry, failed ou duplicate).
+
+Sem EMAIL_METRICS_SINK, o sink padrão descarta tudo e as medições não são
+feitas. Os sinks são os de `utils.metrics`; `LoggingEmailMetricsSink` só
+troca o logger para "utils.email.metrics".
+
+Example:
+    >>> with email_stage("inline"):
+    ...     html = inline_email_css(html)
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+
+from utils.metrics import (
+    LoggingMetricsSink,
+    MemoryMetricsSink,
+    MetricsSink,
+    get_metrics,
+)
+
+STAGE_METRIC = "email.stage.duration"
+MESSAGES_METRIC = "email.messages"
+
+_NULL_STAGE = nullcontext()
+
+# Sink padrão (descarta as métricas); mantido pelo nome usado nos emails
+EmailMetricsSink = MetricsSink
+
+
+class LoggingEmailMetricsSink(LoggingMetricsSink):
+    """Grava cada métrica como log estruturado (logger "utils.email.metrics")."""
+
+    logger = logging.getLogger("utils.email.metrics")
+
+
+class MemoryEmailMetricsSink(MemoryMetricsSink):
+    """Guarda as métricas em memória, com as durações por etapa do envio."""
+
+    def stage_timings(self, stage: str) -> list:
+        """Retorna as durações registradas para uma etapa (qualquer resultado)."""
+        return [
+            seconds
+            for (name, tags), values in self.timings.items()
+            if name == STAGE_METRIC and ("stage", stage) in tags
+            for seconds in values
+        ]
+
+
+def get_email_metrics() -> MetricsSink:
+    """
+    Retorna o sink de métricas de email do processo (EMAIL_METRICS_SINK).
+
+    Returns:
+        MetricsSink: Instância da classe configurada, ou o sink que
+        descarta as métricas se a configuração estiver vazia ou inválida
+    """
+    return get_metrics("EMAIL_METRICS_SINK")
+
+
+def email_stage(stage: str, **tags):
+    """
+    Mede a duração de uma etapa do envio e o resultado (ok/error).
+
+    Com o sink padrão, retorna um context manager vazio, sem medir nada.
+
+    Args:
+        stage (str): Nome da etapa (template_load, format, inline, minify, mime_build, smtp_send)
+        **tags: Tags adicionais da métrica (ex.: template="welcome")
+
+    Returns:
+        Context manager que registra `email.stage.duration` ao sair
+    """
+    sink = get_email_metrics()
+    if not sink.enabled:
+        return _NULL_STAGE
+    return _StageTimer(sink, stage, tags)
+
+
+class _StageTimer:
+    __slots__ = ("sink", "tags", "started")
+
+    def __init__(self, sink, stage, tags):
+        self.sink = sink
+        self.tags = {"stage": stage, **tags}
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        self.tags["outcome"] = "error" if exc_type else "ok"
+        self.sink.timing(STAGE_METRIC, elapsed, self.tags)
+        return False
+
+
+def record_email_outcome(outcome: str, count: int = 1):
+    """
+    Conta o resultado de envios de email (`email.messages`).
+
+    Args:
+        outcome (str): sent, queued, retry, failed ou duplicate
+        count (int, optional): Quantidade de emails
+    """
+    sink = get_email_metrics()
+    if sink.enabled:
+        sink.increment(MESSAGES_METRIC, count, {"outcome": outcome})
@@ -0,0 +1,144 @@
+"""
+Minificação do HTML dos emails e limite de tamanho.
+
+Depois do CSS inline, o HTML ainda carrega a indentação dos templates e
+declarações repetidas no `style` de cada elemento (a do template e a da
+classe, por exemplo). Com EMAIL_HTML_MINIFY ativo, o HTML passa por:
+
+- colapso de espaços em branco, preservando `<pre>` e `<textarea>` e os
+  espaços entre elementos inline (ex.: `<strong>a</strong> <em>b</em>` ou
+  ao redor de `<img>`);
+- remoção de comentários HTML (comentários condicionais `<!--[if mso]>` são
+  mantidos);
+- deduplicação das declarações de cada `style`: para cada propriedade fica
+  só a declaração que vale (a última, ou a última com `!important`).
+
+EMAIL_HTML_BYTE_BUDGET define o tamanho máximo do HTML em bytes (ex.: 102400,
+o limite a partir do qual o Gmail corta a mensagem). Acima do limite, o email
+é enviado com um aviso ou, com EMAIL_HTML_BUDGET_STRICT, recusado.
+
+Example:
+    >>> minify_email_html('<p style="color: red; color: blue;">\\n    Olá\\n</p>')
+    '<p style="color:blue">Olá</p>'
+"""
+
+import re
+
+from django.conf import settings
+
+from utils.email_metrics import get_email_metrics
+
+# Conteúdo em que os espaços em branco são significativos, e comentários
+_PRESERVED = re.compile(
+    r"(<(pre|textarea)\b.*?</\2\s*>|<!--\[if.*?<!\[endif\]-->|<!--.*?-->)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Espaços ao redor destas tags não aparecem na renderização
+_BLOCK_TAGS = (
+    "html|head|body|meta|title|style|link|table|thead|tbody|tfoot|tr|td|th|"
+    "div|p|h[1-6]|ul|ol|li|br|hr|center"
+)
+_AROUND_BLOCK_TAG = re.compile(rf"\s*(</?(?:{_BLOCK_TAGS})\b[^>]*>)\s*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_TAG = re.compile(r"<[a-zA-Z][^>]*>")
+_STYLE_ATTRIBUTE = re.compile(r'\sstyle="([^"]*)"', re.IGNORECASE)
+
+
+class EmailHtmlTooLarge(ValueError):
+    """HTML do email acima de EMAIL_HTML_BYTE_BUDGET (com EMAIL_HTML_BUDGET_STRICT)."""
+
+
+def minify_email_html(html_content: str) -> str:
+    """
+    Remove espaços e declarações CSS redundantes sem alterar a renderização.
+
+    Args:
+        html_content (str): HTML do email (normalmente já com CSS inline)
+
+    Returns:
+        str: HTML minificado
+    """
+    parts = []
+    text = ""
+    # split com grupos: [texto, bloco preservado, nome da tag, texto, ...]
+    for index, segment in enumerate(_PRESERVED.split(html_content)):
+        kind = index % 3
+        if kind == 0:
+            text += segment
+        elif kind == 1:
+            if segment.startswith("<!--") and not segment.startswith("<!--[if"):
+                # Comentário removido: os textos ao redor são minificados juntos
+                continue
+            # <pre>, <textarea> e comentários condicionais: espaços ao redor
+            # não aparecem na renderização, o conteúdo fica intacto
+            parts.append(_minify_text(text).rstrip())
+            parts.append(segment)
+            text = ""
+    parts.append(_minify_text(text))
+
+    # Remove os espaços logo depois de cada bloco preservado
+    for index in range(2, len(parts), 2):
+        parts[index] = parts[index].lstrip()
+    return "".join(parts).strip()
+
+
+def _minify_text(text: str) -> str:
+    text = _WHITESPACE.sub(" ", text)
+    text = _AROUND_BLOCK_TAG.sub(r"\1", text)
+    # Só o atributo style das tags, não um texto "style=..." no conteúdo
+    return _TAG.sub(lambda tag: _STYLE_ATTRIBUTE.sub(_dedupe_style, tag.group(0)), text)
+
+
+def _dedupe_style(match) -> str:
+    style = match.group(1)
+    if "'" in style or "&quot;" in style or "(" in style:
+        # url(...), fontes entre aspas: mantém como está (só sem espaços nas bordas)
+        return f' style="{style.strip()}"'
+
+    declarations = {}
+    for declaration in style.split(";"):
+        name, sep, value = declaration.partition(":")
+        name = name.strip().lower()
+        value = value.strip()
+        if not sep or not name or not value:
+            continue
+        important = value.lower().endswith("!important")
+        current = declarations.get(name)
+        if current is not None and current[1] and not important:
+            # Uma declaração anterior com !important continua valendo
+            continue
+        # Reinsere no fim, na posição da declaração que vale
+        declarations.pop(name, None)
+        declarations[name] = (value, important)
+
+    return ' style="{}"'.format(
+        ";".join(f"{name}:{value}" for name, (value, _) in declarations.items())
+    )
+
+
+def check_email_html_budget(html_content: str) -> int:
+    """
+    Confere o tamanho do HTML contra EMAIL_HTML_BYTE_BUDGET.
+
+    Args:
+        html_content (str): HTML final do email
+
+    Returns:
+        int: Tamanho do HTML em bytes (UTF-8)
+
+    Raises:
+        EmailHtmlTooLarge: Se o limite for excedido e EMAIL_HTML_BUDGET_STRICT
+            estiver ativo
+    """
+    size = len(html_content.encode("utf-8"))
+    budget = settings.EMAIL_HTML_BYTE_BUDGET
+    if budget and size > budget:
+        metrics = get_email_metrics()
+        if metrics.enabled:
+            metrics.increment("email.html.over_budget")
+        message = f"HTML do email com {size} bytes excede o limite de {budget} bytes"
+        if settings.EMAIL_HTML_BUDGET_STRICT:
+            raise EmailHtmlTooLarge(message)
+        print(f"Aviso: {message}")
+    return size
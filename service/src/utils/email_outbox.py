@@ -0,0 +1,270 @@
+"""
+Outbox persistente para envio assíncrono de emails.
+
+`send_email(..., async_send=True)` grava a mensagem na tabela `EmailOutbox` e
+retorna imediatamente. O comando `python manage.py email_worker` consome a
+fila usando `SELECT ... FOR UPDATE SKIP LOCKED`, permitindo vários workers
+(inclusive em máquinas diferentes) sem enviar o mesmo email duas vezes.
+
+Falhas transitórias voltam para a fila com backoff (`next_attempt_at`); falhas
+definitivas vão para a dead-letter (ver `utils.email_retry`).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from utils.constants import EmailStatus
+from utils.email_pool import send_email_messages
+from utils.email_retry import (
+    dead_letter_email,
+    is_transient_email_error,
+    retry_delay,
+    send_with_retry,
+)
+from utils.emails import build_email_message, default_email_headers
+from utils.models import EmailOutbox
+
+
+def enqueue_email(
+    subject: str,
+    text_content: str,
+    recipient_list: list,
+    html_content: str = None,
+    from_email: str = None,
+    inline_css: bool = True,
+    reply_to: list = None,
+    bcc: list = None,
+    headers: dict = None,
+    send_after=None,
+) -> EmailOutbox:
+    """
+    Grava um email na outbox para envio posterior pelo worker.
+
+    Os headers padrão são gerados aqui, para que o Message-ID seja o mesmo
+    mesmo que o envio precise ser repetido.
+
+    Args:
+        Mesmos argumentos de `utils.emails.send_email`, além de:
+        send_after (datetime, optional): Não enviar antes deste momento
+
+    Returns:
+        EmailOutbox: Registro criado na fila
+    """
+    if from_email is None:
+        from_email = settings.DEFAULT_FROM_EMAIL
+
+    email_headers = default_email_headers(from_email)
+    if headers:
+        email_headers.update(headers)
+
+    return EmailOutbox.objects.create(
+        subject=subject,
+        text_content=text_content,
+        recipient_list=list(recipient_list),
+        html_content=html_content,
+        from_email=from_email,
+        inline_css=inline_css,
+        reply_to=list(reply_to or []),
+        bcc=list(bcc or []),
+        headers=email_headers,
+        next_attempt_at=send_after,
+    )
+
+
+def claim_outbox_batch(batch_size: int = None) -> list:
+    """
+    Reserva um lote de emails pendentes para o worker atual.
+
+    Usa `SELECT ... FOR UPDATE SKIP LOCKED`, então workers concorrentes nunca
+    reservam o mesmo registro. Emails aguardando o backoff (`next_attempt_at`
+    no futuro) ficam de fora. Registros presos em SENDING há mais de
+    EMAIL_OUTBOX_LOCK_TIMEOUT segundos (worker que morreu) são recuperados.
+
+    Args:
+        batch_size (int, optional): Tamanho do lote. Se None, usa EMAIL_OUTBOX_BATCH_SIZE
+
+    Returns:
+        list: Registros `EmailOutbox` reservados, em ordem de criação
+    """
+    if batch_size is None:
+        batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=EmailStatus.PENDING)
+                & (Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+                | Q(status=EmailStatus.SENDING, locked_at__lt=stale)
+            )
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status=EmailStatus.SENDING,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def deliver_outbox_entry(entry: EmailOutbox) -> bool:
+    """
+    Envia um email reservado da outbox e atualiza seu status.
+
+    Em falhas transitórias o email volta para PENDING com `next_attempt_at`
+    (backoff), até EMAIL_RETRY_MAX_ATTEMPTS tentativas; depois disso, ou em
+    falhas definitivas, fica FAILED e é registrado na dead-letter.
+
+    Args:
+        entry (EmailOutbox): Registro reservado por `claim_outbox_batch`
+
+    Returns:
+        bool: True se o email foi enviado com sucesso, False caso contrário
+    """
+    msg = None
+    try:
+        msg = build_email_message(
+            subject=entry.subject,
+            text_content=entry.text_content,
+            recipient_list=entry.recipient_list,
+            html_content=entry.html_content,
+            from_email=entry.from_email,
+            inline_css=entry.inline_css,
+            reply_to=entry.reply_to or None,
+            bcc=entry.bcc or None,
+            headers=entry.headers,
+        )
+        send_email_messages([msg])
+    except Exception as e:
+        print(f"Erro ao enviar email da outbox #{entry.pk}: {e}")
+        _record_delivery_failure(entry, msg, e)
+        return False
+
+    EmailOutbox.objects.filter(pk=entry.pk).update(
+        status=EmailStatus.SENT,
+        sent_at=timezone.now(),
+        last_error="",
+        locked_at=None,
+    )
+    return True
+
+
+def _record_delivery_failure(entry: EmailOutbox, msg, error: Exception):
+    if (
+        is_transient_email_error(error)
+        and entry.attempts < settings.EMAIL_RETRY_MAX_ATTEMPTS
+    ):
+        EmailOutbox.objects.filter(pk=entry.pk).update(
+            status=EmailStatus.PENDING,
+            last_error=str(error),
+            locked_at=None,
+            next_attempt_at=timezone.now()
+            + timedelta(seconds=retry_delay(entry.attempts)),
+        )
+        return
+
+    with transaction.atomic():
+        EmailOutbox.objects.filter(pk=entry.pk).update(
+            status=EmailStatus.FAILED,
+            last_error=str(error),
+            locked_at=None,
+        )
+        dead_letter_email(msg, error, attempts=entry.attempts, outbox=entry)
+
+
+def retry_failed_email(msg, error: Exception) -> bool:
+    """
+    Trata a falha de um envio síncrono (`send_email`).
+
+    Falhas transitórias são gravadas na outbox já renderizadas, para nova
+    tentativa pelo worker após o backoff; falhas definitivas vão para a
+    dead-letter. Sem EMAIL_ASYNC_ENABLED não há `email_worker` drenando a
+    outbox, e a outbox não armazena anexos: nesses casos as novas tentativas
+    são feitas na hora (`send_with_retry`), e a dead-letter recebe o email se
+    todas falharem.
+
+    Args:
+        msg (EmailMultiAlternatives): Mensagem que falhou
+        error (Exception): Erro do envio
+
+    Returns:
+        bool: True se o email foi enviado ou agendado para nova tentativa,
+        False caso contrário
+    """
+    try:
+        use_outbox = settings.EMAIL_ASYNC_ENABLED and not msg.attachments
+        max_attempts = (
+            settings.EMAIL_RETRY_MAX_ATTEMPTS
+            if use_outbox
+            else settings.EMAIL_RETRY_INLINE_ATTEMPTS
+        )
+        if not is_transient_email_error(error) or max_attempts <= 1:
+            dead_letter_email(msg, error, attempts=1)
+            return False
+
+        if not use_outbox:
+            return send_with_retry([msg], attempts=1) == 1
+
+        # O HTML já está com CSS inline; os headers mantêm o Message-ID original
+        html_content = next(
+            (
+                content
+                for content, mimetype in msg.alternatives
+                if mimetype == "text/html"
+            ),
+            None,
+        )
+        entry = enqueue_email(
+            subject=msg.subject,
+            text_content=msg.body,
+            recipient_list=msg.to,
+            html_content=html_content,
+            from_email=msg.from_email,
+            inline_css=False,
+            reply_to=msg.reply_to,
+            bcc=msg.bcc,
+            headers=dict(msg.extra_headers),
+            send_after=timezone.now() + timedelta(seconds=retry_delay(1)),
+        )
+        EmailOutbox.objects.filter(pk=entry.pk).update(
+            attempts=1, last_error=str(error)
+        )
+        return True
+    except Exception as e:
+        print(f"Erro ao registrar falha de envio de email: {e}")
+        return False
+
+
+def drain_outbox(batch_size: int = None) -> tuple:
+    """
+    Processa a outbox até não restarem emails pendentes.
+
+    Args:
+        batch_size (int, optional): Tamanho de cada lote reservado
+
+    Returns:
+        tuple: (enviados, falhas)
+    """
+    sent = failed = 0
+    while True:
+        batch = claim_outbox_batch(batch_size)
+        if not batch:
+            return sent, failed
+
+        for entry in batch:
+            if deliver_outbox_entry(entry):
+                sent += 1
+            else:
+                failed += 1
@@ -0,0 +1,351 @@
+"""
+Pool de conexões SMTP persistentes por processo.
+
+Cada `msg.send()` abre e fecha uma sessão SMTP/TLS nova; sob carga o
+handshake custa mais que a própria mensagem. O pool mantém conexões abertas
+(criadas com `django.core.mail.get_connection()`) e as reutiliza entre envios,
+verificando com NOOP se continuam vivas e reconectando quando necessário.
+"""
+
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.signals import setting_changed
+
+from utils.email_metrics import email_stage
+from utils.email_ratelimit import get_email_rate_limiter
+
+# Erros que indicam que a conexão caiu e vale reconectar e tentar de novo
+RECONNECT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+# "Service not available, closing transmission channel": reconectar e tentar de novo
+SMTP_SERVICE_UNAVAILABLE = 421
+
+
+def should_reconnect(error: Exception) -> bool:
+    """Indica se vale abrir outra conexão e repetir o envio após `error`."""
+    if isinstance(error, RECONNECT_ERRORS):
+        return True
+    return (
+        isinstance(error, smtplib.SMTPResponseException)
+        and error.smtp_code == SMTP_SERVICE_UNAVAILABLE
+    )
+
+
+@contextmanager
+def _rate_limited():
+    # Ocupa uma vaga de conexão do host e fornece a função que aplica a taxa
+    limiter = get_email_rate_limiter()
+    if limiter is None:
+        yield lambda: None
+        return
+
+    slot = limiter.acquire_connection()
+    try:
+        yield limiter.acquire
+    finally:
+        limiter.release_connection(slot)
+
+
+class SMTPConnectionPool:
+    """
+    Pool de conexões de email com tamanho máximo, timeout de ociosidade e
+    verificação de liveness (NOOP).
+
+    Args:
+        backend (str, optional): Caminho do backend de email. Se None, usa EMAIL_BACKEND
+        max_size (int, optional): Máximo de conexões abertas ao mesmo tempo
+        idle_timeout (float, optional): Segundos que uma conexão pode ficar ociosa
+            antes de ser descartada
+        **kwargs: Argumentos repassados para `get_connection()`
+
+    Atributos:
+        - created (int): Conexões abertas pelo pool.
+        - reused (int): Vezes em que uma conexão ociosa foi reutilizada.
+        - discarded (int): Conexões descartadas (expiradas, mortas ou com erro).
+    """
+
+    def __init__(
+        self,
+        backend: str = None,
+        max_size: int = 4,
+        idle_timeout: float = 30.0,
+        **kwargs,
+    ):
+        self.backend = backend
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connection_kwargs = kwargs
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self, timeout: float = None):
+        """
+        Retira uma conexão aberta do pool, criando uma nova se necessário.
+
+        Bloqueia enquanto `max_size` conexões estiverem em uso.
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera por uma conexão
+
+        Returns:
+            BaseEmailBackend: Conexão aberta
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar disponível dentro do timeout
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Nenhuma conexão de email disponível no pool")
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, last_used = self._idle.pop()
+
+                if (
+                    time.monotonic() - last_used > self.idle_timeout
+                    or not self._is_alive(conn)
+                ):
+                    self._close(conn)
+                    continue
+
+                self.reused += 1
+                return conn
+
+            return self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard: bool = False):
+        """
+        Devolve uma conexão ao pool.
+
+        Args:
+            conn: Conexão obtida com `acquire()`
+            discard (bool, optional): Se True, fecha a conexão em vez de reutilizá-la
+        """
+        try:
+            if discard:
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que empresta uma conexão do pool.
+
+        A conexão é descartada se um erro de conexão ocorrer dentro do bloco.
+        Ocupa uma vaga de EMAIL_MAX_CONNECTIONS enquanto o bloco executa.
+
+        Example:
+            >>> with get_email_pool().connection() as conn:
+            ...     conn.send_messages([msg])
+        """
+        with _rate_limited():
+            conn = self.acquire()
+            discard = False
+            try:
+                yield conn
+            except RECONNECT_ERRORS:
+                discard = True
+                raise
+            finally:
+                self.release(conn, discard=discard)
+
+    def send_messages(
+        self, messages: list, fail_silently: bool = False, errors: list = None
+    ) -> int:
+        """
+        Envia mensagens por conexões do pool, reconectando uma vez por mensagem
+        se a conexão cair (ou o servidor responder 421).
+
+        Respeita o limitador de taxa e de conexões do host
+        (`utils.email_ratelimit`), esperando em vez de falhar.
+
+        Args:
+            messages (list): Lista de `EmailMessage`
+            fail_silently (bool, optional): Se True, uma mensagem com erro é
+                registrada e ignorada, e as demais continuam sendo enviadas
+            errors (list, optional): Se informada, recebe um par
+                (mensagem, erro) para cada mensagem que falhou, e as demais
+                continuam sendo enviadas
+
+        Returns:
+            int: Quantidade de mensagens enviadas
+        """
+        with _rate_limited() as throttle:
+            return self._send_messages(messages, fail_silently, throttle, errors)
+
+    def _send_messages(self, messages, fail_silently, throttle, errors=None) -> int:
+        sent = 0
+        conn = self.acquire()
+        try:
+            for message in messages:
+                try:
+                    throttle()
+                    try:
+                        if conn is None:
+                            conn = self._open()
+                        sent += conn.send_messages([message]) or 0
+                    except Exception as e:
+                        if not should_reconnect(e):
+                            raise
+                        # Conexão caiu: abre outra e tenta a mensagem novamente
+                        self._close(conn)
+                        conn = None
+                        conn = self._open()
+                        sent += conn.send_messages([message]) or 0
+                except Exception as e:
+                    if errors is not None:
+                        errors.append((message, e))
+                        continue
+                    if not fail_silently:
+                        raise
+                    print(f"Erro ao enviar email para {message.recipients()}: {e}")
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+
+        self.release(conn, discard=conn is None)
+        return sent
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas do pool."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _open(self):
+        conn = get_connection(
+            self.backend, fail_silently=False, **self.connection_kwargs
+        )
+        conn.open()
+        self.created += 1
+        return conn
+
+    def _close(self, conn):
+        if conn is None:
+            return
+        self.discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn) -> bool:
+        # Backends sem socket (locmem, console, filebased) não têm `connection`
+        if not hasattr(conn, "connection"):
+            return True
+        if conn.connection is None:
+            return False
+        try:
+            return conn.connection.noop()[0] == 250
+        except Exception:
+            return False
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_email_pool() -> SMTPConnectionPool:
+    """
+    Retorna o pool de conexões do processo atual para o EMAIL_BACKEND configurado.
+
+    O pool é recriado após um fork (ex.: workers do gunicorn com preload),
+    para que processos diferentes nunca compartilhem o mesmo socket.
+
+    Returns:
+        SMTPConnectionPool: Pool do processo atual
+    """
+    key = (os.getpid(), settings.EMAIL_BACKEND)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = SMTPConnectionPool(
+                    backend=settings.EMAIL_BACKEND,
+                    max_size=settings.EMAIL_POOL_MAX_SIZE,
+                    idle_timeout=settings.EMAIL_POOL_IDLE_TIMEOUT,
+                )
+                _pools[key] = pool
+    return pool
+
+
+def close_email_pools():
+    """Fecha e descarta todos os pools do processo."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+def send_email_messages(
+    messages: list, fail_silently: bool = False, errors: list = None
+) -> int:
+    """
+    Envia mensagens usando o pool de conexões, se habilitado (EMAIL_POOL_ENABLED).
+
+    Args:
+        messages (list): Lista de `EmailMessage`
+        fail_silently (bool, optional): Se True, erros em uma mensagem não
+            interrompem o envio das demais
+        errors (list, optional): Se informada, recebe um par (mensagem, erro)
+            para cada mensagem que falhou, e as demais continuam sendo
+            enviadas. Falhas ao abrir a conexão ainda geram exceção
+
+    Returns:
+        int: Quantidade de mensagens enviadas
+    """
+    with email_stage("smtp_send"):
+        if not settings.EMAIL_POOL_ENABLED:
+            connection = get_connection(fail_silently=fail_silently and errors is None)
+            sent = 0
+            with _rate_limited() as throttle, connection:
+                for message in messages:
+                    throttle()
+                    try:
+                        sent += connection.send_messages([message]) or 0
+                    except Exception as e:
+                        if errors is None:
+                            raise
+                        errors.append((message, e))
+            return sent
+        return get_email_pool().send_messages(
+            messages, fail_silently=fail_silently, errors=errors
+        )
+
+
+def _reset_pools(setting, **kwargs):
+    if setting.startswith("EMAIL_"):
+        close_email_pools()
+
+
+setting_changed.connect(_reset_pools)
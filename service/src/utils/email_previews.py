@@ -0,0 +1,238 @@
+"""
+Pré-visualização dos emails do sistema, com cache do HTML renderizado.
+
+Cada tipo de email registrado aqui (`register_email_preview`) pode ser
+renderizado com dados de exemplo ou de um usuário real, sem enviar nada. O
+resultado (assunto, texto, HTML com CSS inline e minificado) fica no cache
+EMAIL_PREVIEW_CACHE, indexado pelo hash de (tipo, usuário, parâmetros), então
+pré-visualizações repetidas saem na hora.
+
+Renderizar a pré-visualização passa pelo mesmo `prepare_email_html` do envio,
+então o cache de CSS inline do processo (`utils.email_inline`) fica aquecido:
+um envio com o mesmo conteúdo (ex.: o mesmo email para o mesmo usuário)
+reaproveita o resultado do Pynliner.
+
+Example:
+    >>> render_email_preview("password_reset", params={"reset_url": "https://..."})
+    {"type": "password_reset", "subject": "Redefinição de Senha - ArmoredDjango",
+     "text": "...", "html": "...", "size": 4210, "over_budget": False,
+     "cached": False}
+
+Novos tipos:
+    >>> @register_email_preview("invoice", "Fatura", params={"amount": "R$ 10,00"})
+    ... def invoice_preview(user_name, amount):
+    ...     return subject, text_content, html_content
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+CACHE_PREFIX = "email:preview:"
+
+
+class EmailPreviewType:
+    """
+    Tipo de email disponível para pré-visualização.
+
+    Args:
+        name (str): Identificador do tipo (ex.: "welcome")
+        builder (callable): Função `builder(user_name, **params)` que retorna
+            (assunto, texto plano, HTML sem CSS inline)
+        description (str, optional): Descrição exibida na listagem
+        params (dict, optional): Parâmetros aceitos e seus valores de exemplo
+    """
+
+    def __init__(self, name: str, builder, description: str = "", params: dict = None):
+        self.name = name
+        self.builder = builder
+        self.description = description
+        self.params = params or {}
+
+    def as_dict(self) -> dict:
+        return {
+            "type": self.name,
+            "description": self.description,
+            "params": self.params,
+        }
+
+
+_registry = {}
+
+
+def register_email_preview(name: str, description: str = "", params: dict = None):
+    """
+    Decorator que registra um tipo de email para pré-visualização.
+
+    Args:
+        name (str): Identificador do tipo
+        description (str, optional): Descrição exibida na listagem
+        params (dict, optional): Parâmetros aceitos e seus valores de exemplo
+    """
+
+    def decorator(builder):
+        _registry[name] = EmailPreviewType(name, builder, description, params)
+        return builder
+
+    return decorator
+
+
+def get_email_preview_types() -> list:
+    """Retorna os tipos de email registrados, em ordem de registro."""
+    return list(_registry.values())
+
+
+def get_email_preview_type(name: str) -> EmailPreviewType:
+    """
+    Retorna o tipo de email registrado como `name`.
+
+    Raises:
+        KeyError: Se o tipo não estiver registrado
+    """
+    return _registry[name]
+
+
+def sample_user():
+    """Usuário de exemplo (não salvo no banco) usado quando nenhum é informado."""
+    return get_user_model()(
+        username="maria.silva",
+        first_name="Maria",
+        last_name="Silva",
+        email="maria.silva@example.com",
+    )
+
+
+def email_preview_cache_key(email_type: str, user_id=None, params: dict = None) -> str:
+    """Chave de cache da pré-visualização: hash de (tipo, usuário, parâmetros)."""
+    payload = json.dumps([email_type, user_id, params or {}], sort_keys=True)
+    return CACHE_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_email_preview(
+    email_type: str, user=None, params: dict = None, refresh: bool = False
+) -> dict:
+    """
+    Renderiza (ou busca no cache) a pré-visualização de um tipo de email.
+
+    Args:
+        email_type (str): Tipo registrado (ver `get_email_preview_types`)
+        user (optional): Usuário cujos dados entram no email. Se None, usa
+            `sample_user()`
+        params (dict, optional): Parâmetros do tipo; os omitidos usam os
+            valores de exemplo
+        refresh (bool, optional): Se True, ignora o cache e renderiza de novo
+
+    Returns:
+        dict: "type", "subject", "text", "html", "size" (bytes do HTML),
+        "over_budget" (acima de EMAIL_HTML_BYTE_BUDGET) e "cached"
+
+    Raises:
+        KeyError: Se o tipo não estiver registrado
+        ValueError: Se algum parâmetro não for aceito pelo tipo
+    """
+    from utils.emails import prepare_email_html
+
+    preview_type = get_email_preview_type(email_type)
+    params = params or {}
+    unknown = sorted(set(params) - set(preview_type.params))
+    if unknown:
+        raise ValueError(f"Parâmetros não aceitos por '{email_type}': {unknown}")
+    values = {**preview_type.params, **params}
+
+    cache = caches[settings.EMAIL_PREVIEW_CACHE]
+    key = email_preview_cache_key(
+        email_type, user.pk if user is not None else None, values
+    )
+    if not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    if user is None:
+        user = sample_user()
+    user_name = user.get_full_name() or user.username
+
+    subject, text_content, html_content = preview_type.builder(user_name, **values)
+    html_content = prepare_email_html(html_content, check_budget=False)
+    size = len(html_content.encode("utf-8"))
+    budget = settings.EMAIL_HTML_BYTE_BUDGET
+
+    preview = {
+        "type": email_type,
+        "subject": subject,
+        "text": text_content,
+        "html": html_content,
+        "size": size,
+        "over_budget": bool(budget) and size > budget,
+    }
+    cache.set(key, preview, settings.EMAIL_PREVIEW_CACHE_TIMEOUT)
+    return {**preview, "cached": False}
+
+
+# ==============================================================================
+# Tipos de email do sistema
+# ==============================================================================
+
+
+@register_email_preview(
+    "welcome",
+    "Boas-vindas após o cadastro",
+    params={"custom_message": ""},
+)
+def welcome_preview(user_name, custom_message):
+    from utils.emails import _build_welcome_content
+
+    return _build_welcome_content(user_name, custom_message or None)
+
+
+@register_email_preview(
+    "password_reset",
+    "Redefinição de senha",
+    params={"reset_url": "https://example.com/reset/token-de-exemplo"},
+)
+def password_reset_preview(user_name, reset_url):
+    from utils.emails import _build_password_reset_content
+
+    return _build_password_reset_content(user_name, reset_url)
+
+
+@register_email_preview(
+    "notification",
+    "Notificação genérica",
+    params={
+        "title": "Nova mensagem",
+        "message": "Você recebeu uma nova mensagem no sistema.",
+        "action_url": "https://example.com/messages/123",
+        "action_label": "Ver Mensagem",
+    },
+)
+def notification_preview(user_name, title, message, action_url, action_label):
+    from utils.emails import _build_notification_content
+
+    return _build_notification_content(
+        user_name, title, message, action_url or None, action_label
+    )
+
+
+@register_email_preview(
+    "digest",
+    "Digest com várias notificações",
+    params={"count": "3"},
+)
+def digest_preview(user_name, count):
+    from utils.email_digest import build_digest_content
+    from utils.models import EmailDigestEntry
+
+    entries = [
+        EmailDigestEntry(
+            title=f"Notificação {i}",
+            message=f"Conteúdo da notificação {i}.",
+            action_url=f"https://example.com/notifications/{i}",
+            action_label="Ver Detalhes",
+        )
+        for i in range(1, max(1, min(int(count), 50)) + 1)
+    ]
+    return build_digest_content(user_name, entries)
@@ -0,0 +1,225 @@
+"""
+Limitador de taxa de envio de emails, compartilhado entre processos do host.
+
+O provedor SMTP recusa (421) rajadas acima de N mensagens/segundo ou N
+conexões simultâneas. O limitador aplica as duas regras antes de cada envio
+e, em vez de falhar, faz quem chama esperar (backpressure).
+
+- Taxa: token bucket (EMAIL_RATE_LIMIT mensagens/s, até EMAIL_RATE_BURST de
+  uma vez), com o estado em um arquivo protegido por `fcntl.flock`, para que
+  todos os workers do gunicorn no host dividam o mesmo limite.
+- Conexões: EMAIL_MAX_CONNECTIONS arquivos de "vaga"; uma sessão SMTP só é
+  usada enquanto o processo mantém o lock de uma vaga. O lock é liberado pelo
+  sistema operacional se o processo morrer.
+
+A vaga é ocupada enquanto a conexão está emprestada do pool; conexões ociosas
+no pool não contam. Se o provedor também contar conexões ociosas, mantenha
+EMAIL_POOL_MAX_SIZE × workers dentro do limite.
+"""
+
+import asyncio
+import fcntl
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+# Estado do token bucket: (tokens disponíveis, timestamp da última atualização)
+STATE_FORMAT = struct.Struct("dd")
+
+# Intervalo entre tentativas de obter uma vaga de conexão
+CONNECTION_POLL_INTERVAL = 0.05
+
+
+class EmailRateLimiter:
+    """
+    Token bucket e vagas de conexão compartilhados por arquivos com `flock`.
+
+    Args:
+        rate (float): Mensagens por segundo (0 desativa o limite de taxa)
+        burst (int, optional): Mensagens que podem sair de uma vez. Se None, usa `rate`
+        max_connections (int, optional): Conexões simultâneas (0 desativa o limite)
+        state_dir (str, optional): Diretório dos arquivos de estado
+        name (str, optional): Identifica o limite (ex.: host:porta do provedor)
+
+    Atributos:
+        - throttled (int): Vezes em que um envio precisou esperar por taxa.
+        - waited (float): Segundos esperados no total (taxa e conexões).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = None,
+        max_connections: int = 0,
+        state_dir: str = None,
+        name: str = "default",
+    ):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.max_connections = max_connections
+
+        self.throttled = 0
+        self.waited = 0.0
+
+        if state_dir is None:
+            state_dir = os.path.join(tempfile.gettempdir(), "armoreddjango-email")
+        os.makedirs(state_dir, exist_ok=True)
+        prefix = os.path.join(state_dir, re.sub(r"[^\w.-]", "_", name))
+        self.bucket_path = f"{prefix}.bucket"
+        self.slot_paths = [f"{prefix}.conn{i}" for i in range(max_connections)]
+
+    def acquire(self, tokens: int = 1):
+        """
+        Consome `tokens` do bucket, bloqueando até haver tokens disponíveis.
+
+        Args:
+            tokens (int, optional): Quantidade de mensagens a enviar
+        """
+        if self.rate <= 0:
+            return
+
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            self.throttled += 1
+            self.waited += wait
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 1):
+        """Versão assíncrona de `acquire`: espera com `asyncio.sleep`."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            self.throttled += 1
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+    def _take(self, tokens: int) -> float:
+        # Retorna 0 se consumiu os tokens ou os segundos até haver tokens suficientes
+        fd = os.open(self.bucket_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            data = os.pread(fd, STATE_FORMAT.size, 0)
+            if len(data) == STATE_FORMAT.size:
+                available, updated_at = STATE_FORMAT.unpack(data)
+                elapsed = max(0.0, now - updated_at)
+                available = min(self.burst, available + elapsed * self.rate)
+            else:
+                available = self.burst
+
+            if available >= tokens:
+                os.pwrite(fd, STATE_FORMAT.pack(available - tokens, now), 0)
+                return 0
+            os.pwrite(fd, STATE_FORMAT.pack(available, now), 0)
+            return (tokens - available) / self.rate
+        finally:
+            os.close(fd)
+
+    def acquire_connection(self):
+        """
+        Ocupa uma vaga de conexão, bloqueando enquanto todas estiverem ocupadas.
+
+        Returns:
+            int | None: Descritor da vaga (passar para `release_connection`), ou
+            None se não houver limite de conexões
+        """
+        if not self.slot_paths:
+            return None
+
+        started = None
+        while True:
+            fd = self._try_slot()
+            if fd is not None:
+                if started is not None:
+                    self.waited += time.monotonic() - started
+                return fd
+
+            if started is None:
+                started = time.monotonic()
+            time.sleep(CONNECTION_POLL_INTERVAL)
+
+    async def aacquire_connection(self):
+        """Versão assíncrona de `acquire_connection`: espera com `asyncio.sleep`."""
+        if not self.slot_paths:
+            return None
+
+        started = None
+        while True:
+            fd = self._try_slot()
+            if fd is not None:
+                if started is not None:
+                    self.waited += time.monotonic() - started
+                return fd
+
+            if started is None:
+                started = time.monotonic()
+            await asyncio.sleep(CONNECTION_POLL_INTERVAL)
+
+    def _try_slot(self):
+        # Descritor de uma vaga livre (com o flock obtido), ou None se todas ocupadas
+        for path in self.slot_paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    @staticmethod
+    def release_connection(slot):
+        """Libera uma vaga obtida com `acquire_connection`."""
+        if slot is not None:
+            # Fechar o descritor libera o flock
+            os.close(slot)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_email_rate_limiter():
+    """
+    Retorna o limitador configurado (EMAIL_RATE_LIMIT, EMAIL_RATE_BURST,
+    EMAIL_MAX_CONNECTIONS), ou None se nenhum limite estiver ativo.
+
+    O limite é compartilhado por todos os processos do host que enviam para o
+    mesmo EMAIL_HOST:EMAIL_PORT.
+    """
+    global _limiter
+    if settings.EMAIL_RATE_LIMIT <= 0 and settings.EMAIL_MAX_CONNECTIONS <= 0:
+        return None
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = EmailRateLimiter(
+                    rate=settings.EMAIL_RATE_LIMIT,
+                    burst=settings.EMAIL_RATE_BURST,
+                    max_connections=settings.EMAIL_MAX_CONNECTIONS,
+                    state_dir=settings.EMAIL_RATE_LIMIT_DIR or None,
+                    name=f"{settings.EMAIL_HOST}:{settings.EMAIL_PORT}",
+                )
+    return _limiter
+
+
+def _reset_limiter(setting, **kwargs):
+    global _limiter
+    if setting.startswith("EMAIL_"):
+        _limiter = None
+
+
+setting_changed.connect(_reset_limiter)
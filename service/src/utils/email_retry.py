@@ -0,0 +1,209 @@
+"""
+Novas tentativas e dead-letter para emails que falharam.
+
+Falhas transitórias (conexão perdida, timeout, respostas SMTP 4xx) voltam
+para a outbox com backoff exponencial com jitter e são reenviadas pelo
+`email_worker`, fora da thread da requisição. Sem a outbox
+(EMAIL_ASYNC_ENABLED=False), em envios em lote e com anexos, `send_with_retry`
+tenta de novo na hora, com esperas curtas. Falhas definitivas (respostas 5xx,
+erros de renderização) ou que esgotaram as tentativas vão para a tabela
+`EmailDeadLetter`, com a mensagem MIME já renderizada, e podem ser reenviadas
+em lote com `python manage.py replay_dead_letters`.
+"""
+
+import random
+import smtplib
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from utils.email_pipeline import RawEmailMessage, serialize_email_message
+from utils.email_pool import send_email_messages
+from utils.models import EmailDeadLetter
+
+
+def is_transient_email_error(error: Exception) -> bool:
+    """
+    Indica se vale tentar enviar o email novamente mais tarde.
+
+    Args:
+        error (Exception): Erro do envio
+
+    Returns:
+        bool: True para falhas de conexão e respostas SMTP 4xx
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Conexão recusada/resetada, timeout, DNS, pool sem conexões disponíveis
+    return isinstance(error, OSError)
+
+
+def retry_delay(attempts: int, max_delay: float = None) -> float:
+    """
+    Calcula a espera antes da próxima tentativa (backoff exponencial com jitter).
+
+    A espera dobra a cada tentativa, a partir de EMAIL_RETRY_BASE_DELAY e até
+    EMAIL_RETRY_MAX_DELAY; metade do valor é aleatória, para que emails que
+    falharam juntos não sejam reenviados todos ao mesmo tempo.
+
+    Args:
+        attempts (int): Tentativas já feitas
+        max_delay (float, optional): Espera máxima. Se None, usa EMAIL_RETRY_MAX_DELAY
+
+    Returns:
+        float: Segundos até a próxima tentativa
+    """
+    if max_delay is None:
+        max_delay = settings.EMAIL_RETRY_MAX_DELAY
+    delay = min(
+        max_delay,
+        settings.EMAIL_RETRY_BASE_DELAY * 2 ** max(0, attempts - 1),
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def dead_letter_email(
+    msg, error: Exception, attempts: int = 1, outbox=None
+) -> EmailDeadLetter:
+    """
+    Registra um email que falhou definitivamente, com a mensagem já renderizada.
+
+    Args:
+        msg (EmailMessage): Mensagem que falhou. Se None (falha ao montar a
+            mensagem), os dados vêm de `outbox` e o payload fica vazio
+        error (Exception): Erro do envio
+        attempts (int, optional): Tentativas feitas
+        outbox (EmailOutbox, optional): Registro da outbox de origem
+
+    Returns:
+        EmailDeadLetter: Registro criado
+    """
+    payload = None
+    if msg is not None:
+        try:
+            payload = serialize_email_message(msg)
+        except Exception as e:
+            print(f"Erro ao serializar email para a dead-letter: {e}")
+
+    if msg is not None:
+        subject = getattr(msg, "subject", "")
+        from_email = msg.from_email
+        recipients = msg.recipients()
+    else:
+        subject = outbox.subject
+        from_email = outbox.from_email
+        recipients = list(outbox.recipient_list) + list(outbox.bcc)
+
+    return EmailDeadLetter.objects.create(
+        subject=subject,
+        from_email=from_email,
+        recipients=recipients,
+        payload=payload,
+        error=str(error),
+        attempts=attempts,
+        outbox=outbox,
+    )
+
+
+def send_with_retry(messages: list, attempts: int = 0) -> int:
+    """
+    Envia mensagens na hora, tentando de novo as que tiverem falha transitória.
+
+    Entre as tentativas espera `retry_delay`, limitado a
+    EMAIL_RETRY_INLINE_MAX_DELAY, até EMAIL_RETRY_INLINE_ATTEMPTS tentativas;
+    só as mensagens que falharam são reenviadas. As que falharem
+    definitivamente, ou esgotarem as tentativas, vão para a dead-letter.
+
+    Args:
+        messages (list): Lista de `EmailMessage`
+        attempts (int, optional): Tentativas já feitas antes da chamada
+
+    Returns:
+        int: Quantidade de mensagens enviadas
+
+    Example:
+        >>> sent = send_with_retry(batch)
+        >>> failed = len(batch) - sent
+    """
+    max_attempts = settings.EMAIL_RETRY_INLINE_ATTEMPTS
+    pending = list(messages)
+    sent = 0
+    while pending:
+        if attempts:
+            time.sleep(retry_delay(attempts, settings.EMAIL_RETRY_INLINE_MAX_DELAY))
+        attempts += 1
+
+        errors = []
+        try:
+            sent += send_email_messages(pending, errors=errors)
+        except Exception as e:
+            # Falha ao abrir a conexão: nenhuma mensagem foi enviada
+            errors = [(message, e) for message in pending]
+
+        pending = []
+        for message, error in errors:
+            if is_transient_email_error(error) and attempts < max_attempts:
+                pending.append(message)
+                continue
+            try:
+                dead_letter_email(message, error, attempts=attempts)
+            except Exception as e:
+                print(f"Erro ao registrar email na dead-letter: {e}")
+    return sent
+
+
+def replay_dead_letters(queryset=None, batch_size: int = 100) -> dict:
+    """
+    Reenvia emails da dead-letter usando o payload gravado, sem renderizar de novo.
+
+    Os registros são lidos em lotes por ID; os reenviados com sucesso ganham
+    `replayed_at` e os que falharem de novo têm o erro atualizado.
+
+    Args:
+        queryset (QuerySet, optional): Registros a reenviar. Se None, todos
+        batch_size (int, optional): Registros lidos por consulta
+
+    Returns:
+        dict: {"sent": int, "failed": int, "skipped": int} (skipped = sem payload)
+    """
+    if queryset is None:
+        queryset = EmailDeadLetter.objects.all()
+    queryset = queryset.filter(replayed_at__isnull=True).order_by("id")
+
+    summary = {"sent": 0, "failed": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        letters = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not letters:
+            return summary
+        last_id = letters[-1].id
+
+        replayed = []
+        for letter in letters:
+            if not letter.payload:
+                summary["skipped"] += 1
+                continue
+
+            msg = RawEmailMessage(
+                bytes(letter.payload), letter.from_email, letter.recipients
+            )
+            try:
+                send_email_messages([msg])
+            except Exception as e:
+                print(f"Erro ao reenviar email da dead-letter #{letter.pk}: {e}")
+                EmailDeadLetter.objects.filter(pk=letter.pk).update(error=str(e))
+                summary["failed"] += 1
+                continue
+            replayed.append(letter.pk)
+
+        EmailDeadLetter.objects.filter(pk__in=replayed).update(
+            replayed_at=timezone.now()
+        )
+        summary["sent"] += len(replayed)
@@ -0,0 +1,219 @@
+"""
+Templates Jinja2 dos emails, compilados uma única vez por processo.
+
+Cada tipo de email é um template em `utils/templates/emails/` que estende
+`emails/base.html` e preenche os blocos `title`, `header`, `body` e `footer`.
+Valores do contexto passam por autoescape; use `|safe` só para conteúdo
+HTML confiável.
+
+O ambiente Jinja2 é criado na primeira renderização e reaproveitado pelo
+processo. O bytecode dos templates compilados fica em disco
+(EMAIL_TEMPLATE_BYTECODE_DIR), então novos workers não precisam compilar os
+templates de novo; com DEBUG ativo, templates alterados são recarregados.
+
+O layout de `base.html` também é exposto como `CompiledEmailTemplate`
+(`get_email_layout`): cada bloco é renderizado separadamente e intercalado
+no layout pré-compilado, o que mantém o CSS inline por fragmentos
+(EMAIL_INLINE_CSS_MODE="fragments") e a API de `build_email_html`.
+
+Example:
+    >>> html = render_email_html("welcome", user_name="Maria")
+    >>> text = render_email_text("welcome", user_name="Maria")
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
+
+from utils.email_metrics import email_stage
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+BASE_TEMPLATE = "emails/base.html"
+
+# Blocos do layout base e o slot correspondente de `build_email_html`
+LAYOUT_SLOTS = {
+    "title": "title",
+    "header": "header_content",
+    "body": "body_content",
+    "footer": "footer_content",
+}
+
+# Marcador usado no lugar de cada bloco ao extrair o layout de base.html
+_SLOT_MARKER = "\x00{}\x00"
+
+_environment = None
+_layout = None
+_lock = threading.Lock()
+
+
+def get_email_environment() -> Environment:
+    """
+    Retorna o ambiente Jinja2 dos emails, criado uma única vez por processo.
+
+    Returns:
+        Environment: Ambiente com autoescape para templates .html e cache de bytecode
+    """
+    global _environment
+    if _environment is None:
+        with _lock:
+            if _environment is None:
+                _environment = Environment(
+                    loader=FileSystemLoader(TEMPLATES_DIR),
+                    autoescape=select_autoescape(["html"]),
+                    bytecode_cache=_bytecode_cache(),
+                    auto_reload=settings.DEBUG,
+                )
+    return _environment
+
+
+def _bytecode_cache():
+    directory = settings.EMAIL_TEMPLATE_BYTECODE_DIR or os.path.join(
+        tempfile.gettempdir(), "armoreddjango-email-jinja"
+    )
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        print(f"Erro ao criar diretório de cache dos templates de email: {e}")
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def get_email_layout():
+    """
+    Retorna o layout de `base.html` como `CompiledEmailTemplate`.
+
+    Os blocos viram slots (`{title}`, `{header_content}`, `{body_content}`,
+    `{footer_content}`) e o texto ao redor fica exatamente como o Jinja2 o
+    renderiza. O layout é extraído uma vez por versão de `base.html`.
+
+    Returns:
+        CompiledEmailTemplate: Layout pronto para `render()`
+    """
+    from utils.emails import CompiledEmailTemplate
+
+    global _layout
+    env = get_email_environment()
+    base = env.get_template(BASE_TEMPLATE)
+
+    layout = _layout
+    if layout is not None and layout[0] is base:
+        return _track(f"layout:{BASE_TEMPLATE}", layout[1])
+
+    markers = "".join(
+        f"{{% block {block} %}}{_SLOT_MARKER.format(block)}{{% endblock %}}"
+        for block in LAYOUT_SLOTS
+    )
+    source = env.from_string(f'{{% extends "{BASE_TEMPLATE}" %}}{markers}').render()
+    source = source.replace("{", "{{").replace("}", "}}")
+    for block, slot in LAYOUT_SLOTS.items():
+        source = source.replace(_SLOT_MARKER.format(block), f"{{{slot}}}")
+
+    compiled = CompiledEmailTemplate(source)
+    _layout = (base, compiled)
+    return _track(f"layout:{BASE_TEMPLATE}", compiled)
+
+
+def _track(key: str, template):
+    # Contadores de `email_template_cache_stats()`
+    from utils.emails import email_template_cache
+
+    return email_template_cache.track(key, template)
+
+
+def _get_template(env: Environment, path: str):
+    return _track(f"jinja:{path}", env.get_template(path))
+
+
+def render_email_blocks(template_name: str, **context) -> dict:
+    """
+    Renderiza os blocos do layout de um template de email.
+
+    Blocos que o template não define usam o conteúdo padrão de `base.html`.
+
+    Args:
+        template_name (str): Nome do template (ex.: "welcome" ou "emails/welcome.html")
+        **context: Variáveis do template
+
+    Returns:
+        dict: Conteúdo de cada slot do layout (title, header_content, ...)
+    """
+    env = get_email_environment()
+    template = _get_template(env, _template_path(template_name, "html"))
+    return _render_blocks(template, env.get_template(BASE_TEMPLATE), context)
+
+
+def _render_blocks(template, base, context: dict) -> dict:
+    ctx = template.new_context(context)
+    values = {}
+    for block, slot in LAYOUT_SLOTS.items():
+        render_block = template.blocks.get(block) or base.blocks[block]
+        values[slot] = "".join(render_block(ctx))
+    return values
+
+
+def render_email_html(template_name: str, **context) -> str:
+    """
+    Renderiza o HTML de um tipo de email no layout base.
+
+    Args:
+        template_name (str): Nome do template (ex.: "welcome")
+        **context: Variáveis do template
+
+    Returns:
+        RenderedEmailHtml: HTML completo, com os blocos disponíveis para o CSS
+        inline por fragmentos
+    """
+    from utils.emails import RenderedEmailHtml
+
+    with email_stage("template_load", template=template_name):
+        env = get_email_environment()
+        layout = get_email_layout()
+        template = _get_template(env, _template_path(template_name, "html"))
+        base = env.get_template(BASE_TEMPLATE)
+
+    with email_stage("format", template=template_name):
+        return RenderedEmailHtml.from_template(
+            layout, **_render_blocks(template, base, context)
+        )
+
+
+def render_email_text(template_name: str, **context) -> str:
+    """
+    Renderiza a versão em texto plano de um tipo de email (`emails/<nome>.txt`).
+
+    Args:
+        template_name (str): Nome do template (ex.: "welcome")
+        **context: Variáveis do template
+
+    Returns:
+        str: Texto plano do email
+    """
+    env = get_email_environment()
+    return _get_template(env, _template_path(template_name, "txt")).render(context)
+
+
+def _template_path(template_name: str, extension: str) -> str:
+    if "/" in template_name:
+        return template_name
+    return f"emails/{template_name}.{extension}"
+
+
+def _reset_environment(setting, **kwargs):
+    global _environment, _layout
+    if setting in ("DEBUG", "EMAIL_TEMPLATE_BYTECODE_DIR"):
+        _environment = None
+        _layout = None
+
+
+setting_changed.connect(_reset_environment)
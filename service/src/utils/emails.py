@@ -2,12 +2,37 @@
 Email utility functions for sending emails.
 """
 
+import html
+import threading
+import time
 import uuid
 from pathlib import Path
+from string import Formatter
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core.mail import EmailMultiAlternatives
-from pynliner import Pynliner
+from django.db.models import QuerySet
+
+from utils.async_smtp import async_send_email_messages
+from utils.constants import EmailDigestPriority
+from utils.email_attachments import as_email_attachment, prepare_email_attachments
+from utils.email_idempotency import claim_idempotency_key, release_idempotency_key
+from utils.email_inline import inline_email_css
+from utils.email_metrics import email_stage, record_email_outcome
+from utils.email_minify import check_email_html_budget, minify_email_html
+from utils.email_pool import send_email_messages
+from utils.email_templates import (
+    BASE_TEMPLATE,
+    get_email_layout,
+    render_email_blocks,
+    render_email_html,
+    render_email_text,
+)
+
+# Marcador substituído pelo nome de cada destinatário nos envios em massa
+BULK_RECIPIENT_PLACEHOLDER = "@@recipient-name@@"
 
 
 def send_email(
@@ -20,10 +45,13 @@ def send_email(
     reply_to: list = None,
     bcc: list = None,
     headers: dict = None,
+    async_send: bool = None,
+    idempotency_key: str = None,
+    attachments: list = None,
 ) -> bool:
     """
     Envia um email multipart (text/plain + text/html) com suporte a clientes modernos.
-    
+
     Esta implementação usa EmailMultiAlternatives para garantir compatibilidade
     com todos os clientes de email, enviando tanto versão texto quanto HTML.
 
@@ -37,9 +65,24 @@ def send_email(
         reply_to (list, optional): Lista de endereços para Reply-To
         bcc (list, optional): Lista de destinatários em cópia oculta
         headers (dict, optional): Headers customizados adicionais
+        async_send (bool, optional): Se True, grava o email na outbox e retorna
+            imediatamente; o envio é feito pelo comando `email_worker`.
+            Se None, usa EMAIL_ASYNC_ENABLED
+        idempotency_key (str, optional): Chave de idempotência (ver
+            `utils.email_idempotency.make_idempotency_key`). Envios repetidos com
+            a mesma chave dentro de EMAIL_IDEMPOTENCY_WINDOW são ignorados
+        attachments (list, optional): Anexos (ver `utils.email_attachments`):
+            `EmailAttachment`, caminhos, file-likes ou tuplas (filename, content,
+            mimetype). Emails com anexos não passam pela outbox e são enviados na hora
 
     Returns:
-        bool: True se o email foi enviado com sucesso, False caso contrário
+        bool: True se o email foi enviado (ou enfileirado) com sucesso, False caso contrário.
+        Com EMAIL_ASYNC_ENABLED (outbox drenada pelo `email_worker`), falhas
+        transitórias de envio (conexão, SMTP 4xx) são enfileiradas para nova
+        tentativa e também retornam True; sem ele (ou com anexos), são tentadas
+        de novo na hora (`utils.email_retry.send_with_retry`). Emails que não
+        puderam ser enviados vão para a dead-letter e retornam False. Envios
+        duplicados ignorados pela chave de idempotência retornam True
 
     Example:
         >>> send_email(
@@ -51,22 +94,276 @@ def send_email(
         ... )
         True
     """
+    if idempotency_key is not None:
+        if not claim_idempotency_key(idempotency_key):
+            # Já aceito dentro da janela de deduplicação
+            record_email_outcome("duplicate")
+            return True
+
+        sent = send_email(
+            subject=subject,
+            text_content=text_content,
+            recipient_list=recipient_list,
+            html_content=html_content,
+            from_email=from_email,
+            inline_css=inline_css,
+            reply_to=reply_to,
+            bcc=bcc,
+            headers=headers,
+            async_send=async_send,
+            attachments=attachments,
+        )
+        if not sent:
+            # Libera a chave para que uma nova requisição possa tentar de novo
+            release_idempotency_key(idempotency_key)
+        return sent
+
     if from_email is None:
         from_email = settings.DEFAULT_FROM_EMAIL
 
+    if async_send is None:
+        async_send = settings.EMAIL_ASYNC_ENABLED
+
+    if async_send and not attachments:
+        # Grava na outbox e retorna imediatamente; o worker faz o envio
+        from utils.email_outbox import enqueue_email
+
+        try:
+            enqueue_email(
+                subject=subject,
+                text_content=text_content,
+                recipient_list=recipient_list,
+                html_content=html_content,
+                from_email=from_email,
+                inline_css=inline_css,
+                reply_to=reply_to,
+                bcc=bcc,
+                headers=headers,
+            )
+            record_email_outcome("queued")
+            return True
+        except Exception as e:
+            print(f"Erro ao enfileirar email: {e}")
+            record_email_outcome("failed")
+            return False
+
     try:
-        # Prepara o conteúdo HTML com CSS inline se necessário
-        processed_html = None
-        if html_content:
-            if inline_css:
-                try:
-                    processed_html = Pynliner().from_string(html_content).run()
-                except Exception as e:
-                    print(f"Erro ao aplicar CSS inline: {e}")
-                    processed_html = html_content
-            else:
-                processed_html = html_content
+        msg = build_email_message(
+            subject=subject,
+            text_content=text_content,
+            recipient_list=recipient_list,
+            html_content=html_content,
+            from_email=from_email,
+            inline_css=inline_css,
+            reply_to=reply_to,
+            bcc=bcc,
+            headers=headers,
+            attachments=attachments,
+        )
+    except Exception as e:
+        # Log the error in production
+        print(f"Erro ao enviar email: {e}")
+        record_email_outcome("failed")
+        return False
+
+    return _deliver_email_message(msg)
+
+
+def _deliver_email_message(msg) -> bool:
+    """
+    Envia uma mensagem já montada. Se o envio falhar, a outbox (nova
+    tentativa) ou a dead-letter ficam com o email (ver
+    `utils.email_outbox.retry_failed_email`).
+
+    Returns:
+        bool: True se o email foi enviado ou agendado para nova tentativa
+    """
+    try:
+        send_email_messages([msg])
+    except Exception as e:
+        print(f"Erro ao enviar email: {e}")
+
+        # Falha transitória: nova tentativa pelo worker (ou na hora, sem a
+        # outbox); definitiva: dead-letter
+        from utils.email_outbox import retry_failed_email
+
+        retried = retry_failed_email(msg, e)
+        record_email_outcome("retry" if retried else "failed")
+        return retried
+
+    record_email_outcome("sent")
+    return True
+
+
+async def asend_email(
+    subject: str,
+    text_content: str,
+    recipient_list: list,
+    html_content: str = None,
+    from_email: str = None,
+    inline_css: bool = True,
+    reply_to: list = None,
+    bcc: list = None,
+    headers: dict = None,
+    async_send: bool = None,
+    idempotency_key: str = None,
+    attachments: list = None,
+) -> bool:
+    """
+    Versão assíncrona de `send_email`, para views async (ASGI).
+
+    O envio SMTP usa o cliente asyncio de `utils.async_smtp`, sem ocupar uma
+    thread enquanto espera o servidor. Os passos que acessam banco ou cache
+    (chave de idempotência, outbox, nova tentativa) rodam com `sync_to_async`,
+    e a mensagem com anexos é montada em uma thread (leitura dos arquivos).
+    Os argumentos e o retorno são os mesmos de `send_email`.
+
+    Example:
+        >>> await asend_email(
+        ...     subject="Bem-vindo!",
+        ...     text_content="Bem-vindo ao nosso sistema.",
+        ...     recipient_list=["user@example.com"],
+        ... )
+        True
+    """
+    if idempotency_key is not None:
+        if not await sync_to_async(claim_idempotency_key)(idempotency_key):
+            record_email_outcome("duplicate")
+            return True
+
+        sent = await asend_email(
+            subject=subject,
+            text_content=text_content,
+            recipient_list=recipient_list,
+            html_content=html_content,
+            from_email=from_email,
+            inline_css=inline_css,
+            reply_to=reply_to,
+            bcc=bcc,
+            headers=headers,
+            async_send=async_send,
+            attachments=attachments,
+        )
+        if not sent:
+            await sync_to_async(release_idempotency_key)(idempotency_key)
+        return sent
+
+    if async_send is None:
+        async_send = settings.EMAIL_ASYNC_ENABLED
+
+    if async_send and not attachments:
+        # Gravação na outbox: mesmo caminho de `send_email`
+        return await sync_to_async(send_email)(
+            subject=subject,
+            text_content=text_content,
+            recipient_list=recipient_list,
+            html_content=html_content,
+            from_email=from_email,
+            inline_css=inline_css,
+            reply_to=reply_to,
+            bcc=bcc,
+            headers=headers,
+            async_send=True,
+        )
+
+    message_kwargs = {
+        "subject": subject,
+        "text_content": text_content,
+        "recipient_list": recipient_list,
+        "html_content": html_content,
+        "from_email": from_email,
+        "inline_css": inline_css,
+        "reply_to": reply_to,
+        "bcc": bcc,
+        "headers": headers,
+        "attachments": attachments,
+    }
+
+    msg = None
+    try:
+        if attachments:
+            # Os anexos podem ser lidos do disco: monta a mensagem em uma thread
+            msg = await sync_to_async(build_email_message, thread_sensitive=False)(
+                **message_kwargs
+            )
+        else:
+            msg = build_email_message(**message_kwargs)
+        await async_send_email_messages([msg])
+        record_email_outcome("sent")
+        return True
+
+    except Exception as e:
+        print(f"Erro ao enviar email: {e}")
+        if msg is None:
+            record_email_outcome("failed")
+            return False
+
+        from utils.email_outbox import retry_failed_email
+
+        retried = await sync_to_async(retry_failed_email)(msg, e)
+        record_email_outcome("retry" if retried else "failed")
+        return retried
+
+
+def default_email_headers(from_email: str) -> dict:
+    """
+    Gera os headers padrão aplicados a todos os emails enviados.
+
+    Args:
+        from_email (str): Email do remetente (usado no domínio do Message-ID)
+
+    Returns:
+        dict: Headers padrão (Message-ID, X-Mailer, X-Priority, X-Entity-Ref-ID)
+    """
+    return {
+        # Message-ID único para rastreamento e threading
+        "Message-ID": f"<{uuid.uuid7()}@{from_email.split('@')[-1]}>",
+        # Identificador do sistema
+        "X-Mailer": "ArmoredDjango/1.0",
+        # Prioridade normal
+        "X-Priority": "3",
+        # ID de referência único para rastreamento
+        "X-Entity-Ref-ID": str(uuid.uuid7()),
+    }
+
+
+def build_email_message(
+    subject: str,
+    text_content: str,
+    recipient_list: list,
+    html_content: str = None,
+    from_email: str = None,
+    inline_css: bool = True,
+    reply_to: list = None,
+    bcc: list = None,
+    headers: dict = None,
+    attachments: list = None,
+) -> EmailMultiAlternatives:
+    """
+    Monta a mensagem multipart pronta para envio, sem enviá-la.
 
+    Usada por `send_email` e pelo worker da outbox (`email_worker`).
+    Com `inline_css=False` o HTML é considerado pronto e entra como está
+    (sem CSS inline, minificação ou verificação de tamanho). Headers
+    informados em `headers` sobrescrevem os headers padrão. Anexos
+    (`EmailAttachment` ou formatos aceitos por `as_email_attachment`) entram
+    com a parte MIME já codificada, compartilhada entre as mensagens.
+
+    Returns:
+        EmailMultiAlternatives: Mensagem com texto plano, HTML e headers aplicados
+    """
+    if from_email is None:
+        from_email = settings.DEFAULT_FROM_EMAIL
+
+    # Prepara o conteúdo HTML com CSS inline (e minificação) se necessário
+    processed_html = None
+    if html_content:
+        if inline_css:
+            processed_html = prepare_email_html(html_content)
+        else:
+            processed_html = html_content
+
+    with email_stage("mime_build"):
         # Cria email multipart (melhor compatibilidade)
         msg = EmailMultiAlternatives(
             subject=subject,
@@ -81,17 +378,11 @@ def send_email(
         if processed_html:
             msg.attach_alternative(processed_html, "text/html")
 
+        for attachment in attachments or []:
+            msg.attach(as_email_attachment(attachment).mime_part())
+
         # Adiciona headers importantes
-        email_headers = {
-            # Message-ID único para rastreamento e threading
-            "Message-ID": f"<{uuid.uuid7()}@{from_email.split('@')[-1]}>",
-            # Identificador do sistema
-            "X-Mailer": "ArmoredDjango/1.0",
-            # Prioridade normal
-            "X-Priority": "3",
-            # ID de referência único para rastreamento
-            "X-Entity-Ref-ID": str(uuid.uuid7()),
-        }
+        email_headers = default_email_headers(from_email)
 
         # Adiciona headers customizados se fornecidos
         if headers:
@@ -101,37 +392,47 @@ def send_email(
         for key, value in email_headers.items():
             msg.extra_headers[key] = value
 
-        msg.send()
-        return True
-
-    except Exception as e:
-        # Log the error in production
-        print(f"Erro ao enviar email: {e}")
-        return False
+    return msg
 
 
-def load_email_template(template_path: str = None) -> str:
+def prepare_email_html(html_content: str, check_budget: bool = True) -> str:
     """
-    Carrega o template HTML base para emails.
-    
+    Prepara o HTML para envio: CSS inline, minificação e limite de tamanho.
+
+    A minificação só é feita com EMAIL_HTML_MINIFY ativo. Falhas no CSS
+    inline ou na minificação não impedem o envio (o HTML segue como estava).
+
     Args:
-        template_path (str, optional): Caminho customizado do template
-    
+        html_content (str): HTML do email
+        check_budget (bool, optional): Se False, não confere
+            EMAIL_HTML_BYTE_BUDGET (ex.: pré-visualizações)
+
     Returns:
-        str: Conteúdo do template HTML
+        str: HTML pronto para envio
+
+    Raises:
+        EmailHtmlTooLarge: Se o HTML exceder EMAIL_HTML_BYTE_BUDGET e
+            EMAIL_HTML_BUDGET_STRICT estiver ativo
     """
-    if template_path is None:
-        template_path = Path(__file__).parent / "email_template.html"
-    else:
-        template_path = Path(template_path)
-    
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        with email_stage("inline"):
+            html_content = inline_email_css(html_content)
     except Exception as e:
-        print(f"Erro ao carregar template: {e}")
-        # Retorna template básico como fallback
-        return """
+        print(f"Erro ao aplicar CSS inline: {e}")
+
+    if settings.EMAIL_HTML_MINIFY:
+        try:
+            with email_stage("minify"):
+                html_content = minify_email_html(html_content)
+        except Exception as e:
+            print(f"Erro ao minificar HTML do email: {e}")
+
+    if check_budget:
+        check_email_html_budget(html_content)
+    return html_content
+
+
+FALLBACK_EMAIL_TEMPLATE = """
         <html>
             <body style="font-family: Arial, sans-serif; padding: 20px;">
                 {body_content}
@@ -140,6 +441,226 @@ def load_email_template(template_path: str = None) -> str:
         """
 
 
+class CompiledEmailTemplate:
+    """
+    Template de email pré-compilado para renderização rápida.
+
+    O texto é dividido uma única vez em trechos literais e slots
+    (`{title}`, `{header_content}`, ...). Renderizar apenas intercala os
+    valores nos slots, produzindo exatamente o mesmo resultado de
+    `source.format(**values)` sem reinterpretar o documento inteiro.
+
+    Atributos:
+        - source (str): Texto original do template.
+        - mtime (int): mtime (ns) do arquivo quando foi lido.
+    """
+
+    def __init__(self, source: str, mtime: int = None):
+        self.source = source
+        self.mtime = mtime
+        self._segments = []
+        # True se todos os slots são simples ({nome}, sem format spec)
+        self.plain_slots = True
+
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pending += literal
+            if field is None:
+                # Chaves escapadas ({{ }}) dividem o texto; junta com o próximo trecho
+                continue
+            if not field.isidentifier() or conversion or "{" in spec:
+                # Campos posicionais, atributos, conversões ou specs aninhados: usa str.format
+                self._segments = None
+                self.plain_slots = False
+                return
+            if spec:
+                self.plain_slots = False
+            self._segments.append((pending, field, spec))
+            pending = ""
+        self._segments.append((pending, None, ""))
+
+    @property
+    def segments(self) -> list:
+        """Pares (texto literal, slot) na ordem do template; o último trecho tem slot None."""
+        if self._segments is None:
+            return []
+        return [(literal, field) for literal, field, _ in self._segments]
+
+    def render(self, **values) -> str:
+        """
+        Substitui os slots do template pelos valores informados.
+
+        Raises:
+            KeyError: Se algum slot do template não foi informado
+        """
+        if self._segments is None:
+            return self.source.format(**values)
+
+        parts = []
+        for literal, field, spec in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(format(values[field], spec))
+        return "".join(parts)
+
+
+class RenderedEmailHtml(str):
+    """
+    HTML gerado por `build_email_html`, que lembra o template e os valores usados.
+
+    Se comporta como uma `str` comum; os atributos extras permitem que o CSS
+    inline seja aplicado só nos fragmentos (ver `utils.email_inline`).
+
+    Atributos:
+        - template (CompiledEmailTemplate): Template usado na renderização.
+        - values (dict): Valores de cada slot.
+    """
+
+    template = None
+    values = None
+
+    @classmethod
+    def from_template(cls, template: CompiledEmailTemplate, **values):
+        html = cls(template.render(**values))
+        html.template = template
+        html.values = values
+        return html
+
+
+class EmailTemplateCache:
+    """
+    Cache de templates de email por processo, indexado pelo caminho do arquivo.
+
+    O arquivo é lido e compilado uma única vez; nas chamadas seguintes só o
+    mtime é consultado, e o template é recarregado se o arquivo mudar. Os
+    contadores também incluem o layout de `base.html` e os templates Jinja2
+    (`utils.email_templates`), registrados com `track`.
+
+    Atributos:
+        - hits (int): Templates servidos do cache.
+        - misses (int): Templates lidos do disco (ou compilados de novo).
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_path) -> CompiledEmailTemplate:
+        """
+        Retorna o template compilado, lendo do disco apenas se necessário.
+
+        Raises:
+            OSError: Se o arquivo não puder ser lido
+        """
+        path = Path(template_path)
+        mtime = path.stat().st_mtime_ns
+
+        entry = self._entries.get(path)
+        if entry is not None and entry.mtime == mtime:
+            self.hits += 1
+            return entry
+
+        with open(path, "r", encoding="utf-8") as f:
+            entry = CompiledEmailTemplate(f.read(), mtime)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = entry
+        return entry
+
+    def track(self, key: str, template):
+        """
+        Conta o acesso a um template mantido em outro cache (layout, Jinja2).
+
+        É um hit se `template` é o mesmo objeto já servido para `key`; um
+        objeto novo (primeiro acesso ou template recarregado) é um miss.
+
+        Returns:
+            O próprio `template`
+        """
+        with self._lock:
+            if self._entries.get(key) is template:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._entries[key] = template
+        return template
+
+    def clear(self):
+        """Remove todos os templates do cache e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "size": int}
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+email_template_cache = EmailTemplateCache()
+
+
+def email_template_cache_stats() -> dict:
+    """
+    Retorna os contadores de hit/miss do cache de templates deste processo.
+
+    Inclui os templates `str.format` customizados, o layout de `base.html` e
+    os templates Jinja2 de `utils/templates/emails/`.
+
+    Example:
+        >>> email_template_cache_stats()
+        {"hits": 41, "misses": 3, "size": 3}
+    """
+    return email_template_cache.stats()
+
+
+def get_compiled_email_template(template_path: str = None) -> CompiledEmailTemplate:
+    """
+    Retorna o template base de emails já compilado (com cache por processo).
+
+    Sem `template_path`, retorna o layout de `emails/base.html` (ver
+    `utils.email_templates.get_email_layout`).
+
+    Args:
+        template_path (str, optional): Caminho customizado do template (str.format)
+
+    Returns:
+        CompiledEmailTemplate: Template pronto para `render()`
+    """
+    try:
+        if template_path is None:
+            return get_email_layout()
+        return email_template_cache.get(template_path)
+    except Exception as e:
+        print(f"Erro ao carregar template: {e}")
+        # Retorna template básico como fallback
+        return CompiledEmailTemplate(FALLBACK_EMAIL_TEMPLATE)
+
+
+def load_email_template(template_path: str = None) -> str:
+    """
+    Carrega o template HTML base para emails.
+
+    O conteúdo vem do cache de templates do processo, então o arquivo só é
+    lido novamente quando é alterado.
+
+    Args:
+        template_path (str, optional): Caminho customizado do template
+
+    Returns:
+        str: Conteúdo do template HTML
+    """
+    return get_compiled_email_template(template_path).source
+
+
 def build_email_html(
     title: str,
     header_content: str,
@@ -148,36 +669,46 @@ def build_email_html(
 ) -> str:
     """
     Constrói o HTML do email usando o template base.
-    
+
+    Os conteúdos são HTML e entram no layout sem escape. Para novos tipos de
+    email, prefira um template em `utils/templates/emails/` renderizado com
+    `render_email_html` (autoescape nas variáveis).
+
     Args:
         title (str): Título do email
         header_content (str): Conteúdo do cabeçalho
         body_content (str): Conteúdo principal
         footer_content (str, optional): Conteúdo do rodapé
-    
+
     Returns:
         str: HTML completo do email
     """
-    template = load_email_template()
-    
-    if footer_content is None:
-        footer_content = "© ArmoredDjango — Todos os direitos reservados"
-    
-    return template.format(
-        title=title,
-        header_content=header_content,
-        body_content=body_content,
-        footer_content=footer_content,
-    )
+    with email_stage("template_load"):
+        template = get_compiled_email_template()
+
+    with email_stage("format"):
+        if footer_content is None:
+            footer_content = render_email_blocks(BASE_TEMPLATE)["footer_content"]
+
+        return RenderedEmailHtml.from_template(
+            template,
+            title=title,
+            header_content=header_content,
+            body_content=body_content,
+            footer_content=footer_content,
+        )
 
 
-def send_welcome_email(user, custom_message: str = None) -> bool:
+def send_welcome_email(
+    user, custom_message: str = None, idempotency_key: str = None
+) -> bool:
     """
     Envia um email de boas-vindas ao usuário com template profissional.
 
     Args:
         user: Objeto do usuário (Profile)
         custom_message (str, optional): Mensagem customizada adicional
+        idempotency_key (str, optional): Chave de idempotência repassada a `send_email`
 
     Returns:
         bool: True se o email foi enviado com sucesso, False caso contrário
@@ -189,74 +720,56 @@ def send_welcome_email(user, custom_message: str = None) -> bool:
         >>> send_welcome_email(user)
         True
     """
-    subject = "Bem-vindo(a) ao ArmoredDjango!"
-    user_name = user.get_full_name() or user.username
-
-    text_content = f"""
-    Olá {user_name},
-
-    Seja bem-vindo(a) ao nosso sistema!
-
-    Seu cadastro foi realizado com sucesso. A partir de agora, você pode
-    utilizar o sistema para acessar todos os recursos disponíveis.
-
-    {custom_message or ''}
-
-    Caso tenha qualquer dúvida ou dificuldade, nossa equipe está à disposição
-    para ajudar.
-
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """.strip()
-
-    # Conteúdo do cabeçalho
-    header_content = """
-        <div style="text-align: center;">
-            <h1 class="brand">ArmoredDjango</h1>
-        </div>
-    """
-
-    # Conteúdo principal
-    body_parts = [
-        f'<p class="greeting">Olá <strong>{user_name}</strong>,</p>',
-        '<p class="message">Seja bem-vindo(a) ao nosso sistema!</p>',
-        '<p class="message">Seu cadastro foi realizado com sucesso.</p>',
-    ]
-
-    if custom_message:
-        body_parts.append(f'<p class="message">{custom_message}</p>')
+    subject, text_content, html_content = _build_welcome_content(
+        user.get_full_name() or user.username, custom_message
+    )
 
-    body_parts.append("""
-        <div class="signature">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """)
+    return send_email(
+        subject=subject,
+        text_content=text_content,
+        recipient_list=[user.email],
+        html_content=html_content,
+        idempotency_key=idempotency_key,
+    )
 
-    body_content = "\n".join(body_parts)
 
-    # Monta HTML completo
-    html_content = build_email_html(
-        title="Bem-vindo ao ArmoredDjango",
-        header_content=header_content,
-        body_content=body_content,
+async def asend_welcome_email(
+    user, custom_message: str = None, idempotency_key: str = None
+) -> bool:
+    """Versão assíncrona de `send_welcome_email` (envio por `asend_email`)."""
+    subject, text_content, html_content = _build_welcome_content(
+        user.get_full_name() or user.username, custom_message
     )
 
-    return send_email(
+    return await asend_email(
         subject=subject,
         text_content=text_content,
         recipient_list=[user.email],
         html_content=html_content,
+        idempotency_key=idempotency_key,
     )
 
 
-def send_password_reset_email(user, reset_url: str) -> bool:
+def _build_welcome_content(user_name: str, custom_message: str = None) -> tuple:
+    """Monta (assunto, texto plano, HTML) do email de boas-vindas."""
+    subject = "Bem-vindo(a) ao ArmoredDjango!"
+    context = {"user_name": user_name, "custom_message": custom_message}
+    text_content = render_email_text("welcome", **context)
+    html_content = render_email_html("welcome", **context)
+
+    return subject, text_content, html_content
+
+
+def send_password_reset_email(
+    user, reset_url: str, idempotency_key: str = None
+) -> bool:
     """
     Envia um email de redefinição de senha ao usuário com template profissional.
 
     Args:
         user: Objeto do usuário (Profile)
         reset_url (str): URL para redefinição de senha
+        idempotency_key (str, optional): Chave de idempotência repassada a `send_email`
 
     Returns:
         bool: True se o email foi enviado com sucesso, False caso contrário
@@ -265,72 +778,8 @@ def send_password_reset_email(user, reset_url: str) -> bool:
         >>> send_password_reset_email(user, "https://example.com/reset/token123")
         True
     """
-    subject = "Redefinição de Senha - ArmoredDjango"
-    user_name = user.get_full_name() or user.username
-
-    text_content = f"""
-    Olá {user_name},
-
-    Recebemos uma solicitação para redefinir sua senha.
-
-    Para redefinir sua senha, acesse o link abaixo:
-    {reset_url}
-
-    Se você não solicitou esta redefinição, ignore este email.
-    Sua senha permanecerá a mesma e nenhuma alteração será feita.
-
-    Atenciosamente,
-    Equipe ArmoredDjango
-    """
-
-    # Conteúdo do cabeçalho
-    header_content = """
-        <div style="text-align: center;">
-            <h1 class="brand">ArmoredDjango</h1>
-            <p style="color: #666; margin-top: 8px;">Redefinição de Senha</p>
-        </div>
-    """
-
-    # Conteúdo principal
-    body_content = f"""
-        <p class="greeting">Olá <strong>{user_name}</strong>,</p>
-        
-        <p class="message">Recebemos uma solicitação para redefinir sua senha.</p>
-        
-        <p class="message">Para criar uma nova senha, clique no botão abaixo:</p>
-        
-        <div style="text-align: center; margin: 32px 0;">
-            <a href="{reset_url}" class="button">
-                Redefinir Senha
-            </a>
-        </div>
-        
-        <p style="font-size: 14px; color: #666;">
-            Ou copie e cole o link abaixo no seu navegador:
-        </p>
-        <p style="font-size: 13px; color: #00529C; word-break: break-all;">
-            {reset_url}
-        </p>
-        
-        <div class="alert-box" style="margin-top: 24px;">
-            <p class="alert-title">⚠️ Aviso de Segurança</p>
-            <p class="alert-text">
-                Se você não solicitou esta redefinição, ignore este email.
-                Sua senha permanecerá a mesma e nenhuma alteração será feita.
-            </p>
-        </div>
-        
-        <div class="signature">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """
-
-    # Monta HTML completo
-    html_content = build_email_html(
-        title="Redefinição de Senha",
-        header_content=header_content,
-        body_content=body_content,
+    subject, text_content, html_content = _build_password_reset_content(
+        user.get_full_name() or user.username, reset_url
     )
 
     return send_email(
@@ -338,28 +787,68 @@ def send_password_reset_email(user, reset_url: str) -> bool:
         text_content=text_content,
         recipient_list=[user.email],
         html_content=html_content,
+        idempotency_key=idempotency_key,
+    )
+
+
+async def asend_password_reset_email(
+    user, reset_url: str, idempotency_key: str = None
+) -> bool:
+    """Versão assíncrona de `send_password_reset_email` (envio por `asend_email`)."""
+    subject, text_content, html_content = _build_password_reset_content(
+        user.get_full_name() or user.username, reset_url
+    )
+
+    return await asend_email(
+        subject=subject,
+        text_content=text_content,
+        recipient_list=[user.email],
+        html_content=html_content,
+        idempotency_key=idempotency_key,
     )
 
 
+def _build_password_reset_content(user_name: str, reset_url: str) -> tuple:
+    """Monta (assunto, texto plano, HTML) do email de redefinição de senha."""
+    subject = "Redefinição de Senha - ArmoredDjango"
+    context = {"user_name": user_name, "reset_url": reset_url}
+    text_content = render_email_text("password_reset", **context)
+    html_content = render_email_html("password_reset", **context)
+
+    return subject, text_content, html_content
+
+
 def send_notification_email(
     user,
     notification_title: str,
     notification_message: str,
     action_url: str = None,
     action_label: str = "Ver Detalhes",
+    idempotency_key: str = None,
+    digest: bool = None,
+    priority: int = EmailDigestPriority.NORMAL,
 ) -> bool:
     """
     Envia um email de notificação genérico ao usuário.
 
+    No modo digest, a notificação é acumulada e enviada junto com as demais
+    notificações do usuário em um único email (ver `utils.email_digest`).
+
     Args:
         user: Objeto do usuário (Profile)
         notification_title (str): Título da notificação
         notification_message (str): Mensagem da notificação
         action_url (str, optional): URL para ação relacionada
         action_label (str, optional): Label do botão de ação
+        idempotency_key (str, optional): Chave de idempotência repassada a `send_email`
+        digest (bool, optional): Se True, acumula no digest do usuário. Se None,
+            usa EMAIL_DIGEST_ENABLED
+        priority (int, optional): Prioridade no digest (`EmailDigestPriority`);
+            a partir de EMAIL_DIGEST_FLUSH_PRIORITY o digest é enviado na hora
 
     Returns:
-        bool: True se o email foi enviado com sucesso, False caso contrário
+        bool: True se o email foi enviado (ou acumulado no digest) com sucesso,
+        False caso contrário
 
     Example:
         >>> send_notification_email(
@@ -371,65 +860,313 @@ def send_notification_email(
         ... )
         True
     """
-    subject = f"{notification_title} - ArmoredDjango"
+    if digest is None:
+        digest = settings.EMAIL_DIGEST_ENABLED
+
+    if digest:
+        from utils.email_digest import queue_digest_notification
+
+        if idempotency_key is not None and not claim_idempotency_key(idempotency_key):
+            # Já aceito dentro da janela de deduplicação
+            record_email_outcome("duplicate")
+            return True
+
+        queued = False
+        try:
+            queued = queue_digest_notification(
+                user,
+                notification_title,
+                notification_message,
+                action_url,
+                action_label,
+                priority,
+            )
+            return queued
+        finally:
+            # Libera a chave para que uma nova tentativa não seja descartada
+            if not queued and idempotency_key is not None:
+                release_idempotency_key(idempotency_key)
+
     user_name = user.get_full_name() or user.username
+    subject, text_content, html_content = _build_notification_content(
+        user_name, notification_title, notification_message, action_url, action_label
+    )
+
+    return send_email(
+        subject=subject,
+        text_content=text_content,
+        recipient_list=[user.email],
+        html_content=html_content,
+        idempotency_key=idempotency_key,
+    )
+
+
+async def asend_notification_email(
+    user,
+    notification_title: str,
+    notification_message: str,
+    action_url: str = None,
+    action_label: str = "Ver Detalhes",
+    idempotency_key: str = None,
+    digest: bool = None,
+    priority: int = EmailDigestPriority.NORMAL,
+) -> bool:
+    """
+    Versão assíncrona de `send_notification_email` (envio por `asend_email`).
 
-    text_content = f"""
-    Olá {user_name},
+    No modo digest a notificação é gravada no banco, com `sync_to_async`.
+    """
+    if digest is None:
+        digest = settings.EMAIL_DIGEST_ENABLED
+
+    if digest:
+        return await sync_to_async(send_notification_email)(
+            user,
+            notification_title,
+            notification_message,
+            action_url,
+            action_label,
+            idempotency_key=idempotency_key,
+            digest=True,
+            priority=priority,
+        )
+
+    user_name = user.get_full_name() or user.username
+    subject, text_content, html_content = _build_notification_content(
+        user_name, notification_title, notification_message, action_url, action_label
+    )
+
+    return await asend_email(
+        subject=subject,
+        text_content=text_content,
+        recipient_list=[user.email],
+        html_content=html_content,
+        idempotency_key=idempotency_key,
+    )
+
+
+def _build_notification_content(
+    user_name: str,
+    notification_title: str,
+    notification_message: str,
+    action_url: str = None,
+    action_label: str = "Ver Detalhes",
+) -> tuple:
+    """
+    Monta (assunto, texto plano, HTML) do email de notificação.
+
+    A mensagem pode conter HTML (entra no email sem escape); título, URL e
+    label passam por autoescape.
+    """
+    subject = f"{notification_title} - ArmoredDjango"
+    context = {
+        "user_name": user_name,
+        "notification": {
+            "title": notification_title,
+            "message": notification_message,
+            "action_url": action_url,
+            "action_label": action_label,
+        },
+    }
+    text_content = render_email_text("notification", **context)
+    html_content = render_email_html("notification", **context)
+
+    return subject, text_content, html_content
+
+
+def send_bulk_notification(
+    queryset_or_ids,
+    notification_title: str,
+    notification_message: str,
+    action_url: str = None,
+    action_label: str = "Ver Detalhes",
+    batch_size: int = None,
+    chunk_size: int = 2000,
+    attachments: list = None,
+) -> dict:
+    """
+    Envia o mesmo email de notificação para muitos usuários de uma vez.
 
-    {notification_title}
+    O HTML é montado e preparado (CSS inline, minificação) uma única vez; para cada
+    destinatário só a saudação é personalizada. Os usuários são lidos do banco
+    em blocos (`.iterator(chunk_size=...)`) e as mensagens são enviadas em lotes
+    pela mesma conexão SMTP do pool. Usuários sem email são ignorados. Os
+    anexos são codificados uma única vez e a mesma parte MIME entra em todas
+    as mensagens.
 
-    {notification_message}
+    Args:
+        queryset_or_ids: QuerySet de Profile ou lista de IDs
+        notification_title (str): Título da notificação
+        notification_message (str): Mensagem da notificação
+        action_url (str, optional): URL para ação relacionada
+        action_label (str, optional): Label do botão de ação
+        batch_size (int, optional): Mensagens por lote. Se None, usa EMAIL_BULK_BATCH_SIZE
+        chunk_size (int, optional): Usuários lidos do banco por consulta
+        attachments (list, optional): Anexos, codificados uma única vez e
+            compartilhados por todas as mensagens
 
-    {f'Para mais detalhes, acesse: {action_url}' if action_url else ''}
+    Returns:
+        dict: Resumo do envio, com "sent", "failed" e "duration" (segundos)
 
-    Atenciosamente,
-    Equipe ArmoredDjango
+    Example:
+        >>> send_bulk_notification(
+        ...     Profile.objects.filter(is_active=True),
+        ...     "Manutenção programada",
+        ...     "O sistema ficará indisponível domingo, das 2h às 4h.",
+        ... )
+        {"sent": 49998, "failed": 2, "duration": 812.4}
     """
+    started = time.monotonic()
+
+    # Conteúdo compartilhado: montado, com CSS inline e minificado uma única vez
+    subject, text_content, html_content = _build_notification_content(
+        BULK_RECIPIENT_PLACEHOLDER,
+        notification_title,
+        notification_message,
+        action_url,
+        action_label,
+    )
+
+    summary = _send_personalized_batches(
+        _bulk_recipients(queryset_or_ids),
+        subject,
+        text_content,
+        html_content,
+        batch_size=batch_size,
+        chunk_size=chunk_size,
+        attachments=attachments,
+    )
+    summary["duration"] = round(time.monotonic() - started, 3)
+    return summary
+
 
-    # Conteúdo do cabeçalho
-    header_content = """
-        <div style="text-align: center;">
-            <h1 class="brand">ArmoredDjango</h1>
-            <p style="color: #666; margin-top: 8px;">Notificação</p>
-        </div>
+def send_bulk_welcome_email(
+    queryset_or_ids,
+    custom_message: str = None,
+    batch_size: int = None,
+    chunk_size: int = 2000,
+) -> dict:
     """
+    Envia o email de boas-vindas para muitos usuários de uma vez.
 
-    # Conteúdo principal
-    body_parts = [
-        f'<p class="greeting">Olá <strong>{user_name}</strong>,</p>',
-        f'<h2 style="color: #00529C; margin: 24px 0 16px;">{notification_title}</h2>',
-        f'<p class="message">{notification_message}</p>',
-    ]
+    Mesmo esquema de `send_bulk_notification`: o HTML é preparado uma única
+    vez, só a saudação muda por destinatário e as mensagens saem em lotes pela
+    mesma conexão SMTP do pool. Usado pelo envio automático após o cadastro
+    (`authentication.signals`), que junta os perfis criados na mesma transação.
 
-    if action_url:
-        body_parts.append(f"""
-            <div style="text-align: center; margin: 32px 0;">
-                <a href="{action_url}" class="button">
-                    {action_label}
-                </a>
-            </div>
-        """)
+    Args:
+        queryset_or_ids: QuerySet de Profile ou lista de IDs
+        custom_message (str, optional): Mensagem customizada adicional
+        batch_size (int, optional): Mensagens por lote. Se None, usa EMAIL_BULK_BATCH_SIZE
+        chunk_size (int, optional): Usuários lidos do banco por consulta
 
-    body_parts.append("""
-        <div class="signature">
-            <p>Atenciosamente,<br>
-            <strong>Equipe ArmoredDjango</strong></p>
-        </div>
-    """)
+    Returns:
+        dict: Resumo do envio, com "sent", "failed" e "duration" (segundos)
 
-    body_content = "\n".join(body_parts)
+    Example:
+        >>> profiles = Profile.objects.bulk_create(novos_perfis)
+        >>> send_bulk_welcome_email([p.pk for p in profiles])
+        {"sent": 3000, "failed": 0, "duration": 41.2}
+    """
+    started = time.monotonic()
 
-    # Monta HTML completo
-    html_content = build_email_html(
-        title=notification_title,
-        header_content=header_content,
-        body_content=body_content,
+    subject, text_content, html_content = _build_welcome_content(
+        BULK_RECIPIENT_PLACEHOLDER, custom_message
     )
 
-    return send_email(
-        subject=subject,
-        text_content=text_content,
-        recipient_list=[user.email],
-        html_content=html_content,
+    summary = _send_personalized_batches(
+        _bulk_recipients(queryset_or_ids),
+        subject,
+        text_content,
+        html_content,
+        batch_size=batch_size,
+        chunk_size=chunk_size,
+    )
+    summary["duration"] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def _bulk_recipients(queryset_or_ids) -> QuerySet:
+    """Usuários com email de um QuerySet ou lista de IDs, em ordem de pk."""
+    if isinstance(queryset_or_ids, QuerySet):
+        users = queryset_or_ids
+    else:
+        users = get_user_model().objects.filter(pk__in=list(queryset_or_ids))
+
+    return (
+        users.exclude(email__isnull=True)
+        .exclude(email="")
+        .only("pk", "username", "first_name", "last_name", "email")
+        .order_by("pk")
     )
+
+
+def _send_personalized_batches(
+    users,
+    subject: str,
+    text_content: str,
+    html_content: str,
+    batch_size: int = None,
+    chunk_size: int = 2000,
+    attachments: list = None,
+) -> dict:
+    """
+    Envia o mesmo conteúdo para `users`, trocando BULK_RECIPIENT_PLACEHOLDER
+    pelo nome de cada um, em lotes pela mesma conexão SMTP.
+
+    Returns:
+        dict: "sent" e "failed"
+    """
+    if batch_size is None:
+        batch_size = settings.EMAIL_BULK_BATCH_SIZE
+
+    html_content = prepare_email_html(html_content)
+    attachments = prepare_email_attachments(attachments)
+
+    summary = {"sent": 0, "failed": 0}
+
+    def flush(batch):
+        # Falhas transitórias são tentadas de novo; as demais vão para a dead-letter
+        from utils.email_retry import send_with_retry
+
+        try:
+            sent = send_with_retry(batch)
+        except Exception as e:
+            print(f"Erro ao enviar lote de {len(batch)} emails: {e}")
+            sent = 0
+        summary["sent"] += sent
+        summary["failed"] += len(batch) - sent
+
+    batch = []
+    for user in users.iterator(chunk_size=chunk_size):
+        user_name = user.get_full_name() or user.username
+        try:
+            batch.append(
+                build_email_message(
+                    subject=subject,
+                    text_content=text_content.replace(
+                        BULK_RECIPIENT_PLACEHOLDER, user_name
+                    ),
+                    recipient_list=[user.email],
+                    html_content=html_content.replace(
+                        BULK_RECIPIENT_PLACEHOLDER, html.escape(user_name, quote=False)
+                    ),
+                    inline_css=False,
+                    attachments=attachments,
+                )
+            )
+        except Exception as e:
+            print(f"Erro ao montar email para o usuário #{user.pk}: {e}")
+            summary["failed"] += 1
+            continue
+
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+
+    if batch:
+        flush(batch)
+
+    record_email_outcome("sent", summary["sent"])
+    record_email_outcome("failed", summary["failed"])
+    return summary
@@ -0,0 +1,117 @@
+"""
+Comando Django que consome a outbox de emails.
+
+Uso:
+    python manage.py email_worker
+    python manage.py email_worker --concurrency=8 --batch-size=50
+    python manage.py email_worker --once
+
+Vários workers podem rodar ao mesmo tempo (inclusive em nós diferentes):
+a reserva dos emails usa SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from utils.email_outbox import claim_outbox_batch, deliver_outbox_entry
+from utils.email_pool import close_email_pools
+
+
+class Command(BaseCommand):
+    help = "Envia os emails pendentes da outbox com concorrência configurável"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Quantidade de threads de envio (padrão: EMAIL_WORKER_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Emails reservados por vez em cada thread (padrão: EMAIL_OUTBOX_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Segundos de espera quando a fila está vazia (padrão: 2.0)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Esvazia a fila uma vez e encerra",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"] or settings.EMAIL_WORKER_CONCURRENCY
+        batch_size = options["batch_size"] or settings.EMAIL_OUTBOX_BATCH_SIZE
+        poll_interval = options["poll_interval"]
+        once = options["once"]
+
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+
+        self.stdout.write(
+            f"📨 Worker de email iniciado (concorrência={concurrency}, lote={batch_size})"
+        )
+
+        try:
+            if concurrency == 1:
+                self._run_loop(batch_size, poll_interval, once)
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    futures = [
+                        executor.submit(self._run_loop, batch_size, poll_interval, once)
+                        for _ in range(concurrency)
+                    ]
+                    for future in futures:
+                        future.result()
+        except KeyboardInterrupt:
+            self.stop_event.set()
+        finally:
+            close_email_pools()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Worker encerrado. Enviados: {self.sent} | Falhas: {self.failed}"
+            )
+        )
+
+    def _run_loop(self, batch_size, poll_interval, once):
+        try:
+            while not self.stop_event.is_set():
+                # Em execução contínua, descarta conexões expiradas com o banco
+                if not once:
+                    close_old_connections()
+                batch = claim_outbox_batch(batch_size)
+
+                if not batch:
+                    if once:
+                        return
+                    self.stop_event.wait(poll_interval)
+                    continue
+
+                for entry in batch:
+                    ok = deliver_outbox_entry(entry)
+                    with self.lock:
+                        if ok:
+                            self.sent += 1
+                        else:
+                            self.failed += 1
+        finally:
+            # Cada thread abre sua própria conexão com o banco
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
@@ -0,0 +1,65 @@
+"""
+Comando Django que envia os digests de notificações cuja janela expirou.
+
+Uso:
+    python manage.py flush_email_digests
+    python manage.py flush_email_digests --loop --interval=60
+    python manage.py flush_email_digests --window=0   # envia todos agora
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from utils.email_digest import flush_due_digests
+from utils.email_pool import close_email_pools
+
+
+class Command(BaseCommand):
+    help = "Envia os digests de notificações que completaram EMAIL_DIGEST_WINDOW"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=None,
+            help="Janela em segundos (padrão: EMAIL_DIGEST_WINDOW)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Continua executando e verificando a cada --interval segundos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60.0,
+            help="Segundos entre verificações no modo --loop (padrão: 60)",
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        if options["loop"]:
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+        sent = failed = 0
+        try:
+            while True:
+                if options["loop"]:
+                    close_old_connections()
+                summary = flush_due_digests(options["window"])
+                sent += summary["sent"]
+                failed += summary["failed"]
+
+                if not options["loop"] or stop_event.wait(options["interval"]):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_email_pools()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Digests enviados: {sent} | Falhas: {failed}")
+        )
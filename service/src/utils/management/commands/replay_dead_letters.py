@@ -0,0 +1,78 @@
+"""
+Comando Django que reenvia emails da dead-letter.
+
+Uso:
+    python manage.py replay_dead_letters
+    python manage.py replay_dead_letters --ids 10 11 12
+    python manage.py replay_dead_letters --since 2026-01-31 --dry-run
+
+Os emails são reenviados a partir da mensagem MIME gravada, sem serem
+renderizados de novo.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from utils.email_pool import close_email_pools
+from utils.email_retry import replay_dead_letters
+from utils.models import EmailDeadLetter
+
+
+class Command(BaseCommand):
+    help = "Reenvia em lote os emails registrados na dead-letter"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ids",
+            type=int,
+            nargs="+",
+            default=None,
+            help="IDs dos registros a reenviar (padrão: todos ainda não reenviados)",
+        )
+        parser.add_argument(
+            "--since",
+            type=str,
+            default=None,
+            help="Apenas registros criados a partir desta data (AAAA-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Registros lidos por consulta (padrão: 100)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantos emails seriam reenviados",
+        )
+
+    def handle(self, *args, **options):
+        queryset = EmailDeadLetter.objects.filter(replayed_at__isnull=True)
+
+        if options["ids"]:
+            queryset = queryset.filter(pk__in=options["ids"])
+
+        if options["since"]:
+            since = parse_date(options["since"])
+            if since is None:
+                raise CommandError(f"Data inválida: {options['since']}")
+            queryset = queryset.filter(created_at__date__gte=since)
+
+        total = queryset.count()
+        if options["dry_run"]:
+            self.stdout.write(f"📬 {total} email(s) seriam reenviados")
+            return
+
+        self.stdout.write(f"📬 Reenviando {total} email(s) da dead-letter...")
+        try:
+            summary = replay_dead_letters(queryset, batch_size=options["batch_size"])
+        finally:
+            close_email_pools()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Reenviados: {summary['sent']} | Falhas: {summary['failed']}"
+                f" | Sem payload: {summary['skipped']}"
+            )
+        )
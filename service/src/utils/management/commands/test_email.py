@@ -8,10 +8,22 @@ Uso:
     python manage.py test_email seu-email@example.com --tipo=notificacao
     python manage.py test_email seu-email@example.com --tipo=pagamento
     python manage.py test_email seu-email@example.com --tipo=todos
+
+Teste de carga (servidor SMTP local, iniciado no próprio processo):
+    python manage.py test_email --load=1000 --concurrency=8
 """
 
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+# Etapas medidas por `utils.email_metrics.email_stage`, na ordem do envio
+LOAD_STAGES = ('template_load', 'format', 'inline', 'minify', 'mime_build', 'smtp_send')
 
 
 class Command(BaseCommand):
@@ -21,7 +33,9 @@ class Command(BaseCommand):
         parser.add_argument(
             'email',
             type=str,
-            help='Email de destino para teste'
+            nargs='?',
+            default=None,
+            help='Email de destino para teste (opcional com --load)'
         )
         parser.add_argument(
             '--tipo',
@@ -36,8 +50,34 @@ class Command(BaseCommand):
             default=None,
             help='Username do usuário para usar no teste (padrão: admin ou primeiro usuário)'
         )
+        parser.add_argument(
+            '--load',
+            type=int,
+            default=None,
+            help='Envia N emails para um servidor SMTP local e mede o desempenho'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Threads de envio no teste de carga (padrão: 1)'
+        )
+        parser.add_argument(
+            '--sink-delay',
+            type=float,
+            default=0.0,
+            help='Segundos de espera do servidor SMTP local por mensagem (padrão: 0)'
+        )
 
     def handle(self, *args, **options):
+        if options['load']:
+            return self.handle_load(
+                options['load'],
+                options['concurrency'],
+                options['sink_delay'],
+                options['email'] or 'load-test@example.com',
+            )
+
         email_destino = options['email']
         tipo_email = options['tipo']
         username = options['username']
@@ -45,6 +85,8 @@ class Command(BaseCommand):
         User = get_user_model()
         
         # Valida email
+        if not email_destino:
+            raise CommandError('Informe o email de destino (ou use --load)')
         if '@' not in email_destino:
             raise CommandError(f'Email inválido: {email_destino}')
         
@@ -185,3 +227,117 @@ class Command(BaseCommand):
         self.stdout.write("   - Pasta de spam")
         self.stdout.write("   - Logs do console (se estiver usando console backend)")
         self.stdout.write("="*60 + "\n")
+
+    def handle_load(self, total, concurrency, sink_delay, email_destino):
+        """
+        Teste de carga: envia `total` emails por `send_email`, exatamente como
+        em produção, para um SMTP sink local e mede vazão, latência e o tempo
+        de cada etapa.
+
+        O tempo por etapa vem das métricas de `utils.email_metrics`
+        (`MemoryEmailMetricsSink`), as mesmas medidas em produção.
+        """
+        from utils.email_metrics import MESSAGES_METRIC, get_email_metrics
+        from utils.email_pool import close_email_pools
+        from utils.email_templates import render_email_html, render_email_text
+        from utils.emails import send_email
+        from utils.smtp_sink import SMTPSink
+
+        if total < 1 or concurrency < 1:
+            raise CommandError('--load e --concurrency devem ser maiores que zero')
+
+        def send_one(index):
+            started = time.perf_counter()
+            context = {
+                'user_name': f'Usuário {index}',
+                'notification': {
+                    'title': f'Teste de carga #{index}',
+                    'message': f'Mensagem de teste de carga número {index}.',
+                    'action_url': None,
+                    'action_label': 'Ver Detalhes',
+                },
+            }
+            ok = send_email(
+                subject=f'Teste de carga #{index}',
+                text_content=render_email_text('notification', **context),
+                recipient_list=[email_destino],
+                html_content=render_email_html('notification', **context),
+            )
+            return ok, time.perf_counter() - started
+
+        self.stdout.write("\n" + "=" * 60)
+        self.stdout.write(self.style.SUCCESS('🚀 TESTE DE CARGA DE EMAILS'))
+        self.stdout.write("=" * 60 + "\n")
+
+        with SMTPSink(delay=sink_delay, keep_messages=False) as sink:
+            self.stdout.write(f"📭 SMTP sink local em {sink.host}:{sink.port}")
+            self.stdout.write(f"📧 Mensagens: {total} | Concorrência: {concurrency}\n")
+
+            # Mesmo caminho de produção, mas apontando para o sink local e sem
+            # limitador de taxa (que mediria o limite do provedor, não o código)
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST=sink.host,
+                EMAIL_PORT=sink.port,
+                EMAIL_USE_TLS=False,
+                EMAIL_USE_SSL=False,
+                EMAIL_HOST_USER='',
+                EMAIL_HOST_PASSWORD='',
+                EMAIL_POOL_MAX_SIZE=max(settings.EMAIL_POOL_MAX_SIZE, concurrency),
+                EMAIL_RATE_LIMIT=0,
+                EMAIL_MAX_CONNECTIONS=0,
+                EMAIL_METRICS_SINK='utils.email_metrics.MemoryEmailMetricsSink',
+            ):
+                metrics = get_email_metrics()
+                started = time.perf_counter()
+                try:
+                    if concurrency == 1:
+                        results = [send_one(i) for i in range(total)]
+                    else:
+                        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                            results = list(executor.map(send_one, range(total)))
+                finally:
+                    close_email_pools()
+                elapsed = time.perf_counter() - started
+
+        sucesso = sum(1 for ok, _ in results if ok)
+        latencies = sorted(latency for _, latency in results)
+        outcomes = {
+            outcome: metrics.count(MESSAGES_METRIC, outcome=outcome)
+            for outcome in ('sent', 'queued', 'retry', 'failed')
+        }
+        stages = [(stage, metrics.stage_timings(stage)) for stage in LOAD_STAGES]
+        stages_total = sum(sum(timings) for _, timings in stages) or 1
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS('📊 RESULTADO'))
+        self.stdout.write("=" * 60 + "\n")
+        self.stdout.write(f"  Enviados: {sucesso} | Falhas: {total - sucesso}")
+        self.stdout.write(
+            "  Resultados: " + " | ".join(f"{k}={v}" for k, v in outcomes.items())
+        )
+        self.stdout.write(f"  Sessões SMTP: {sink.sessions} | Recebidos pelo sink: {sink.received}")
+        self.stdout.write(f"  Tempo total: {elapsed:.2f}s")
+        self.stdout.write(f"  Vazão: {total / elapsed:.1f} emails/s\n")
+
+        self.stdout.write("  Latência por email:")
+        for percentile in (50, 95, 99):
+            value = _percentile(latencies, percentile)
+            self.stdout.write(f"    p{percentile}: {value * 1000:.1f} ms")
+
+        self.stdout.write("\n  Tempo por etapa (média por email):")
+        for stage, timings in stages:
+            if not timings:
+                continue
+            stage_total = sum(timings)
+            self.stdout.write(
+                f"    {stage:<13} {stage_total / total * 1000:8.2f} ms "
+                f"({stage_total / stages_total:.0%})"
+            )
+        self.stdout.write("=" * 60 + "\n")
+
+
+def _percentile(sorted_values, percentile):
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
@@ -0,0 +1,153 @@
+"""
+Sinks de métricas (durações e contadores) compartilhados pelos módulos.
+
+Cada módulo tem a sua configuração e os seus nomes de métrica, para que um
+destino possa ser ligado sem ligar os outros: os emails usam
+EMAIL_METRICS_SINK (`utils.email_metrics`) e a autenticação usa
+AUTH_METRICS_SINK (`authentication.blacklist`). A configuração é o caminho
+de uma classe com `timing` e `increment`; vazia, as métricas são descartadas.
+
+`LoggingMetricsSink` grava cada métrica como log estruturado no logger
+"utils.metrics"; para outros destinos (StatsD, Prometheus), implemente
+`timing` e `increment` em uma subclasse de `MetricsSink`.
+
+Example:
+    >>> metrics = get_metrics("AUTH_METRICS_SINK")
+    >>> if metrics.enabled:
+    ...     metrics.increment("auth.login", tags={"result": "ok"})
+"""
+
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+
+class MetricsSink:
+    """
+    Sink padrão: descarta as métricas.
+
+    Subclasses devem definir `enabled = True` e implementar `timing` e
+    `increment`.
+    """
+
+    enabled = False
+
+    def timing(self, name: str, seconds: float, tags: dict = None):
+        """Registra uma duração (histograma), em segundos."""
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        """Incrementa um contador."""
+
+
+class LoggingMetricsSink(MetricsSink):
+    """
+    Grava cada métrica como log estruturado (logger "utils.metrics").
+
+    A mensagem segue o formato chave=valor e os mesmos dados ficam nos
+    atributos `metric`, `metric_type`, `value` e `tags` do LogRecord, para
+    formatters JSON.
+    """
+
+    enabled = True
+    logger = logging.getLogger("utils.metrics")
+
+    def timing(self, name: str, seconds: float, tags: dict = None):
+        self._log(name, "timing", round(seconds, 6), tags)
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        self._log(name, "counter", value, tags)
+
+    def _log(self, name, metric_type, value, tags):
+        tags = tags or {}
+        fields = " ".join(f"{key}={tag}" for key, tag in tags.items())
+        self.logger.info(
+            "metric=%s type=%s value=%s %s",
+            name,
+            metric_type,
+            value,
+            fields,
+            extra={
+                "metric": name,
+                "metric_type": metric_type,
+                "value": value,
+                "tags": tags,
+            },
+        )
+
+
+class MemoryMetricsSink(MetricsSink):
+    """
+    Guarda as métricas em memória, no processo (diagnóstico e testes).
+
+    Atributos:
+        - timings (dict): Durações por (métrica, tags ordenadas).
+        - counters (dict): Totais por (métrica, tags ordenadas).
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timing(self, name: str, seconds: float, tags: dict = None):
+        with self._lock:
+            self.timings[(name, _tag_key(tags))].append(seconds)
+
+    def increment(self, name: str, value: int = 1, tags: dict = None):
+        with self._lock:
+            self.counters[(name, _tag_key(tags))] += value
+
+    def count(self, name: str, **tags) -> int:
+        """Retorna o total de um contador para as tags informadas."""
+        return self.counters.get((name, _tag_key(tags)), 0)
+
+
+def _tag_key(tags: dict) -> tuple:
+    return tuple(sorted((tags or {}).items()))
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_metrics(setting: str) -> MetricsSink:
+    """
+    Retorna o sink de métricas do processo configurado em `setting`.
+
+    Args:
+        setting (str): Nome da configuração com o caminho da classe (ex.: "AUTH_METRICS_SINK")
+
+    Returns:
+        MetricsSink: Instância da classe configurada, ou o sink que descarta
+        as métricas se a configuração estiver vazia ou inválida
+    """
+    sink = _sinks.get(setting)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(setting)
+            if sink is None:
+                sink = _sinks[setting] = _create_sink(getattr(settings, setting, ""))
+    return sink
+
+
+def _create_sink(path: str) -> MetricsSink:
+    if not path:
+        return MetricsSink()
+    try:
+        return import_string(path)()
+    except Exception as e:
+        print(f"Erro ao carregar sink de métricas '{path}': {e}")
+        return MetricsSink()
+
+
+def _reset_sink(setting, **kwargs):
+    _sinks.pop(setting, None)
+
+
+setting_changed.connect(_reset_sink)
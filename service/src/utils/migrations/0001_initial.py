@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=998, verbose_name="Assunto")),
+                ("text_content", models.TextField(verbose_name="Texto")),
+                (
+                    "html_content",
+                    models.TextField(blank=True, null=True, verbose_name="HTML"),
+                ),
+                (
+                    "from_email",
+                    models.CharField(max_length=254, verbose_name="Remetente"),
+                ),
+                (
+                    "recipient_list",
+                    models.JSONField(default=list, verbose_name="Destinatários"),
+                ),
+                (
+                    "bcc",
+                    models.JSONField(
+                        blank=True, default=list, verbose_name="Cópia oculta"
+                    ),
+                ),
+                (
+                    "reply_to",
+                    models.JSONField(blank=True, default=list, verbose_name="Reply-To"),
+                ),
+                (
+                    "headers",
+                    models.JSONField(blank=True, default=dict, verbose_name="Headers"),
+                ),
+                (
+                    "inline_css",
+                    models.BooleanField(default=True, verbose_name="CSS inline"),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[
+                            (1, "Pendente"),
+                            (2, "Enviando"),
+                            (3, "Enviado"),
+                            (4, "Falhou"),
+                        ],
+                        default=1,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Tentativas"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, default="", verbose_name="Último erro"
+                    ),
+                ),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Reservado em"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Enviado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email Outbox",
+                "verbose_name_plural": "Email Outbox",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "id"], name="utils_email_status_655223_idx"
+                    )
+                ],
+            },
+        ),
+    ]
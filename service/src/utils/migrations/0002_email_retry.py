@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utils", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailoutbox",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Próxima tentativa"
+            ),
+        ),
+        migrations.CreateModel(
+            name="EmailDeadLetter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=998, verbose_name="Assunto")),
+                (
+                    "from_email",
+                    models.CharField(max_length=254, verbose_name="Remetente"),
+                ),
+                (
+                    "recipients",
+                    models.JSONField(default=list, verbose_name="Destinatários"),
+                ),
+                (
+                    "payload",
+                    models.BinaryField(
+                        blank=True, null=True, verbose_name="Mensagem MIME"
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Erro"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Tentativas"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "replayed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Reenviado em"
+                    ),
+                ),
+                (
+                    "outbox",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="dead_letters",
+                        to="utils.emailoutbox",
+                        verbose_name="Outbox",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email Dead Letter",
+                "verbose_name_plural": "Email Dead Letters",
+                "indexes": [
+                    models.Index(
+                        fields=["replayed_at", "id"],
+                        name="utils_email_replaye_2a6064_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utils", "0002_email_retry"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailDigestEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255, verbose_name="Título")),
+                ("message", models.TextField(verbose_name="Mensagem")),
+                (
+                    "action_url",
+                    models.URLField(
+                        blank=True,
+                        max_length=2048,
+                        null=True,
+                        verbose_name="URL da ação",
+                    ),
+                ),
+                (
+                    "action_label",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Label da ação"
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(
+                        choices=[(1, "Baixa"), (2, "Normal"), (3, "Alta")],
+                        default=2,
+                        verbose_name="Prioridade",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="email_digest_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuário",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Email Digest",
+                "verbose_name_plural": "Email Digest",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "id"], name="utils_email_user_id_3147fa_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="utils_email_created_e73854_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class EmailDeadLetter(models.Model):
+    """Emails que falharam definitivamente, guardados já renderizados.
+
+    O payload é a mensagem MIME completa, exatamente como seria enviada, para
+    que o reenvio (`python manage.py replay_dead_letters`) não precise montar
+    o email de novo.
+
+    Atributos:
+        - subject (str): Assunto do email.
+        - from_email (str): Remetente do envelope SMTP.
+        - recipients (list): Destinatários do envelope SMTP (inclui bcc).
+        - payload (bytes): Mensagem MIME renderizada (vazio se a falha foi na renderização).
+        - error (str): Erro que levou o email para a dead-letter (ou do último reenvio).
+        - attempts (int): Tentativas de envio feitas antes da dead-letter.
+        - outbox (EmailOutbox): Registro da outbox de origem, se houver.
+        - created_at (datetime): Data de criação.
+        - replayed_at (datetime): Quando o email foi reenviado com sucesso.
+    """
+
+    subject = models.CharField("Assunto", max_length=998)
+    from_email = models.CharField("Remetente", max_length=254)
+    recipients = models.JSONField("Destinatários", default=list)
+    payload = models.BinaryField("Mensagem MIME", blank=True, null=True)
+    error = models.TextField("Erro", blank=True, default="")
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    outbox = models.ForeignKey(
+        "utils.EmailOutbox",
+        verbose_name="Outbox",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="dead_letters",
+    )
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+    replayed_at = models.DateTimeField("Reenviado em", blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} ({', '.join(self.recipients)})"
+
+    class Meta:
+        verbose_name = "Email Dead Letter"
+        verbose_name_plural = "Email Dead Letters"
+        indexes = [models.Index(fields=["replayed_at", "id"])]
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import models
+
+from utils.constants import EmailDigestPriority
+
+
+class EmailDigestEntry(models.Model):
+    """Notificação aguardando envio no digest do usuário.
+
+    As notificações de um usuário são acumuladas e enviadas juntas em um único
+    email (`utils.email_digest.flush_user_digest`).
+
+    Atributos:
+        - user (Profile): Destinatário.
+        - title (str): Título da notificação.
+        - message (str): Mensagem da notificação.
+        - action_url (str): URL para ação relacionada.
+        - action_label (str): Label do botão de ação.
+        - priority (int): Prioridade baseada em
+        [constants.EmailDigestPriority](../../utils/constants.md#service.src.utils.constants.EmailDigestPriority).
+        - created_at (datetime): Data de criação.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="Usuário",
+        on_delete=models.CASCADE,
+        related_name="email_digest_entries",
+    )
+    title = models.CharField("Título", max_length=255)
+    message = models.TextField("Mensagem")
+    action_url = models.URLField("URL da ação", max_length=2048, blank=True, null=True)
+    action_label = models.CharField("Label da ação", max_length=100, blank=True)
+    priority = models.IntegerField(
+        "Prioridade",
+        choices=EmailDigestPriority.EMAIL_DIGEST_PRIORITY_CHOICES,
+        default=EmailDigestPriority.NORMAL,
+    )
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} ({self.user_id})"
+
+    class Meta:
+        verbose_name = "Email Digest"
+        verbose_name_plural = "Email Digest"
+        indexes = [
+            models.Index(fields=["user", "id"]),
+            models.Index(fields=["created_at"]),
+        ]
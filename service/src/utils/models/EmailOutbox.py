@@ -0,0 +1,63 @@
+from django.db import models
+
+from utils.constants import EmailStatus
+
+
+class EmailOutbox(models.Model):
+    """Fila persistente de emails a serem enviados pelo worker.
+
+    Cada registro guarda todos os dados necessários para montar a mensagem
+    com `utils.emails.build_email_message`. Os headers são gravados já com os
+    valores padrão (Message-ID, X-Entity-Ref-ID) para que reenvios mantenham a
+    mesma identidade.
+
+    Atributos:
+        - subject (str): Assunto do email.
+        - text_content (str): Conteúdo em texto plano.
+        - html_content (str): Conteúdo HTML (sem CSS inline aplicado).
+        - from_email (str): Remetente.
+        - recipient_list (list): Destinatários.
+        - bcc (list): Destinatários em cópia oculta.
+        - reply_to (list): Endereços de Reply-To.
+        - headers (dict): Headers do email.
+        - inline_css (bool): Se o worker deve aplicar CSS inline.
+        - status (int): Estado baseado em
+        [constants.EmailStatus](../../utils/constants.md#service.src.utils.constants.EmailStatus).
+        - attempts (int): Quantidade de tentativas de envio.
+        - last_error (str): Última mensagem de erro.
+        - locked_at (datetime): Quando o registro foi reservado por um worker.
+        - next_attempt_at (datetime): A partir de quando o email pode ser
+        (re)enviado; usado no backoff entre tentativas.
+        - created_at (datetime): Data de criação.
+        - sent_at (datetime): Data de envio.
+    """
+
+    subject = models.CharField("Assunto", max_length=998)
+    text_content = models.TextField("Texto")
+    html_content = models.TextField("HTML", blank=True, null=True)
+    from_email = models.CharField("Remetente", max_length=254)
+    recipient_list = models.JSONField("Destinatários", default=list)
+    bcc = models.JSONField("Cópia oculta", default=list, blank=True)
+    reply_to = models.JSONField("Reply-To", default=list, blank=True)
+    headers = models.JSONField("Headers", default=dict, blank=True)
+    inline_css = models.BooleanField("CSS inline", default=True)
+
+    status = models.IntegerField(
+        "Status",
+        choices=EmailStatus.EMAIL_STATUS_CHOICES,
+        default=EmailStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    last_error = models.TextField("Último erro", blank=True, default="")
+    locked_at = models.DateTimeField("Reservado em", blank=True, null=True)
+    next_attempt_at = models.DateTimeField("Próxima tentativa", blank=True, null=True)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+    sent_at = models.DateTimeField("Enviado em", blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} ({', '.join(self.recipient_list)})"
+
+    class Meta:
+        verbose_name = "Email Outbox"
+        verbose_name_plural = "Email Outbox"
+        indexes = [models.Index(fields=["status", "id"])]
@@ -0,0 +1,3 @@
+from utils.models.EmailDeadLetter import EmailDeadLetter  # noqa: F401
+from utils.models.EmailDigestEntry import EmailDigestEntry  # noqa: F401
+from utils.models.EmailOutbox import EmailOutbox  # noqa: F401
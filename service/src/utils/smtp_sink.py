@@ -0,0 +1,186 @@
+"""
+Servidor SMTP local que aceita e descarta (ou guarda) mensagens.
+
+Útil para testes e medições de desempenho do envio de emails sem depender
+de um provedor real. Roda um loop asyncio em uma thread própria, então pode
+ser usado tanto em código síncrono quanto assíncrono.
+
+Uso em código:
+    >>> with SMTPSink() as sink:
+    ...     # EMAIL_HOST="127.0.0.1", EMAIL_PORT=sink.port
+    ...     send_email(...)
+    >>> sink.sessions, len(sink.messages)
+    (1, 1)
+
+Uso pela linha de comando (servidor de debug):
+    python -m utils.smtp_sink --port 1025
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+
+class SMTPSink:
+    """
+    Servidor SMTP mínimo (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT).
+
+    Args:
+        host (str, optional): Endereço de escuta. Default: 127.0.0.1
+        port (int, optional): Porta de escuta. Se 0, escolhe uma porta livre
+        delay (float, optional): Segundos de espera antes de aceitar cada mensagem,
+            para simular um servidor lento
+        keep_messages (bool, optional): Se True, guarda as mensagens recebidas em `messages`
+
+    Atributos:
+        - messages (list): Tuplas (mail_from, rcpt_tos, data) recebidas.
+        - sessions (int): Quantidade de conexões SMTP aceitas.
+        - received (int): Quantidade de mensagens aceitas.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+        keep_messages: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.keep_messages = keep_messages
+
+        self.messages = []
+        self.sessions = 0
+        self.received = 0
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Inicia o servidor em uma thread e aguarda até estar aceitando conexões."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        """Encerra o servidor e a thread."""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        self.sessions += 1
+        mail_from, rcpt_tos = None, []
+
+        async def reply(line):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        try:
+            await reply("220 localhost ArmoredDjango SMTP sink")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", "replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+
+                if verb == "EHLO":
+                    await reply("250-localhost\r\n250-8BITMIME\r\n250 SMTPUTF8")
+                elif verb == "HELO":
+                    await reply("250 localhost")
+                elif verb == "MAIL":
+                    mail_from, rcpt_tos = command[10:].strip(), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    rcpt_tos.append(command[8:].strip())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await self._read_data(reader)
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    self.received += 1
+                    if self.keep_messages:
+                        self.messages.append((mail_from, rcpt_tos, data))
+                    await reply("250 OK: queued")
+                elif verb in ("RSET", "NOOP"):
+                    if verb == "RSET":
+                        mail_from, rcpt_tos = None, []
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cliente desconectou ou o servidor está sendo encerrado
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_data(reader) -> bytes:
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b".\r\n", b".\n", b""):
+                return b"".join(lines)
+            # Remove o "dot-stuffing" (RFC 5321, seção 4.5.2)
+            if line.startswith(b".."):
+                line = line[1:]
+            lines.append(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor SMTP local de debug")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.delay, keep_messages=False).start()
+    print(f"📭 SMTP sink escutando em {args.host}:{sink.port} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   sessões={sink.sessions} mensagens={sink.received}")
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Testes para o envio assíncrono de emails (cliente SMTP asyncio e pool).
+"""
+
+import asyncio
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+
+from utils.async_smtp import (
+    AsyncSMTPConnection,
+    AsyncSMTPConnectionPool,
+    aclose_email_pools,
+    async_send_email_messages,
+    envelope_address,
+    get_async_email_pool,
+)
+from utils.emails import asend_email, asend_notification_email, asend_welcome_email
+from utils.smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def sink(settings):
+    with SMTPSink() as sink:
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST = sink.host
+        settings.EMAIL_PORT = sink.port
+        settings.EMAIL_USE_TLS = False
+        settings.EMAIL_USE_SSL = False
+        settings.EMAIL_HOST_USER = ""
+        settings.EMAIL_HOST_PASSWORD = ""
+        settings.EMAIL_POOL_ENABLED = True
+        settings.EMAIL_POOL_MAX_SIZE = 2
+        settings.EMAIL_ASYNC_ENABLED = False
+        yield sink
+
+
+def _run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await aclose_email_pools()
+
+    return asyncio.run(main())
+
+
+def _message(i=0, body="Corpo"):
+    return EmailMessage(f"Teste {i}", body, "noreply@example.com", ["a@example.com"])
+
+
+class _User:
+    username = "ana"
+    email = "ana@example.com"
+
+    def get_full_name(self):
+        return "Ana Souza"
+
+
+class TestAsyncSMTPConnection:
+    """Testes para a sessão SMTP assíncrona."""
+
+    def test_sendmail(self, sink):
+        """Testa o envio de uma mensagem com dot-stuffing e CRLF."""
+
+        async def send():
+            conn = await AsyncSMTPConnection(sink.host, sink.port, timeout=5).connect()
+            await conn.sendmail(
+                "a@example.com", ["b@example.com"], b"Subject: x\n\n.ponto\n"
+            )
+            await conn.quit()
+
+        asyncio.run(send())
+
+        assert sink.messages == [
+            ("<a@example.com>", ["<b@example.com>"], b"Subject: x\r\n\r\n.ponto\r\n")
+        ]
+
+    def test_connection_refused_is_os_error(self):
+        """Testa que a falha de conexão é um OSError (falha transitória)."""
+        with SMTPSink() as closed:
+            port = closed.port
+
+        with pytest.raises(OSError):
+            asyncio.run(AsyncSMTPConnection("127.0.0.1", port, timeout=1).connect())
+
+    def test_closed_connection_raises_disconnected(self, sink):
+        """Testa que comandos em uma conexão fechada geram SMTPServerDisconnected."""
+
+        async def send():
+            conn = await AsyncSMTPConnection(sink.host, sink.port, timeout=5).connect()
+            await conn.close()
+            await conn.noop()
+
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            asyncio.run(send())
+
+    def test_envelope_address(self):
+        """Testa a extração do endereço do envelope (com domínio IDN)."""
+        assert envelope_address("Ana <ana@example.com>") == "ana@example.com"
+        assert envelope_address("ana@münchen.de") == "ana@xn--mnchen-3ya.de"
+
+
+class TestAsyncSMTPConnectionPool:
+    """Testes para o pool de conexões assíncronas."""
+
+    def test_reuses_connections(self, sink):
+        """Testa que envios seguidos usam a mesma sessão SMTP."""
+
+        async def send():
+            for i in range(3):
+                await async_send_email_messages([_message(i)])
+            return get_async_email_pool()
+
+        pool = _run(send())
+
+        assert sink.received == 3
+        assert sink.sessions == 1
+        assert pool.reused == 2
+
+    def test_concurrent_sends_respect_max_size(self, sink):
+        """Testa que envios concorrentes não passam de EMAIL_POOL_MAX_SIZE conexões."""
+
+        async def send():
+            return await asyncio.gather(
+                *[async_send_email_messages([_message(i)]) for i in range(10)]
+            )
+
+        assert _run(send()) == [1] * 10
+        assert sink.received == 10
+        assert sink.sessions <= 2
+
+    def test_reconnects_after_dead_connection(self, sink):
+        """Testa que uma conexão ociosa que caiu é descartada e reaberta."""
+
+        async def send():
+            pool = AsyncSMTPConnectionPool(host=sink.host, port=sink.port, timeout=5)
+            await pool.send_messages([_message(0)])
+            conn, _ = pool._idle[0]
+            await conn.close()
+            await pool.send_messages([_message(1)])
+            await pool.close_all()
+            return pool
+
+        pool = asyncio.run(send())
+
+        assert sink.received == 2
+        assert pool.created == 2
+        assert pool.discarded >= 1
+
+
+class TestAsendEmail:
+    """Testes para asend_email e os helpers assíncronos."""
+
+    def test_asend_email(self, sink):
+        """Testa o envio completo (HTML com CSS inline) pelo cliente assíncrono."""
+        sent = _run(
+            asend_email(
+                subject="Assunto",
+                text_content="Texto",
+                recipient_list=["Ana <ana@example.com>"],
+                html_content="<p>Olá</p>",
+            )
+        )
+
+        assert sent
+        _, recipients, data = sink.messages[0]
+        assert recipients == ["<ana@example.com>"]
+        assert b"Subject: Assunto" in data
+        assert b"text/html" in data
+
+    def test_asend_helpers(self, sink):
+        """Testa os helpers de boas-vindas e notificação."""
+
+        async def send():
+            return [
+                await asend_welcome_email(_User()),
+                await asend_notification_email(
+                    _User(), "Nova mensagem", "Você recebeu uma mensagem.", digest=False
+                ),
+            ]
+
+        assert _run(send()) == [True, True]
+        assert sink.received == 2
+
+    def test_unreachable_server_goes_to_retry(self, settings, sink, monkeypatch):
+        """Testa que a falha de conexão segue para a nova tentativa (outbox)."""
+        settings.EMAIL_PORT = 1
+        settings.EMAIL_TIMEOUT = 1
+        errors = []
+
+        def retry_failed_email(msg, error):
+            errors.append(error)
+            return True
+
+        monkeypatch.setattr("utils.email_outbox.retry_failed_email", retry_failed_email)
+
+        assert _run(asend_email("Assunto", "Texto", ["a@example.com"]))
+        assert isinstance(errors[0], OSError)
+
+    def test_other_backends_use_sync_send(self, settings):
+        """Testa que backends sem versão assíncrona usam o envio síncrono."""
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        settings.EMAIL_ASYNC_ENABLED = False
+        mail.outbox = []
+
+        assert _run(asend_email("Assunto", "Texto", ["a@example.com"]))
+        assert len(mail.outbox) == 1
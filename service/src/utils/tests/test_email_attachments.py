@@ -0,0 +1,201 @@
+"""
+Testes para anexos de email codificados em blocos.
+"""
+
+import base64
+import email
+import io
+import pickle
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+
+from utils.email_attachments import (
+    EmailAttachment,
+    as_email_attachment,
+    encode_file_base64,
+    encode_stream_base64,
+)
+from utils.email_pipeline import send_campaign
+from utils.emails import send_bulk_notification, send_email
+
+CONTENT = bytes(range(256)) * 500
+
+
+def _attachments(message):
+    parsed = email.message_from_bytes(message.message().as_bytes())
+    return [part for part in parsed.walk() if part.get_filename()]
+
+
+class TestEncoding:
+    """Testes para a codificação base64 em blocos."""
+
+    def test_file_encoding_matches_base64(self, tmp_path):
+        """Testa que o mmap em blocos gera o mesmo base64 da codificação direta."""
+        path = tmp_path / "dados.bin"
+        path.write_bytes(CONTENT)
+
+        payload, size = encode_file_base64(path, chunk_size=57 * 10)
+
+        assert payload == base64.encodebytes(CONTENT).decode("ascii")
+        assert size == len(CONTENT)
+
+    def test_empty_file(self, tmp_path):
+        """Testa que arquivos vazios (que o mmap não aceita) são suportados."""
+        path = tmp_path / "vazio.txt"
+        path.write_bytes(b"")
+
+        assert encode_file_base64(path) == ("", 0)
+
+    def test_stream_with_short_reads(self):
+        """Testa que leituras menores que o bloco não quebram as linhas do base64."""
+
+        class ShortReads(io.BytesIO):
+            def read(self, size=-1):
+                return super().read(min(size, 100))
+
+        payload, size = encode_stream_base64(ShortReads(CONTENT), chunk_size=57 * 10)
+
+        assert payload == base64.encodebytes(CONTENT).decode("ascii")
+        assert size == len(CONTENT)
+
+
+class TestEmailAttachment:
+    """Testes para EmailAttachment."""
+
+    def test_guesses_filename_and_mimetype(self, tmp_path):
+        """Testa que nome e tipo MIME são deduzidos do caminho."""
+        path = tmp_path / "relatorio.pdf"
+        path.write_bytes(b"%PDF-1.4")
+
+        attachment = EmailAttachment(str(path))
+
+        assert attachment.filename == "relatorio.pdf"
+        assert attachment.mimetype == "application/pdf"
+
+    def test_part_is_encoded_once(self):
+        """Testa que o file-like é lido uma única vez e a parte é reaproveitada."""
+        source = io.BytesIO(CONTENT)
+        attachment = EmailAttachment(source, "dados.bin")
+
+        assert attachment.mime_part() is attachment.mime_part()
+        assert source.read() == b""
+        assert attachment.size == len(CONTENT)
+
+    def test_non_ascii_filename(self):
+        """Testa que nomes com acentos são codificados (RFC 2231)."""
+        attachment = EmailAttachment(io.BytesIO(b"x"), "relatório.txt")
+
+        assert attachment.mime_part().get_filename() == "relatório.txt"
+
+    def test_pickle_keeps_encoded_part(self):
+        """Testa que o anexo codificado pode ser enviado para outro processo."""
+        attachment = EmailAttachment(io.BytesIO(CONTENT), "dados.bin")
+        attachment.mime_part()
+
+        restored = pickle.loads(pickle.dumps(attachment))
+
+        assert restored.source is None
+        assert restored.mime_part().get_payload(decode=True) == CONTENT
+
+    def test_django_tuple(self):
+        """Testa o formato (filename, content, mimetype) do Django."""
+        attachment = as_email_attachment(("nota.txt", "Olá", "text/plain"))
+
+        assert attachment.filename == "nota.txt"
+        assert attachment.mime_part().get_payload(decode=True) == "Olá".encode()
+
+
+@pytest.mark.django_db
+class TestSendWithAttachments:
+    """Testes para o envio de emails com anexos."""
+
+    @pytest.fixture(autouse=True)
+    def _locmem_backend(self, settings):
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        mail.outbox = []
+
+    def test_send_email_with_attachment(self, tmp_path):
+        """Testa que o anexo chega intacto na mensagem enviada."""
+        path = tmp_path / "relatorio.pdf"
+        path.write_bytes(CONTENT)
+
+        assert send_email(
+            subject="Relatório",
+            text_content="Segue o relatório.",
+            recipient_list=["financeiro@example.com"],
+            html_content="<p>Segue o relatório.</p>",
+            attachments=[path],
+        )
+
+        [part] = _attachments(mail.outbox[0])
+        assert part.get_filename() == "relatorio.pdf"
+        assert part.get_content_type() == "application/pdf"
+        assert part.get_payload(decode=True) == CONTENT
+
+    def test_attachments_skip_outbox(self):
+        """Testa que emails com anexos são enviados na hora, mesmo no modo assíncrono."""
+        assert send_email(
+            subject="Relatório",
+            text_content="Segue o relatório.",
+            recipient_list=["financeiro@example.com"],
+            async_send=True,
+            attachments=[("dados.csv", "a,b\n1,2\n", "text/csv")],
+        )
+
+        assert len(mail.outbox) == 1
+
+    def test_bulk_send_shares_encoded_part(self):
+        """Testa que o envio em massa lê e codifica o anexo uma única vez."""
+        User = get_user_model()
+        for i in range(3):
+            User.objects.create_user(
+                username=f"anexo{i}",
+                first_name="Nome",
+                last_name="Teste",
+                email=f"anexo{i}@example.com",
+                password="TestPass123!",
+            )
+        reads = []
+
+        class CountingReads(io.BytesIO):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        summary = send_bulk_notification(
+            User.objects.all(),
+            "Relatório mensal",
+            "Segue o relatório.",
+            attachments=[EmailAttachment(CountingReads(CONTENT), "relatorio.bin")],
+        )
+
+        assert summary["sent"] == 3
+        # Um único bloco com o conteúdo e a leitura vazia do fim do arquivo
+        assert len(reads) == 2
+        assert all(
+            _attachments(message)[0].get_payload(decode=True) == CONTENT
+            for message in mail.outbox
+        )
+
+    def test_campaign_attachments(self, tmp_path):
+        """Testa que os anexos comuns da campanha chegam a todos os emails."""
+        path = tmp_path / "regulamento.pdf"
+        path.write_bytes(CONTENT)
+        jobs = (
+            {
+                "subject": f"Campanha {i}",
+                "text_content": "Regulamento em anexo.",
+                "recipient_list": [f"user{i}@example.com"],
+            }
+            for i in range(3)
+        )
+
+        summary = send_campaign(jobs, workers=2, attachments=[path])
+
+        assert summary["sent"] == 3
+        for message in mail.outbox:
+            parsed = email.message_from_bytes(message.raw)
+            [part] = [p for p in parsed.walk() if p.get_filename()]
+            assert part.get_payload(decode=True) == CONTENT
@@ -0,0 +1,223 @@
+"""
+Testes para o backend de email com failover entre servidores SMTP.
+"""
+
+import smtplib
+import time
+from collections import Counter
+
+import pytest
+from django.core.mail import EmailMessage
+
+from utils.email_backends import (
+    BackendHealth,
+    FailoverEmailBackend,
+    email_backend_health,
+    get_backend_health,
+    reset_email_backend_health,
+)
+from utils.email_pool import close_email_pools
+from utils.emails import send_email
+from utils.smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def sinks():
+    """Dois servidores SMTP locais: o primeiro lento, o segundo rápido."""
+    with SMTPSink(delay=1.0) as slow, SMTPSink() as fast:
+        yield slow, fast
+
+
+@pytest.fixture(autouse=True)
+def _failover_settings(settings):
+    settings.EMAIL_FAILOVER_FAILURE_THRESHOLD = 2
+    settings.EMAIL_FAILOVER_COOLDOWN = 60
+    reset_email_backend_health()
+    yield
+    close_email_pools()
+    reset_email_backend_health()
+
+
+def _config(sink, name, timeout=0.2):
+    return {
+        "name": name,
+        "host": sink.host,
+        "port": sink.port,
+        "use_tls": False,
+        "use_ssl": False,
+        "username": "",
+        "password": "",
+        "timeout": timeout,
+    }
+
+
+def _message(i=0):
+    return EmailMessage(f"Teste {i}", "Corpo", "noreply@example.com", ["a@example.com"])
+
+
+class TestBackendHealth:
+    """Testes para o circuit breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Testa que o circuito abre após o limite de falhas seguidas."""
+        health = BackendHealth("a", failure_threshold=2, cooldown=60)
+
+        health.record_failure(0.1)
+        assert health.state == "closed"
+        health.record_failure(0.1)
+
+        assert health.state == "open"
+        assert not health.try_acquire()
+
+    def test_half_open_allows_single_probe(self):
+        """Testa que, após o cooldown, só uma mensagem de teste é liberada."""
+        health = BackendHealth("a", failure_threshold=1, cooldown=0.01)
+        health.record_failure(0.1)
+        time.sleep(0.02)
+
+        assert health.state == "half_open"
+        assert health.try_acquire()
+        assert not health.try_acquire()
+
+        health.record_success(0.05)
+        assert health.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        """Testa que uma mensagem de teste com falha abre o circuito de novo."""
+        health = BackendHealth("a", failure_threshold=1, cooldown=0.01)
+        health.record_failure(0.1)
+        time.sleep(0.02)
+        health.try_acquire()
+
+        health.record_failure(0.1)
+
+        assert health.state == "open"
+
+    def test_ewma_latency(self):
+        """Testa a média móvel exponencial da latência."""
+        health = BackendHealth("a", alpha=0.5)
+        health.record_success(1.0)
+        health.record_success(0.0)
+
+        assert health.latency == 0.5
+        assert health.error_rate == 0.0
+
+
+class TestFailoverEmailBackend:
+    """Testes com dois servidores SMTP locais, um deles lento."""
+
+    def test_fails_over_to_healthy_backend(self, sinks):
+        """Testa que o timeout do servidor lento leva ao próximo backend."""
+        slow, fast = sinks
+        backend = FailoverEmailBackend(
+            [_config(slow, "lento"), _config(fast, "rapido")]
+        )
+
+        assert backend.send_messages([_message()]) == 1
+        backend.close()
+
+        assert fast.received == 1
+        health = {item["name"]: item for item in email_backend_health()}
+        assert health["lento"]["consecutive_failures"] == 1
+
+    def test_circuit_breaker_skips_slow_backend(self, sinks):
+        """Testa que, com o circuito aberto, o servidor lento não é mais tentado."""
+        slow, fast = sinks
+        backend = FailoverEmailBackend(
+            [_config(slow, "lento"), _config(fast, "rapido")]
+        )
+        backend.send_messages([_message(0), _message(1)])
+        slow_sessions = slow.sessions
+
+        started = time.monotonic()
+        assert backend.send_messages([_message(i) for i in range(2, 7)]) == 5
+        elapsed = time.monotonic() - started
+        backend.close()
+
+        assert fast.received == 7
+        assert slow.sessions == slow_sessions
+        assert elapsed < 0.5
+
+    def test_latency_strategy_prefers_faster_backend(self, sinks):
+        """Testa que a estratégia "latency" passa a usar o backend mais rápido."""
+        slow, fast = sinks
+        slow.delay = 0.05
+        backend = FailoverEmailBackend(
+            [_config(slow, "lento", timeout=5), _config(fast, "rapido", timeout=5)],
+            strategy="latency",
+        )
+
+        backend.send_messages([_message(i) for i in range(10)])
+        backend.close()
+
+        # Cada backend é medido uma vez; depois o rápido recebe quase tudo
+        assert slow.received >= 1
+        assert fast.received >= 7
+
+    def test_latency_strategy_spreads_load_by_inverse_latency(self):
+        """Testa que a estratégia "latency" envia tráfego a todos os backends saudáveis."""
+        backend = FailoverEmailBackend(
+            [{"name": "a"}, {"name": "b"}, {"name": "c"}], strategy="latency"
+        )
+        for name, latency in (("a", 0.01), ("b", 0.02), ("c", 0.04)):
+            get_backend_health(name).record_success(latency)
+
+        first = Counter(backend._ordered()[0][0]["name"] for _ in range(700))
+
+        # Pesos 1/latência: a=4/7, b=2/7, c=1/7
+        assert set(first) == {"a", "b", "c"}
+        assert first["a"] > first["b"] > first["c"]
+        assert 300 < first["a"] < 500
+        assert sorted(config["name"] for config, _ in backend._ordered()) == [
+            "a",
+            "b",
+            "c",
+        ]
+
+    def test_all_backends_down_raises_last_error(self, sinks):
+        """Testa que, sem nenhum backend disponível, o erro é repassado."""
+        slow, _ = sinks
+        backend = FailoverEmailBackend([_config(slow, "lento")])
+
+        with pytest.raises(OSError):
+            backend.send_messages([_message()])
+        assert (
+            FailoverEmailBackend(
+                [_config(slow, "lento")], fail_silently=True
+            ).send_messages([_message()])
+            == 0
+        )
+
+    def test_message_errors_do_not_fail_over(self, sinks):
+        """Testa que erros da mensagem (SMTP 5xx) não trocam de backend."""
+        _, fast = sinks
+        backend = FailoverEmailBackend([_config(fast, "rapido")])
+
+        class Refused:
+            def send_messages(self, messages):
+                raise smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no")})
+
+            def close(self):
+                pass
+
+        backend._connections["rapido"] = Refused()
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            backend.send_messages([_message()])
+
+        assert email_backend_health()[0]["state"] == "closed"
+
+    @pytest.mark.django_db
+    def test_send_email_through_pool(self, sinks, settings):
+        """Testa o backend configurado em EMAIL_BACKEND, usado pelo pool."""
+        slow, fast = sinks
+        settings.EMAIL_BACKEND = "utils.email_backends.FailoverEmailBackend"
+        settings.EMAIL_FAILOVER_BACKENDS = [
+            _config(slow, "lento"),
+            _config(fast, "rapido"),
+        ]
+        settings.EMAIL_POOL_ENABLED = True
+
+        for i in range(3):
+            assert send_email(f"Teste {i}", "Corpo", ["a@example.com"])
+
+        assert fast.received == 3
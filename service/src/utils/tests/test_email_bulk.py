@@ -0,0 +1,154 @@
+"""
+Testes para o envio de notificações em massa.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+
+from utils.email_pool import close_email_pools
+from utils.emails import send_bulk_notification
+from utils.models import EmailDeadLetter
+from utils.smtp_sink import SMTPSink
+
+
+def _create_users(count, prefix="user"):
+    User = get_user_model()
+    return [
+        User.objects.create_user(
+            username=f"{prefix}{i}",
+            first_name=f"Nome{i}",
+            last_name="Teste",
+            email=f"{prefix}{i}@example.com",
+            password="TestPass123!",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestSendBulkNotification:
+    """Testes para send_bulk_notification."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    def test_personalizes_greeting_for_each_recipient(self):
+        """Testa que cada destinatário recebe a própria saudação."""
+        users = _create_users(3)
+
+        summary = send_bulk_notification(
+            get_user_model().objects.all(),
+            "Manutenção programada",
+            "O sistema ficará indisponível domingo.",
+            action_url="https://example.com/status",
+        )
+
+        assert summary["sent"] == 3
+        assert summary["failed"] == 0
+        assert summary["duration"] >= 0
+        assert len(mail.outbox) == 3
+        for user, email in zip(users, mail.outbox):
+            html_content = email.alternatives[0][0]
+            assert email.to == [user.email]
+            assert "Manutenção programada - ArmoredDjango" == email.subject
+            assert f"Olá {user.get_full_name()}" in email.body
+            assert f"<strong>{user.get_full_name()}</strong>" in html_content
+            assert "@@recipient-name@@" not in html_content
+            assert "style=" in html_content
+
+        message_ids = {email.extra_headers["Message-ID"] for email in mail.outbox}
+        assert len(message_ids) == 3
+
+    def test_accepts_ids_and_skips_users_without_email(self):
+        """Testa o envio a partir de IDs, ignorando usuários sem email."""
+        users = _create_users(2)
+        without_email = get_user_model().objects.create_user(
+            username="semEmail", email="", password="TestPass123!"
+        )
+
+        summary = send_bulk_notification(
+            [user.pk for user in users] + [without_email.pk],
+            "Aviso",
+            "Mensagem",
+        )
+
+        assert (summary["sent"], summary["failed"]) == (2, 0)
+        assert sorted(email.to[0] for email in mail.outbox) == [
+            "user0@example.com",
+            "user1@example.com",
+        ]
+
+    def test_escapes_recipient_name_in_html(self):
+        """Testa que o nome do usuário não injeta HTML no email."""
+        get_user_model().objects.create_user(
+            username="maria",
+            first_name="<b>Maria</b>",
+            last_name="& Cia",
+            email="maria@example.com",
+            password="TestPass123!",
+        )
+
+        send_bulk_notification(get_user_model().objects.all(), "Aviso", "Mensagem")
+
+        html_content = mail.outbox[0].alternatives[0][0]
+        assert "&lt;b&gt;Maria&lt;/b&gt; &amp; Cia" in html_content
+
+    @override_settings(
+        EMAIL_BACKEND="utils.tests.test_email_bulk.RejectingEmailBackend",
+        EMAIL_RETRY_INLINE_MAX_DELAY=0,
+    )
+    def test_failed_recipient_does_not_stop_batch(self):
+        """Testa que uma falha é contada e vai para a dead-letter sem interromper o lote."""
+        _create_users(3)
+        _create_users(1, prefix="rejeitado")
+
+        summary = send_bulk_notification(
+            get_user_model().objects.all(), "Aviso", "Mensagem", batch_size=2
+        )
+
+        assert (summary["sent"], summary["failed"]) == (3, 1)
+        assert len(mail.outbox) == 3
+        letter = EmailDeadLetter.objects.get()
+        assert letter.recipients == ["rejeitado0@example.com"]
+
+    def test_batches_share_one_smtp_session(self):
+        """Testa que todos os lotes usam a mesma sessão SMTP."""
+        _create_users(25)
+
+        with SMTPSink() as sink:
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST=sink.host,
+                EMAIL_PORT=sink.port,
+                EMAIL_USE_TLS=False,
+                EMAIL_USE_SSL=False,
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                EMAIL_POOL_ENABLED=True,
+            ):
+                summary = send_bulk_notification(
+                    get_user_model().objects.all(),
+                    "Aviso",
+                    "Mensagem",
+                    batch_size=10,
+                    chunk_size=7,
+                )
+                close_email_pools()
+
+        assert (summary["sent"], summary["failed"]) == (25, 0)
+        assert sink.received == 25
+        assert sink.sessions == 1
+
+
+class RejectingEmailBackend(EmailBackend):
+    """Backend de email que recusa destinatários "rejeitado*", usado nos testes."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0].startswith("rejeitado"):
+                raise ConnectionError("Destinatário recusado")
+        return super().send_messages(messages)
@@ -0,0 +1,206 @@
+"""
+Testes para o digest de notificações por usuário.
+"""
+
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+import utils.email_digest
+from utils.constants import EmailDigestPriority
+from utils.email_digest import flush_due_digests
+from utils.email_metrics import MESSAGES_METRIC, get_email_metrics
+from utils.emails import asend_notification_email, send_notification_email
+from utils.models import EmailDeadLetter, EmailDigestEntry
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        username="testuser",
+        first_name="Test",
+        last_name="User",
+        email="test@example.com",
+        password="TestPass123!",
+    )
+
+
+@pytest.mark.django_db
+class TestEmailDigest:
+    """Testes para o modo digest de send_notification_email."""
+
+    @pytest.fixture(autouse=True)
+    def digest_settings(self, settings):
+        """Ativa o digest com limites pequenos em todos os testes."""
+        settings.EMAIL_DIGEST_ENABLED = True
+        settings.EMAIL_DIGEST_WINDOW = 600
+        settings.EMAIL_DIGEST_MAX_ITEMS = 5
+        settings.EMAIL_DIGEST_FLUSH_PRIORITY = EmailDigestPriority.HIGH
+        mail.outbox = []
+        cache.clear()
+
+    def test_notifications_are_buffered(self, user):
+        """Testa que as notificações ficam acumuladas até a janela."""
+        for i in range(3):
+            assert send_notification_email(user, f"Evento {i}", "Mensagem") is True
+
+        assert len(mail.outbox) == 0
+        assert EmailDigestEntry.objects.filter(user=user).count() == 3
+        assert flush_due_digests() == {"sent": 0, "failed": 0}
+
+    def test_window_flush_sends_one_combined_email(self, user):
+        """Testa que, após a janela, as notificações saem em um único email."""
+        for i in range(3):
+            send_notification_email(
+                user, f"Evento {i}", f"Mensagem {i}", f"https://example.com/{i}"
+            )
+        EmailDigestEntry.objects.update(
+            created_at=timezone.now() - timedelta(seconds=601)
+        )
+
+        call_command("flush_email_digests")
+
+        assert len(mail.outbox) == 1
+        email = mail.outbox[0]
+        html_content = email.alternatives[0][0]
+        assert email.subject == "Você tem 3 novas notificações - ArmoredDjango"
+        assert email.to == ["test@example.com"]
+        for i in range(3):
+            assert f"Evento {i}" in email.body
+            assert f"Mensagem {i}" in html_content
+            assert f"https://example.com/{i}" in html_content
+        assert "Resumo de notificações" in html_content
+        assert EmailDigestEntry.objects.count() == 0
+
+    def test_size_threshold_flushes_early(self, user):
+        """Testa o envio antecipado ao atingir EMAIL_DIGEST_MAX_ITEMS."""
+        for i in range(5):
+            send_notification_email(user, f"Evento {i}", "Mensagem")
+
+        assert len(mail.outbox) == 1
+        assert "5 novas notificações" in mail.outbox[0].subject
+        assert EmailDigestEntry.objects.count() == 0
+
+    def test_high_priority_flushes_immediately(self, user):
+        """Testa que uma notificação de alta prioridade envia o digest na hora."""
+        send_notification_email(user, "Evento comum", "Mensagem")
+        send_notification_email(
+            user, "Alerta", "Login suspeito", priority=EmailDigestPriority.HIGH
+        )
+
+        assert len(mail.outbox) == 1
+        assert "Evento comum" in mail.outbox[0].body
+        assert "Alerta" in mail.outbox[0].body
+
+    def test_single_notification_uses_regular_layout(self, user):
+        """Testa que um digest com uma notificação é um email de notificação comum."""
+        send_notification_email(user, "Evento", "Mensagem")
+
+        assert flush_due_digests(window=0) == {"sent": 1, "failed": 0}
+        assert mail.outbox[0].subject == "Evento - ArmoredDjango"
+
+    def test_digest_can_be_disabled_per_call(self, user):
+        """Testa que digest=False envia a notificação imediatamente."""
+        send_notification_email(user, "Evento", "Mensagem", digest=False)
+
+        assert len(mail.outbox) == 1
+        assert EmailDigestEntry.objects.count() == 0
+
+    def test_failed_send_goes_to_dead_letter_only(self, user, settings):
+        """Testa que, se o envio falhar, só a dead-letter fica com o digest."""
+        for i in range(2):
+            send_notification_email(user, f"Evento {i}", "Mensagem")
+        settings.EMAIL_BACKEND = "utils.tests.test_email_outbox.FailingEmailBackend"
+        settings.EMAIL_ASYNC_ENABLED = False
+        settings.EMAIL_RETRY_INLINE_MAX_DELAY = 0
+
+        assert flush_due_digests(window=0) == {"sent": 0, "failed": 1}
+        assert EmailDigestEntry.objects.count() == 0
+        letter = EmailDeadLetter.objects.get()
+        assert letter.subject == "Você tem 2 novas notificações - ArmoredDjango"
+
+        # O replay da dead-letter é o único reenvio: o próximo flush não tem o que enviar
+        assert flush_due_digests(window=0) == {"sent": 0, "failed": 0}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_flush_sends_outside_the_claim_transaction(self, user, monkeypatch):
+        """Testa que o email é enviado depois do commit que reserva as notificações."""
+        for i in range(2):
+            send_notification_email(user, f"Evento {i}", "Mensagem")
+        during_send = []
+
+        def deliver(msg):
+            during_send.append(
+                (
+                    transaction.get_connection().in_atomic_block,
+                    EmailDigestEntry.objects.count(),
+                )
+            )
+            return True
+
+        monkeypatch.setattr("utils.emails._deliver_email_message", deliver)
+
+        assert flush_due_digests(window=0) == {"sent": 1, "failed": 0}
+        assert during_send == [(False, 0)]
+
+    def test_render_error_keeps_notifications(self, user, monkeypatch):
+        """Testa que um erro ao montar o digest não apaga as notificações."""
+        for i in range(2):
+            send_notification_email(user, f"Evento {i}", "Mensagem")
+
+        def build_digest_content(user_name, entries):
+            raise ValueError("template inválido")
+
+        monkeypatch.setattr(
+            utils.email_digest, "build_digest_content", build_digest_content
+        )
+
+        assert flush_due_digests(window=0) == {"sent": 0, "failed": 1}
+        assert len(mail.outbox) == 0
+        assert EmailDigestEntry.objects.count() == 2
+
+    def test_duplicate_key_is_counted(self, user, settings):
+        """Testa que uma notificação repetida com a mesma chave é contada como duplicada."""
+        settings.EMAIL_METRICS_SINK = "utils.email_metrics.MemoryEmailMetricsSink"
+        metrics = get_email_metrics()
+
+        for _ in range(2):
+            assert send_notification_email(
+                user, "Evento", "Mensagem", idempotency_key="digest:1"
+            )
+
+        assert EmailDigestEntry.objects.count() == 1
+        assert metrics.count(MESSAGES_METRIC, outcome="duplicate") == 1
+
+    def test_failed_queue_releases_key(self, user, monkeypatch):
+        """Testa que uma falha ao acumular a notificação libera a chave."""
+        monkeypatch.setattr(
+            utils.email_digest, "queue_digest_notification", lambda *args: False
+        )
+        assert not send_notification_email(
+            user, "Evento", "Mensagem", idempotency_key="digest:1"
+        )
+
+        def queue_digest_notification(*args):
+            raise RuntimeError("banco indisponível")
+
+        monkeypatch.setattr(
+            utils.email_digest, "queue_digest_notification", queue_digest_notification
+        )
+        with pytest.raises(RuntimeError):
+            async_to_sync(asend_notification_email)(
+                user, "Evento", "Mensagem", idempotency_key="digest:1"
+            )
+
+        monkeypatch.undo()
+        assert send_notification_email(
+            user, "Evento", "Mensagem", idempotency_key="digest:1"
+        )
+        assert EmailDigestEntry.objects.count() == 1
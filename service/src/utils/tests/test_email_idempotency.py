@@ -0,0 +1,78 @@
+"""
+Testes para as chaves de idempotência de email.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import override_settings
+
+from utils.email_idempotency import email_idempotency_stats, make_idempotency_key
+from utils.emails import send_email, send_password_reset_email
+from utils.models import EmailOutbox
+
+
+class TestEmailIdempotency:
+    """Testes para a deduplicação de envios."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+        cache.clear()
+
+    def test_make_idempotency_key_uses_time_bucket(self, monkeypatch):
+        """Testa que a chave muda quando a janela de tempo muda."""
+        monkeypatch.setattr("utils.email_idempotency.time.time", lambda: 1000.0)
+        first = make_idempotency_key("welcome", 42, window=600)
+        monkeypatch.setattr("utils.email_idempotency.time.time", lambda: 1199.0)
+        assert make_idempotency_key("welcome", 42, window=600) == first
+        monkeypatch.setattr("utils.email_idempotency.time.time", lambda: 1200.0)
+        assert make_idempotency_key("welcome", 42, window=600) != first
+        assert first == "welcome:42:1"
+
+    def test_duplicate_send_is_suppressed(self):
+        """Testa que o segundo envio com a mesma chave é ignorado."""
+        for _ in range(3):
+            assert (
+                send_email("Test", "Test", ["test@example.com"], idempotency_key="k1")
+                is True
+            )
+        send_email("Test", "Test", ["test@example.com"], idempotency_key="k2")
+
+        assert len(mail.outbox) == 2
+        assert email_idempotency_stats() == {"accepted": 2, "suppressed": 2}
+
+    @override_settings(
+        EMAIL_BACKEND="utils.tests.test_email_retry.RejectingEmailBackend"
+    )
+    @pytest.mark.django_db
+    def test_failed_send_releases_key(self):
+        """Testa que uma falha libera a chave para uma nova tentativa."""
+        assert (
+            send_email("Test", "Test", ["a@example.com"], idempotency_key="k") is False
+        )
+
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"
+        ):
+            assert send_email("Test", "Test", ["a@example.com"], idempotency_key="k")
+        assert len(mail.outbox) == 1
+
+    @override_settings(EMAIL_ASYNC_ENABLED=True)
+    @pytest.mark.django_db
+    def test_helpers_deduplicate_outbox_entries(self):
+        """Testa que os helpers repassam a chave e não enfileiram duplicados."""
+        user = get_user_model().objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="TestPass123!",
+        )
+        key = make_idempotency_key("password_reset", user.pk)
+
+        for _ in range(3):
+            assert send_password_reset_email(
+                user, "https://example.com/reset/abc", idempotency_key=key
+            )
+
+        assert EmailOutbox.objects.count() == 1
@@ -0,0 +1,113 @@
+"""
+Testes para a aplicação memoizada de CSS inline.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import override_settings
+from pynliner import Pynliner
+
+from utils.email_examples import (
+    exemplo_email_exclusao_conta,
+    exemplo_notificacao_login_novo_dispositivo,
+    exemplo_notificacao_pagamento_aprovado,
+)
+from utils.email_inline import InlineCSSCache, get_inline_css_cache, inline_email_css
+from utils.emails import (
+    build_email_html,
+    send_notification_email,
+    send_password_reset_email,
+    send_welcome_email,
+)
+
+
+def _sent_html():
+    return [email.alternatives[0][0] for email in mail.outbox]
+
+
+def _send_all(user):
+    send_welcome_email(user, custom_message="Mensagem <em>especial</em> &amp; única")
+    send_password_reset_email(user, "https://example.com/reset/abc?x=1&y=2")
+    send_notification_email(
+        user, "Nova Mensagem", "Você recebeu uma mensagem.", "https://example.com/1"
+    )
+    exemplo_notificacao_pagamento_aprovado(user, valor=150.0, pedido_id=123)
+    exemplo_notificacao_login_novo_dispositivo(user, "Chrome", "Palmas, TO", "10.0.0.1")
+    exemplo_email_exclusao_conta(user)
+
+
+@pytest.mark.django_db
+class TestInlineEmailCSS:
+    """Testes para o modo por fragmentos e o cache LRU."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+        get_inline_css_cache().clear()
+
+    def test_fragments_mode_is_byte_identical(self):
+        """Testa que o modo por fragmentos gera o mesmo HTML do documento completo."""
+        User = get_user_model()
+        user = User.objects.create_user(
+            username="testuser",
+            first_name="Test",
+            last_name="User",
+            email="test@example.com",
+            password="TestPass123!",
+        )
+
+        with override_settings(EMAIL_INLINE_CSS_MODE="full"):
+            _send_all(user)
+        expected = _sent_html()
+
+        mail.outbox = []
+        with override_settings(EMAIL_INLINE_CSS_MODE="fragments"):
+            _send_all(user)
+
+        assert _sent_html() == expected
+
+    @override_settings(EMAIL_INLINE_CSS_MODE="fragments")
+    def test_fragments_mode_matches_pynliner_for_edge_cases(self):
+        """Testa entidades, estilos existentes e texto no título."""
+        html = build_email_html(
+            title="R&D <Relatório>",
+            header_content='<h1 class="brand" style="margin: 0">A &nbsp; B</h1>',
+            body_content='<p class="message">1 < 2 &amp; 3 > 2</p><br><a class="button">Ir</a>',
+            footer_content="© 2025",
+        )
+
+        assert inline_email_css(html) == Pynliner().from_string(str(html)).run()
+        # O template base foi processado uma vez e reaproveitado
+        assert html.template._inlined_skeleton is not None
+
+    @override_settings(EMAIL_INLINE_CSS_MODE="fragments")
+    def test_fragments_mode_falls_back_for_style_tags(self):
+        """Testa que conteúdo com <style> usa o documento completo."""
+        html = build_email_html(
+            title="Teste",
+            header_content="<style>.extra { color: red; }</style>",
+            body_content='<p class="extra">Body</p>',
+        )
+
+        assert inline_email_css(html) == Pynliner().from_string(str(html)).run()
+
+    def test_identical_bodies_are_inlined_once(self):
+        """Testa que HTMLs idênticos são processados pelo Pynliner uma vez só."""
+        html = "<style>p { color: red; }</style><p>Olá</p>"
+
+        first = inline_email_css(html)
+        second = inline_email_css(html)
+
+        assert first == second == Pynliner().from_string(html).run()
+        assert get_inline_css_cache().stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_lru_evicts_least_recently_used(self):
+        """Testa que o cache respeita o tamanho máximo."""
+        cache = InlineCSSCache(max_size=2)
+        for content in ("a", "b", "a", "c"):
+            cache.get_or_compute("document", content, str.upper)
+
+        assert cache.stats() == {"hits": 1, "misses": 3, "size": 2}
+        cache.get_or_compute("document", "b", str.upper)
+        assert cache.misses == 4
@@ -0,0 +1,44 @@
+"""
+Testes para o modo de teste de carga do comando test_email.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from utils.management.commands.test_email import _percentile
+
+
+class TestEmailLoadCommand:
+    """Testes para `test_email --load`."""
+
+    def test_load_mode_reports_throughput_latency_and_stages(self):
+        """Testa que o teste de carga envia tudo ao sink e mostra as métricas."""
+        out = StringIO()
+
+        call_command("test_email", "--load=12", "--concurrency=3", stdout=out)
+
+        output = out.getvalue()
+        assert "Enviados: 12 | Falhas: 0" in output
+        assert "Recebidos pelo sink: 12" in output
+        assert "emails/s" in output
+        assert "sent=12" in output
+        for label in ("p50:", "p95:", "p99:"):
+            assert label in output
+        # Etapas vindas de utils.email_metrics, pelo caminho completo de send_email
+        for stage in ("template_load", "format", "inline", "mime_build", "smtp_send"):
+            assert f"    {stage} " in output
+
+    def test_email_is_required_without_load(self):
+        """Testa que o modo normal continua exigindo o email de destino."""
+        with pytest.raises(CommandError):
+            call_command("test_email")
+
+    def test_percentile_nearest_rank(self):
+        """Testa o cálculo de percentis."""
+        values = list(range(1, 101))
+        assert _percentile(values, 50) == 50
+        assert _percentile(values, 95) == 95
+        assert _percentile(values, 99) == 99
+        assert _percentile([7], 99) == 7
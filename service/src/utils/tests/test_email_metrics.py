@@ -0,0 +1,111 @@
+"""
+Testes para as métricas das etapas de envio de email.
+"""
+
+import logging
+
+import pytest
+from django.core import mail
+
+from utils.email_metrics import (
+    MESSAGES_METRIC,
+    EmailMetricsSink,
+    LoggingEmailMetricsSink,
+    MemoryEmailMetricsSink,
+    email_stage,
+    get_email_metrics,
+)
+from utils.emails import build_email_html, send_email
+
+MEMORY_SINK = "utils.email_metrics.MemoryEmailMetricsSink"
+
+
+@pytest.fixture
+def metrics(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_METRICS_SINK = MEMORY_SINK
+    mail.outbox = []
+    return get_email_metrics()
+
+
+class TestEmailStage:
+    """Testes para email_stage e a configuração do sink."""
+
+    def test_disabled_by_default(self, settings):
+        """Testa que, sem sink configurado, nenhuma medição é feita."""
+        settings.EMAIL_METRICS_SINK = ""
+
+        assert type(get_email_metrics()) is EmailMetricsSink
+        with email_stage("inline") as timer:
+            assert timer is None
+
+    def test_invalid_sink_falls_back_to_noop(self, settings):
+        """Testa que um caminho inválido não quebra o envio."""
+        settings.EMAIL_METRICS_SINK = "utils.nao_existe.Sink"
+
+        assert not get_email_metrics().enabled
+
+    def test_records_duration_and_outcome(self, metrics):
+        """Testa que a etapa registra duração e resultado (ok/error)."""
+        with email_stage("format", template="welcome"):
+            pass
+        with pytest.raises(ValueError):
+            with email_stage("format", template="welcome"):
+                raise ValueError("falhou")
+
+        outcomes = sorted(dict(tags)["outcome"] for _, tags in metrics.timings)
+        assert outcomes == ["error", "ok"]
+        assert len(metrics.stage_timings("format")) == 2
+
+    def test_logging_sink_emits_structured_record(self, caplog):
+        """Testa que o sink de log grava a métrica com os campos estruturados."""
+        sink = LoggingEmailMetricsSink()
+
+        with caplog.at_level(logging.INFO, logger="utils.email.metrics"):
+            sink.timing("email.stage.duration", 0.25, {"stage": "inline"})
+
+        record = caplog.records[0]
+        assert record.metric == "email.stage.duration"
+        assert record.value == 0.25
+        assert record.tags == {"stage": "inline"}
+        assert "stage=inline" in record.getMessage()
+
+
+@pytest.mark.django_db
+class TestSendEmailInstrumentation:
+    """Testes para as métricas emitidas por send_email."""
+
+    def test_all_stages_are_measured(self, metrics):
+        """Testa que cada etapa do envio gera uma medição."""
+        html = build_email_html("Título", "<h1>Header</h1>", "<p>Body</p>")
+
+        assert send_email(
+            subject="Assunto",
+            text_content="Texto",
+            recipient_list=["user@example.com"],
+            html_content=html,
+        )
+
+        for stage in ("template_load", "format", "inline", "mime_build", "smtp_send"):
+            assert metrics.stage_timings(stage), stage
+        assert metrics.count(MESSAGES_METRIC, outcome="sent") == 1
+
+    def test_duplicate_outcome(self, metrics):
+        """Testa que envios suprimidos pela idempotência são contados."""
+        for _ in range(2):
+            send_email(
+                subject="Assunto",
+                text_content="Texto",
+                recipient_list=["user@example.com"],
+                idempotency_key="metrics:1",
+            )
+
+        assert metrics.count(MESSAGES_METRIC, outcome="sent") == 1
+        assert metrics.count(MESSAGES_METRIC, outcome="duplicate") == 1
+
+    def test_memory_sink_is_isolated(self):
+        """Testa que instâncias do sink em memória não compartilham estado."""
+        first, second = MemoryEmailMetricsSink(), MemoryEmailMetricsSink()
+        first.increment(MESSAGES_METRIC, tags={"outcome": "sent"})
+
+        assert second.count(MESSAGES_METRIC, outcome="sent") == 0
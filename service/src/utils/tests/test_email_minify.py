@@ -0,0 +1,137 @@
+"""
+Testes para a minificação do HTML dos emails e o limite de tamanho.
+"""
+
+import pytest
+from django.core import mail
+
+from utils.email_metrics import get_email_metrics
+from utils.email_minify import (
+    EmailHtmlTooLarge,
+    check_email_html_budget,
+    minify_email_html,
+)
+from utils.emails import build_email_html, build_email_message, send_email
+
+
+@pytest.fixture(autouse=True)
+def _minify_settings(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_HTML_MINIFY = True
+    settings.EMAIL_HTML_BYTE_BUDGET = 102400
+    settings.EMAIL_HTML_BUDGET_STRICT = False
+    mail.outbox = []
+
+
+def _html(msg):
+    return msg.alternatives[0][0]
+
+
+class TestMinifyEmailHtml:
+    """Testes para minify_email_html."""
+
+    def test_collapses_whitespace_between_blocks(self):
+        """Testa que a indentação entre elementos de bloco é removida."""
+        html = "<table>\n    <tr>\n        <td>\n            Olá   mundo\n        </td>\n    </tr>\n</table>"
+
+        assert minify_email_html(html) == "<table><tr><td>Olá mundo</td></tr></table>"
+
+    def test_keeps_space_between_inline_elements(self):
+        """Testa que o espaço entre elementos inline é preservado."""
+        html = "<p>Olá\n    <strong>Ana</strong>\n    <em>Silva</em></p>"
+
+        assert (
+            minify_email_html(html) == "<p>Olá <strong>Ana</strong> <em>Silva</em></p>"
+        )
+
+    def test_keeps_space_around_images(self):
+        """Testa que <img> é inline: o espaço ao redor aparece na renderização."""
+        html = '<p>Clique <img src="icone.png" alt=""> aqui</p>'
+
+        assert minify_email_html(html) == html
+
+    def test_preserves_pre_and_conditional_comments(self):
+        """Testa que <pre> e comentários condicionais não são alterados."""
+        pre = "<pre>linha 1\n    linha 2</pre>"
+        conditional = "<!--[if mso]>\n<table><tr><td><![endif]-->"
+        html = f"<div>\n  <!-- Header -->\n  {pre}\n  {conditional}\n</div>"
+
+        assert minify_email_html(html) == f"<div>{pre}{conditional}</div>"
+
+    def test_dedupes_style_declarations(self):
+        """Testa que só a declaração que vale de cada propriedade é mantida."""
+        html = '<p style="margin: 0; color: red; font-size: 14px; color: #333;">x</p>'
+
+        assert minify_email_html(html) == (
+            '<p style="margin:0;font-size:14px;color:#333">x</p>'
+        )
+
+    def test_important_declaration_wins(self):
+        """Testa que uma declaração !important não é sobrescrita por uma comum."""
+        html = '<p style="color: red !important; color: blue">x</p>'
+
+        assert minify_email_html(html) == '<p style="color:red !important">x</p>'
+
+    def test_style_with_url_is_kept(self):
+        """Testa que estilos com url(...) ou aspas não são reescritos."""
+        html = "<td style=\" background: url('a;b.png'); color: red \">x</td>"
+
+        assert minify_email_html(html) == (
+            "<td style=\"background: url('a;b.png'); color: red\">x</td>"
+        )
+
+    def test_style_text_outside_tags_is_kept(self):
+        """Testa que um texto "style=..." no conteúdo não é reescrito."""
+        html = '<p style="color: red; color: blue">Use style="a;a" no atributo</p>'
+
+        assert minify_email_html(html) == (
+            '<p style="color:blue">Use style="a;a" no atributo</p>'
+        )
+
+    def test_rendered_email_is_smaller_and_stable(self):
+        """Testa o resultado com um email real: menor e idempotente."""
+        html = build_email_html("Título", "<h1>Header</h1>", "<p>Corpo</p>")
+        msg = build_email_message("Assunto", "Texto", ["a@example.com"], html)
+
+        minified = _html(msg)
+        assert "\n" not in minified
+        assert minify_email_html(minified) == minified
+
+
+class TestEmailHtmlBudget:
+    """Testes para o limite de tamanho do HTML."""
+
+    def test_warns_and_counts_over_budget(self, settings, capsys):
+        """Testa que, acima do limite, o envio segue com aviso e métrica."""
+        settings.EMAIL_HTML_BYTE_BUDGET = 10
+        settings.EMAIL_METRICS_SINK = "utils.email_metrics.MemoryEmailMetricsSink"
+
+        assert check_email_html_budget("<p>ç</p>" * 2) == 18
+
+        assert "excede o limite de 10 bytes" in capsys.readouterr().out
+        assert get_email_metrics().count("email.html.over_budget") == 1
+
+    def test_zero_disables_budget(self, settings):
+        """Testa que EMAIL_HTML_BYTE_BUDGET=0 desativa a verificação."""
+        settings.EMAIL_HTML_BYTE_BUDGET = 0
+        settings.EMAIL_HTML_BUDGET_STRICT = True
+
+        check_email_html_budget("x" * 200000)
+
+    def test_strict_budget_rejects_email(self, settings):
+        """Testa que, no modo estrito, o email acima do limite não é montado."""
+        settings.EMAIL_HTML_BYTE_BUDGET = 100
+        settings.EMAIL_HTML_BUDGET_STRICT = True
+
+        with pytest.raises(EmailHtmlTooLarge):
+            check_email_html_budget("x" * 101)
+
+    @pytest.mark.django_db
+    def test_send_email_respects_strict_budget(self, settings):
+        """Testa que send_email recusa o HTML acima do limite no modo estrito."""
+        settings.EMAIL_HTML_BYTE_BUDGET = 100
+        settings.EMAIL_HTML_BUDGET_STRICT = True
+        html = build_email_html("Título", "<h1>Header</h1>", "<p>Corpo</p>")
+
+        assert not send_email("Assunto", "Texto", ["a@example.com"], html)
+        assert mail.outbox == []
@@ -0,0 +1,121 @@
+"""
+Testes para a outbox de envio assíncrono de emails.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from utils.constants import EmailStatus
+from utils.email_outbox import claim_outbox_batch, drain_outbox, enqueue_email
+from utils.emails import send_email, send_welcome_email
+from utils.models import EmailOutbox
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    """Testes para o modo assíncrono de send_email."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    def test_send_email_async_enqueues_without_sending(self):
+        """Testa que o modo assíncrono apenas grava na outbox."""
+        result = send_email(
+            subject="Test Subject",
+            text_content="Test content",
+            recipient_list=["test@example.com"],
+            html_content="<h1>Test HTML</h1>",
+            async_send=True,
+        )
+
+        assert result is True
+        assert len(mail.outbox) == 0
+        entry = EmailOutbox.objects.get()
+        assert entry.status == EmailStatus.PENDING
+        assert entry.recipient_list == ["test@example.com"]
+        assert "Message-ID" in entry.headers
+
+    def test_drain_outbox_sends_pending_emails(self):
+        """Testa que o worker envia e marca os emails como enviados."""
+        entry = enqueue_email(
+            subject="Test Subject",
+            text_content="Test content",
+            recipient_list=["test@example.com"],
+            html_content="<h1>Test HTML</h1>",
+            headers={"X-Custom-Header": "Custom Value"},
+        )
+
+        sent, failed = drain_outbox()
+
+        assert (sent, failed) == (1, 0)
+        assert len(mail.outbox) == 1
+        email = mail.outbox[0]
+        assert email.extra_headers["Message-ID"] == entry.headers["Message-ID"]
+        assert email.extra_headers["X-Custom-Header"] == "Custom Value"
+        entry.refresh_from_db()
+        assert entry.status == EmailStatus.SENT
+        assert entry.attempts == 1
+        assert entry.sent_at is not None
+
+    def test_claim_skips_locked_and_recovers_stale_entries(self):
+        """Testa que registros reservados só são recuperados após o timeout."""
+        entry = enqueue_email("Test", "Test", ["test@example.com"])
+        assert [e.pk for e in claim_outbox_batch()] == [entry.pk]
+        assert claim_outbox_batch() == []
+
+        EmailOutbox.objects.filter(pk=entry.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        assert [e.pk for e in claim_outbox_batch()] == [entry.pk]
+
+    @override_settings(
+        EMAIL_BACKEND="utils.tests.test_email_outbox.FailingEmailBackend"
+    )
+    def test_failed_delivery_is_recorded(self):
+        """Testa que falhas de envio ficam registradas na outbox para nova tentativa."""
+        entry = enqueue_email("Test", "Test", ["test@example.com"])
+
+        sent, failed = drain_outbox()
+
+        assert (sent, failed) == (0, 1)
+        entry.refresh_from_db()
+        assert entry.status == EmailStatus.PENDING
+        assert entry.next_attempt_at > timezone.now()
+        assert "SMTP indisponível" in entry.last_error
+
+    @override_settings(EMAIL_ASYNC_ENABLED=True)
+    def test_helpers_use_outbox_when_enabled(self):
+        """Testa que os helpers usam a outbox sem mudar a assinatura."""
+        User = get_user_model()
+        user = User.objects.create_user(
+            username="testuser",
+            first_name="Test",
+            last_name="User",
+            email="test@example.com",
+            password="TestPass123!",
+        )
+
+        assert send_welcome_email(user) is True
+        assert len(mail.outbox) == 0
+        assert EmailOutbox.objects.filter(status=EmailStatus.PENDING).count() == 1
+
+        call_command("email_worker", "--once", "--concurrency=1")
+
+        assert len(mail.outbox) == 1
+        assert "Bem-vindo" in mail.outbox[0].subject
+        assert EmailOutbox.objects.get().status == EmailStatus.SENT
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Backend de email que sempre falha, usado nos testes."""
+
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP indisponível")
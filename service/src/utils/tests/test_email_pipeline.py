@@ -0,0 +1,80 @@
+"""
+Testes para o pipeline de campanhas com renderização em processos.
+"""
+
+import email
+
+from django.core import mail
+
+from utils.email_pipeline import RawEmailMessage, render_email_job, send_campaign
+from utils.email_pool import close_email_pools
+from utils.smtp_sink import SMTPSink
+from utils.tests.test_email_pool import _smtp_settings
+
+
+def _jobs(count):
+    for i in range(count):
+        yield {
+            "subject": f"Campanha {i}",
+            "text_content": f"Olá usuário {i}",
+            "recipient_list": [f"user{i}@example.com"],
+            "bcc": ["auditoria@example.com"],
+            "html": {
+                "title": f"Campanha {i}",
+                "header_content": '<h1 class="brand">ArmoredDjango</h1>',
+                "body_content": f'<p class="message">Conteúdo {i}</p>',
+            },
+        }
+
+
+class TestEmailPipeline:
+    """Testes para send_campaign."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    def test_render_email_job_returns_mime_bytes(self):
+        """Testa que a renderização gera bytes MIME completos, com CRLF."""
+        from_email, recipients, raw = render_email_job(next(_jobs(1)))
+
+        assert recipients == ["user0@example.com", "auditoria@example.com"]
+        assert b"\r\n" in raw
+        message = email.message_from_bytes(raw)
+        assert message["Subject"] == "Campanha 0"
+        assert "Bcc" not in message
+        html_part = [p for p in message.walk() if p.get_content_type() == "text/html"]
+        assert "Conteúdo 0" in html_part[0].get_payload(decode=True).decode()
+
+    def test_send_campaign_sends_all_jobs_in_order(self):
+        """Testa que todos os emails são renderizados e enviados, na ordem."""
+        summary = send_campaign(_jobs(7), workers=2, queue_size=2, batch_size=3)
+
+        assert (summary["sent"], summary["failed"]) == (7, 0)
+        assert [m.to[0] for m in mail.outbox] == [
+            f"user{i}@example.com" for i in range(7)
+        ]
+        assert all(isinstance(m, RawEmailMessage) for m in mail.outbox)
+
+    def test_render_error_is_counted_as_failure(self):
+        """Testa que um email com erro de renderização não interrompe a campanha."""
+        jobs = list(_jobs(3))
+        jobs[1]["html"]["campo_inexistente"] = "x"
+
+        summary = send_campaign(jobs, workers=2)
+
+        assert (summary["sent"], summary["failed"]) == (2, 1)
+        assert len(mail.outbox) == 2
+
+    def test_raw_bytes_reach_smtp_server(self):
+        """Testa que os bytes renderizados chegam intactos ao servidor SMTP."""
+        with SMTPSink() as sink:
+            with _smtp_settings(sink, EMAIL_POOL_ENABLED=True):
+                summary = send_campaign(_jobs(4), workers=2, batch_size=10)
+                close_email_pools()
+
+        assert summary["sent"] == 4
+        assert sink.sessions == 1
+        mail_from, rcpt_tos, data = sink.messages[0]
+        assert rcpt_tos == ["<user0@example.com>", "<auditoria@example.com>"]
+        assert email.message_from_bytes(data)["Subject"] == "Campanha 0"
@@ -0,0 +1,108 @@
+"""
+Testes para o pool de conexões SMTP.
+"""
+
+import socket
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import override_settings
+
+from utils.email_pool import SMTPConnectionPool, close_email_pools, get_email_pool
+from utils.emails import send_email
+from utils.smtp_sink import SMTPSink
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink() as sink:
+        yield sink
+    close_email_pools()
+
+
+def _smtp_settings(sink, **kwargs):
+    return override_settings(
+        EMAIL_BACKEND=SMTP_BACKEND,
+        EMAIL_HOST=sink.host,
+        EMAIL_PORT=sink.port,
+        EMAIL_USE_TLS=False,
+        EMAIL_USE_SSL=False,
+        EMAIL_HOST_USER="",
+        EMAIL_HOST_PASSWORD="",
+        **kwargs,
+    )
+
+
+class TestSMTPConnectionPool:
+    """Testes para o reaproveitamento de conexões SMTP."""
+
+    def test_send_email_reuses_one_session(self, sink):
+        """Testa que vários envios usam uma única sessão SMTP."""
+        with _smtp_settings(sink, EMAIL_POOL_ENABLED=True):
+            for i in range(5):
+                assert send_email(f"Test {i}", "Test", ["test@example.com"]) is True
+
+        assert sink.received == 5
+        assert sink.sessions == 1
+
+    def test_send_email_without_pool_opens_one_session_per_email(self, sink):
+        """Testa o comportamento sem pool, para comparação."""
+        with _smtp_settings(sink, EMAIL_POOL_ENABLED=False):
+            for i in range(5):
+                assert send_email(f"Test {i}", "Test", ["test@example.com"]) is True
+
+        assert sink.received == 5
+        assert sink.sessions == 5
+
+    def test_idle_connection_expires(self, sink):
+        """Testa que conexões ociosas além do timeout são descartadas."""
+        with _smtp_settings(sink):
+            pool = SMTPConnectionPool(SMTP_BACKEND, max_size=1, idle_timeout=0)
+            message = EmailMessage("Test", "Test", to=["test@example.com"])
+
+            pool.send_messages([message])
+            pool.send_messages([message])
+
+        assert pool.created == 2
+        assert pool.discarded == 1
+        assert sink.sessions == 2
+
+    def test_dead_connection_reconnects(self, sink):
+        """Testa que uma conexão derrubada pelo servidor é recriada."""
+        with _smtp_settings(sink):
+            pool = SMTPConnectionPool(SMTP_BACKEND, max_size=1)
+            message = EmailMessage("Test", "Test", to=["test@example.com"])
+
+            pool.send_messages([message])
+            conn = pool.acquire()
+            conn.connection.sock.shutdown(socket.SHUT_RDWR)
+            pool.release(conn)
+            pool.send_messages([message])
+
+        assert sink.received == 2
+        assert pool.created == 2
+
+    def test_pool_respects_max_size(self):
+        """Testa que o pool não empresta mais conexões que o máximo."""
+        pool = SMTPConnectionPool(
+            "django.core.mail.backends.locmem.EmailBackend", max_size=1
+        )
+        conn = pool.acquire()
+
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+        pool.release(conn)
+        assert pool.acquire(timeout=0.01) is conn
+
+    def test_pool_is_per_backend(self):
+        """Testa que o pool acompanha o EMAIL_BACKEND configurado."""
+        mail.outbox = []
+        pool = get_email_pool()
+
+        assert pool.backend == "django.core.mail.backends.locmem.EmailBackend"
+        assert pool.send_messages([EmailMessage("Test", "Test", to=["a@b.com"])]) == 1
+        assert len(mail.outbox) == 1
@@ -0,0 +1,145 @@
+"""
+Testes para a pré-visualização de emails e o endpoint /api/email-previews.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from utils.email_inline import get_inline_css_cache
+from utils.email_previews import render_email_preview
+from utils.emails import send_welcome_email
+
+URL = "/api/email-previews"
+
+
+@pytest.fixture(autouse=True)
+def _preview_settings(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_ASYNC_ENABLED = False
+    cache.clear()
+    mail.outbox = []
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="joao",
+        email="joao@example.com",
+        password="SenhaForte123!",
+        first_name="João",
+        last_name="Pereira",
+    )
+
+
+@pytest.fixture
+def staff_client(db):
+    staff = get_user_model().objects.create_user(
+        username="suporte",
+        email="suporte@example.com",
+        password="SenhaForte123!",
+        is_staff=True,
+    )
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+class TestRenderEmailPreview:
+    """Testes para render_email_preview."""
+
+    def test_sample_data_and_cache(self):
+        """Testa a renderização com dados de exemplo e a segunda chamada pelo cache."""
+        first = render_email_preview("notification")
+        second = render_email_preview("notification")
+
+        assert not first["cached"]
+        assert second["cached"]
+        assert "Maria Silva" in first["html"]
+        assert 'style="' in first["html"]
+        assert second["html"] == first["html"]
+
+    def test_params_change_cache_key(self):
+        """Testa que parâmetros diferentes geram pré-visualizações diferentes."""
+        render_email_preview("notification")
+        preview = render_email_preview("notification", params={"title": "Fatura"})
+
+        assert not preview["cached"]
+        assert preview["subject"] == "Fatura - ArmoredDjango"
+
+    def test_unknown_params_are_rejected(self):
+        """Testa que parâmetros que o tipo não aceita geram ValueError."""
+        with pytest.raises(ValueError):
+            render_email_preview("welcome", params={"reset_url": "x"})
+
+    def test_digest_preview(self):
+        """Testa o digest com a quantidade de notificações informada."""
+        preview = render_email_preview("digest", params={"count": "4"})
+
+        assert preview["subject"].startswith("Você tem 4 novas notificações")
+
+    @pytest.mark.django_db
+    def test_preview_warms_inline_cache_for_send(self, user):
+        """Testa que o envio após a pré-visualização reaproveita o CSS inline."""
+        get_inline_css_cache().clear()
+        render_email_preview("welcome", user=user)
+        misses = get_inline_css_cache().misses
+
+        assert send_welcome_email(user)
+        assert get_inline_css_cache().misses == misses
+        assert (
+            mail.outbox[0].alternatives[0][0]
+            == render_email_preview("welcome", user=user)["html"]
+        )
+
+
+class TestEmailPreviewEndpoint:
+    """Testes para o endpoint de pré-visualização."""
+
+    @pytest.mark.django_db
+    def test_requires_staff(self, user):
+        """Testa que só usuários staff acessam o endpoint."""
+        client = APIClient()
+        assert client.get(URL).status_code == 401
+
+        client.force_authenticate(user)
+        assert client.get(URL).status_code == 403
+
+    def test_lists_registered_types(self, staff_client):
+        """Testa a listagem dos tipos registrados."""
+        response = staff_client.get(URL)
+
+        assert response.status_code == 200
+        types = {item["type"] for item in response.json()}
+        assert {"welcome", "password_reset", "notification", "digest"} <= types
+
+    def test_preview_with_real_user(self, staff_client, user):
+        """Testa a pré-visualização com os dados de um usuário real."""
+        response = staff_client.get(
+            f"{URL}/password_reset",
+            {"user_id": user.pk, "reset_url": "https://example.com/r/abc"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "João Pereira" in data["html"]
+        assert "https://example.com/r/abc" in data["text"]
+
+    def test_html_output(self, staff_client):
+        """Testa o retorno do HTML puro, para exibir em iframe."""
+        staff_client.get(f"{URL}/welcome", {"output": "html"})
+        response = staff_client.get(f"{URL}/welcome", {"output": "html"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/html")
+        assert response["X-Frame-Options"] == "SAMEORIGIN"
+        assert response["X-Email-Preview-Cache"] == "hit"
+
+    def test_errors(self, staff_client):
+        """Testa tipo inexistente, parâmetro inválido e usuário inexistente."""
+        assert staff_client.get(f"{URL}/nao_existe").status_code == 404
+        assert staff_client.get(f"{URL}/welcome", {"foo": "1"}).status_code == 400
+        assert staff_client.get(f"{URL}/welcome", {"user_id": "x"}).status_code == 400
+        assert staff_client.get(f"{URL}/welcome", {"user_id": 999}).status_code == 404
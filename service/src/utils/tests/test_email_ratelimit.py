@@ -0,0 +1,158 @@
+"""
+Testes para o limitador de taxa de envio de emails.
+"""
+
+import asyncio
+import multiprocessing
+import smtplib
+import threading
+import time
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+
+from utils.email_pool import close_email_pools
+from utils.email_ratelimit import EmailRateLimiter
+from utils.emails import send_email
+from utils.smtp_sink import SMTPSink
+from utils.tests.test_email_pool import _smtp_settings
+
+
+def _consume(state_dir, count):
+    limiter = EmailRateLimiter(rate=50, burst=1, state_dir=state_dir)
+    for _ in range(count):
+        limiter.acquire()
+
+
+class TestEmailRateLimiter:
+    """Testes para o token bucket e as vagas de conexão."""
+
+    def test_burst_is_immediate_and_then_throttled(self, tmp_path):
+        """Testa que a rajada sai na hora e o restante respeita a taxa."""
+        limiter = EmailRateLimiter(rate=20, burst=5, state_dir=str(tmp_path))
+
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        assert time.monotonic() - started < 0.1
+        assert limiter.throttled == 0
+
+        for _ in range(5):
+            limiter.acquire()
+        assert time.monotonic() - started >= 0.2
+        assert limiter.throttled >= 1
+
+    def test_bucket_is_shared_between_processes(self, tmp_path):
+        """Testa que processos diferentes dividem o mesmo limite."""
+        started = time.monotonic()
+        processes = [
+            multiprocessing.Process(target=_consume, args=(str(tmp_path), 10))
+            for _ in range(2)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        # 20 mensagens a 50/s com rajada 1: pelo menos ~0,38s no total
+        assert time.monotonic() - started >= 0.35
+        assert all(process.exitcode == 0 for process in processes)
+
+    def test_connection_slots_block_until_released(self, tmp_path):
+        """Testa que a vaga de conexão bloqueia até ser liberada."""
+        limiter = EmailRateLimiter(rate=0, max_connections=1, state_dir=str(tmp_path))
+        slot = limiter.acquire_connection()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.release_connection(limiter.acquire_connection())
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.2)
+
+        limiter.release_connection(slot)
+        assert acquired.wait(2)
+        thread.join()
+
+    def test_async_acquire_does_not_block_loop(self, tmp_path):
+        """Testa que a espera assíncrona libera o event loop."""
+        limiter = EmailRateLimiter(rate=20, burst=1, state_dir=str(tmp_path))
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def consume():
+            for _ in range(3):
+                await limiter.aacquire()
+
+        async def main():
+            await asyncio.gather(consume(), ticker())
+
+        started = time.monotonic()
+        asyncio.run(main())
+
+        # 3 mensagens a 20/s com rajada 1: ~0,1s, com o ticker rodando no meio
+        assert time.monotonic() - started >= 0.09
+        assert len(ticks) == 5 and ticks[-1] - started < 0.09
+
+
+class TestRateLimitedSending:
+    """Testes para o limitador aplicado ao envio."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    def test_send_email_waits_instead_of_failing(self, tmp_path):
+        """Testa que envios acima da taxa esperam e não falham."""
+        with SMTPSink() as sink:
+            with _smtp_settings(
+                sink,
+                EMAIL_POOL_ENABLED=True,
+                EMAIL_RATE_LIMIT=20,
+                EMAIL_RATE_BURST=2,
+                EMAIL_MAX_CONNECTIONS=1,
+                EMAIL_RATE_LIMIT_DIR=str(tmp_path),
+            ):
+                started = time.monotonic()
+                results = [
+                    send_email(f"Test {i}", "Test", ["test@example.com"])
+                    for i in range(6)
+                ]
+                elapsed = time.monotonic() - started
+                close_email_pools()
+
+        assert all(results)
+        assert sink.received == 6
+        assert elapsed >= 0.2
+
+    @override_settings(
+        EMAIL_BACKEND="utils.tests.test_email_ratelimit.ThrottledOnceEmailBackend",
+        EMAIL_POOL_ENABLED=True,
+    )
+    def test_service_unavailable_reconnects_and_retries(self):
+        """Testa que uma resposta 421 do servidor gera nova conexão e nova tentativa."""
+        ThrottledOnceEmailBackend.rejected = 0
+
+        assert send_email("Test", "Test", ["test@example.com"]) is True
+        assert ThrottledOnceEmailBackend.rejected == 1
+        assert len(mail.outbox) == 1
+        close_email_pools()
+
+
+class ThrottledOnceEmailBackend(EmailBackend):
+    """Backend de email que responde 421 na primeira mensagem, usado nos testes."""
+
+    rejected = 0
+
+    def send_messages(self, messages):
+        if ThrottledOnceEmailBackend.rejected == 0:
+            ThrottledOnceEmailBackend.rejected += 1
+            raise smtplib.SMTPResponseException(421, b"Too many messages")
+        return super().send_messages(messages)
@@ -0,0 +1,250 @@
+"""
+Testes para as novas tentativas e a dead-letter de emails.
+"""
+
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from utils.constants import EmailStatus
+from utils.email_outbox import drain_outbox, enqueue_email
+from utils.email_retry import is_transient_email_error, retry_delay, send_with_retry
+from utils.emails import send_email
+from utils.models import EmailDeadLetter, EmailOutbox
+
+FAILING_BACKEND = "utils.tests.test_email_outbox.FailingEmailBackend"
+REJECTING_BACKEND = "utils.tests.test_email_retry.RejectingEmailBackend"
+FLAKY_BACKEND = "utils.tests.test_email_retry.FlakyEmailBackend"
+
+
+class TestRetryPolicy:
+    """Testes para a classificação de erros e o backoff."""
+
+    def test_transient_errors(self):
+        """Testa quais erros geram nova tentativa."""
+        assert is_transient_email_error(ConnectionResetError())
+        assert is_transient_email_error(TimeoutError())
+        assert is_transient_email_error(smtplib.SMTPServerDisconnected())
+        assert is_transient_email_error(
+            smtplib.SMTPResponseException(451, b"Try later")
+        )
+        assert is_transient_email_error(
+            smtplib.SMTPRecipientsRefused({"a@example.com": (450, b"Busy")})
+        )
+
+    def test_permanent_errors(self):
+        """Testa quais erros vão direto para a dead-letter."""
+        assert not is_transient_email_error(ValueError("template inválido"))
+        assert not is_transient_email_error(
+            smtplib.SMTPResponseException(550, b"No such user")
+        )
+        assert not is_transient_email_error(
+            smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"No such user")})
+        )
+        assert not is_transient_email_error(smtplib.SMTPNotSupportedError())
+
+    @override_settings(EMAIL_RETRY_BASE_DELAY=10, EMAIL_RETRY_MAX_DELAY=60)
+    def test_retry_delay_grows_with_jitter_and_cap(self):
+        """Testa o backoff exponencial com jitter e limite máximo."""
+        for attempts, full in ((1, 10), (2, 20), (3, 40), (8, 60)):
+            delays = {retry_delay(attempts) for _ in range(20)}
+            assert all(full / 2 <= delay <= full for delay in delays)
+            assert len(delays) > 1
+
+
+@pytest.mark.django_db
+class TestEmailRetry:
+    """Testes para novas tentativas e dead-letter."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+        FlakyEmailBackend.failures = 0
+
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND, EMAIL_RETRY_MAX_ATTEMPTS=2)
+    def test_outbox_retries_then_dead_letters(self):
+        """Testa que o email é reenviado após o backoff e depois vai para a dead-letter."""
+        entry = enqueue_email("Test", "Test", ["test@example.com"], "<p>HTML</p>")
+
+        drain_outbox()
+        entry.refresh_from_db()
+        assert (entry.status, entry.attempts) == (EmailStatus.PENDING, 1)
+        assert drain_outbox() == (0, 0)  # ainda aguardando o backoff
+
+        EmailOutbox.objects.filter(pk=entry.pk).update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert drain_outbox() == (0, 1)
+
+        entry.refresh_from_db()
+        assert (entry.status, entry.attempts) == (EmailStatus.FAILED, 2)
+        letter = EmailDeadLetter.objects.get()
+        assert letter.outbox_id == entry.pk
+        assert letter.attempts == 2
+        assert letter.recipients == ["test@example.com"]
+        assert entry.headers["Message-ID"].encode() in bytes(letter.payload)
+
+    @override_settings(EMAIL_BACKEND=REJECTING_BACKEND)
+    def test_permanent_failure_goes_straight_to_dead_letter(self):
+        """Testa que falhas definitivas não geram novas tentativas."""
+        entry = enqueue_email("Test", "Test", ["test@example.com"])
+
+        drain_outbox()
+
+        entry.refresh_from_db()
+        assert (entry.status, entry.attempts) == (EmailStatus.FAILED, 1)
+        assert "No such user" in EmailDeadLetter.objects.get().error
+
+    @override_settings(EMAIL_BACKEND=FAILING_BACKEND, EMAIL_ASYNC_ENABLED=True)
+    def test_send_email_schedules_retry_off_request_thread(self):
+        """Testa que uma falha transitória no envio síncrono vai para a outbox."""
+        assert (
+            send_email(
+                "Test", "Texto", ["test@example.com"], "<p>HTML</p>", async_send=False
+            )
+            is True
+        )
+
+        entry = EmailOutbox.objects.get()
+        assert entry.status == EmailStatus.PENDING
+        assert entry.attempts == 1
+        assert entry.inline_css is False
+        assert entry.next_attempt_at > timezone.now()
+        assert "Message-ID" in entry.headers
+
+    @override_settings(
+        EMAIL_BACKEND=FLAKY_BACKEND,
+        EMAIL_ASYNC_ENABLED=False,
+        EMAIL_RETRY_INLINE_MAX_DELAY=0,
+    )
+    def test_send_email_without_worker_retries_inline(self):
+        """Testa que, sem o email_worker, a falha transitória é tentada de novo na hora."""
+        FlakyEmailBackend.failures = 1
+
+        assert send_email("Test", "Texto", ["test@example.com"]) is True
+
+        assert len(mail.outbox) == 1
+        assert EmailOutbox.objects.count() == 0
+        assert EmailDeadLetter.objects.count() == 0
+
+    @override_settings(
+        EMAIL_BACKEND=FAILING_BACKEND,
+        EMAIL_ASYNC_ENABLED=False,
+        EMAIL_RETRY_INLINE_ATTEMPTS=3,
+        EMAIL_RETRY_INLINE_MAX_DELAY=0,
+    )
+    def test_send_email_without_worker_dead_letters_after_retries(self):
+        """Testa que, esgotadas as tentativas na hora, o email vai para a dead-letter."""
+        assert send_email("Test", "Texto", ["test@example.com"]) is False
+
+        assert EmailOutbox.objects.count() == 0
+        letter = EmailDeadLetter.objects.get()
+        assert letter.outbox is None
+        assert letter.attempts == 3
+
+    @override_settings(
+        EMAIL_BACKEND=FLAKY_BACKEND,
+        EMAIL_ASYNC_ENABLED=True,
+        EMAIL_RETRY_INLINE_MAX_DELAY=0,
+    )
+    def test_send_email_with_attachment_retries_inline(self):
+        """Testa que emails com anexos, que não passam pela outbox, são tentados de novo na hora."""
+        FlakyEmailBackend.failures = 1
+
+        assert (
+            send_email(
+                "Test",
+                "Texto",
+                ["test@example.com"],
+                async_send=False,
+                attachments=[("a.txt", "conteúdo", "text/plain")],
+            )
+            is True
+        )
+
+        assert len(mail.outbox) == 1
+        assert EmailOutbox.objects.count() == 0
+
+    @override_settings(
+        EMAIL_BACKEND=FLAKY_BACKEND,
+        EMAIL_RETRY_INLINE_ATTEMPTS=2,
+        EMAIL_RETRY_INLINE_MAX_DELAY=0,
+    )
+    def test_send_with_retry_resends_only_failed_messages(self):
+        """Testa que só as mensagens que falharam são reenviadas, e as que esgotaram vão para a dead-letter."""
+        # 1ª tentativa: todas falham; 2ª: só a primeira falha de novo
+        FlakyEmailBackend.failures = 5
+        messages = [
+            EmailMessage(f"Test {i}", "Texto", to=[f"user{i}@example.com"])
+            for i in range(4)
+        ]
+
+        assert send_with_retry(messages) == 3
+
+        assert [message.subject for message in mail.outbox] == [
+            "Test 1",
+            "Test 2",
+            "Test 3",
+        ]
+        letter = EmailDeadLetter.objects.get()
+        assert (letter.subject, letter.attempts) == ("Test 0", 2)
+
+    @override_settings(EMAIL_BACKEND=REJECTING_BACKEND)
+    def test_send_email_permanent_failure_returns_false(self):
+        """Testa que uma falha definitiva no envio síncrono vai para a dead-letter."""
+        assert send_email("Test", "Texto", ["test@example.com"]) is False
+
+        assert EmailOutbox.objects.count() == 0
+        assert EmailDeadLetter.objects.get().outbox is None
+
+    def test_replay_sends_stored_payload_without_rendering(self):
+        """Testa o reenvio em lote a partir do payload gravado."""
+        with override_settings(EMAIL_BACKEND=REJECTING_BACKEND):
+            for i in range(3):
+                send_email(
+                    f"Test {i}", "Texto", [f"user{i}@example.com"], "<p>HTML</p>"
+                )
+        EmailDeadLetter.objects.create(
+            subject="Sem payload",
+            from_email="a@example.com",
+            recipients=["b@example.com"],
+        )
+
+        call_command("replay_dead_letters", "--batch-size=2")
+
+        assert len(mail.outbox) == 3
+        assert mail.outbox[0].raw.startswith(b"Content-Type: multipart/alternative")
+        assert b"Subject: Test 0" in mail.outbox[0].raw
+        assert EmailDeadLetter.objects.filter(replayed_at__isnull=False).count() == 3
+
+        # Registros já reenviados não são enviados de novo
+        call_command("replay_dead_letters")
+        assert len(mail.outbox) == 3
+
+
+class RejectingEmailBackend(EmailBackend):
+    """Backend de email que recusa definitivamente todos os destinatários."""
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPRecipientsRefused(
+            {message.to[0]: (550, b"No such user") for message in messages}
+        )
+
+
+class FlakyEmailBackend(EmailBackend):
+    """Backend de email que falha nas primeiras `failures` mensagens."""
+
+    failures = 0
+
+    def send_messages(self, messages):
+        if FlakyEmailBackend.failures > 0:
+            FlakyEmailBackend.failures -= 1
+            raise smtplib.SMTPResponseException(451, b"Try later")
+        return super().send_messages(messages)
@@ -0,0 +1,205 @@
+"""
+Testes para os templates Jinja2 de email.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import override_settings
+
+from utils.email_inline import get_inline_css_cache, inline_email_css
+from utils.email_templates import (
+    get_email_environment,
+    get_email_layout,
+    render_email_html,
+    render_email_text,
+)
+from utils.emails import (
+    build_email_html,
+    email_template_cache,
+    email_template_cache_stats,
+    send_notification_email,
+)
+
+NOTIFICATION = {
+    "user_name": "Ana <Admin>",
+    "notification": {
+        "title": "Pedido & Entrega",
+        "message": "Seu pedido <strong>#42</strong> saiu para entrega.",
+        "action_url": "https://example.com/pedidos?id=42&tab=status",
+        "action_label": "Ver Pedido",
+    },
+}
+
+
+class TestEmailEnvironment:
+    """Testes para o ambiente Jinja2 e o layout base."""
+
+    def test_environment_is_created_once(self):
+        """Testa que o ambiente é reaproveitado entre chamadas."""
+        assert get_email_environment() is get_email_environment()
+
+    def test_environment_uses_bytecode_cache(self, settings, tmp_path):
+        """Testa que o bytecode compilado é gravado em EMAIL_TEMPLATE_BYTECODE_DIR."""
+        settings.EMAIL_TEMPLATE_BYTECODE_DIR = str(tmp_path)
+
+        render_email_html("welcome", user_name="Ana")
+
+        assert any(tmp_path.iterdir())
+
+    def test_layout_is_compiled_once(self):
+        """Testa que o layout extraído de base.html é reaproveitado."""
+        assert get_email_layout() is get_email_layout()
+
+    def test_cache_stats_count_layout_and_jinja_templates(self):
+        """Testa que o layout e os templates Jinja2 entram nos contadores do cache."""
+        email_template_cache.clear()
+
+        render_email_html("welcome", user_name="Ana")
+        render_email_html("welcome", user_name="Bia")
+
+        assert email_template_cache_stats() == {"hits": 2, "misses": 2, "size": 2}
+
+    def test_layout_slots(self):
+        """Testa que os blocos de base.html viram os slots de build_email_html."""
+        layout = get_email_layout()
+        slots = [field for _, field in layout.segments if field is not None]
+
+        assert slots == ["title", "header_content", "body_content", "footer_content"]
+        assert layout.plain_slots
+
+
+class TestRenderEmailHtml:
+    """Testes para render_email_html e render_email_text."""
+
+    def test_matches_full_jinja_render(self):
+        """Testa que renderizar por blocos é idêntico a renderizar o template inteiro."""
+        template = get_email_environment().get_template("emails/notification.html")
+
+        assert render_email_html("notification", **NOTIFICATION) == template.render(
+            **NOTIFICATION
+        )
+
+    def test_autoescapes_context(self):
+        """Testa que as variáveis passam por autoescape e a mensagem não."""
+        html = render_email_html("notification", **NOTIFICATION)
+
+        assert "Ana &lt;Admin&gt;" in html
+        assert "<title>Pedido &amp; Entrega</title>" in html
+        assert 'href="https://example.com/pedidos?id=42&amp;tab=status"' in html
+        assert "<strong>#42</strong>" in html
+
+    def test_uses_base_footer_when_not_overridden(self):
+        """Testa que blocos não definidos usam o conteúdo padrão de base.html."""
+        html = render_email_html("welcome", user_name="Ana")
+
+        assert "© ArmoredDjango — Todos os direitos reservados" in html
+
+    def test_build_email_html_uses_same_layout(self):
+        """Testa que build_email_html e os templates produzem o mesmo documento."""
+        values = {
+            "title": "Bem-vindo ao ArmoredDjango",
+            "header_content": "<h1>Header</h1>",
+            "body_content": "<p>Body</p>",
+        }
+        html = build_email_html(**values)
+
+        assert html.template is get_email_layout()
+        assert html.values["footer_content"] == (
+            "© ArmoredDjango — Todos os direitos reservados"
+        )
+
+    def test_fragments_inlining_matches_full(self, settings):
+        """Testa que o CSS inline por fragmentos funciona com os templates Jinja2."""
+        html = render_email_html("notification", **NOTIFICATION)
+
+        settings.EMAIL_INLINE_CSS_MODE = "full"
+        get_inline_css_cache().clear()
+        full = inline_email_css(html)
+
+        settings.EMAIL_INLINE_CSS_MODE = "fragments"
+        get_inline_css_cache().clear()
+        fragments = inline_email_css(html)
+
+        assert fragments == full
+
+    def test_text_template_is_not_escaped(self):
+        """Testa que a versão em texto plano não passa por autoescape."""
+        text = render_email_text("notification", **NOTIFICATION)
+
+        assert text.startswith("Olá Ana <Admin>,")
+        assert (
+            "Para mais detalhes, acesse: https://example.com/pedidos?id=42&tab=status"
+            in text
+        )
+
+    def test_text_template_skips_optional_parts(self):
+        """Testa que partes opcionais vazias não aparecem no texto."""
+        text = render_email_text("welcome", user_name="Ana")
+
+        assert "None" not in text
+        assert "\n\n\n" not in text
+
+
+@pytest.mark.django_db
+class TestSendHelpersUseTemplates:
+    """Testes para os helpers de envio com templates Jinja2."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_notification_escapes_user_name(self):
+        """Testa que o nome do usuário é escapado no HTML do email."""
+        user = get_user_model().objects.create_user(
+            username="maria",
+            first_name="<Maria>",
+            last_name="Silva",
+            email="maria@example.com",
+            password="TestPass123!",
+        )
+
+        assert send_notification_email(user, "Alerta", "Mensagem", digest=False)
+
+        html = mail.outbox[0].alternatives[0][0]
+        assert "&lt;Maria&gt; Silva" in html
+        assert "<Maria>" not in html
+        assert mail.outbox[0].body.startswith("Olá <Maria> Silva,")
+
+
+@pytest.mark.django_db
+class TestEmailExamples:
+    """Testes para os exemplos de `utils.email_examples`, renderizados por templates."""
+
+    def setup_method(self):
+        """Setup executado antes de cada teste."""
+        mail.outbox = []
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_examples_render_templates_with_autoescape(self):
+        """Testa que os exemplos customizados saem dos templates e escapam o contexto."""
+        from utils import email_examples
+
+        user = get_user_model().objects.create_user(
+            username="maria",
+            first_name="<Maria>",
+            last_name="Silva",
+            email="maria@example.com",
+            password="TestPass123!",
+        )
+
+        assert email_examples.exemplo_notificacao_login_novo_dispositivo(
+            user, "Firefox <Linux>", "São Paulo", "203.0.113.7"
+        )
+        assert email_examples.exemplo_email_exclusao_conta(user, 15)
+        assert email_examples.exemplo_notificacao_pagamento_aprovado(user, 10.5, 42)
+
+        alert, deletion, payment = mail.outbox
+        alert_html = alert.alternatives[0][0]
+        assert "Firefox &lt;Linux&gt;" in alert_html
+        assert "&lt;Maria&gt; Silva" in alert_html
+        assert "- Dispositivo: Firefox <Linux>" in alert.body
+        assert "<strong>15 dias</strong>" in deletion.alternatives[0][0]
+        assert "Sua conta será mantida inativa por 15 dias." in deletion.body
+        assert "<strong>R$ 10.50</strong>" in payment.alternatives[0][0]
@@ -2,12 +2,16 @@
 Testes para funções de email.
 """
 
+import os
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.test import override_settings
 
 from utils.emails import (
+    CompiledEmailTemplate,
+    EmailTemplateCache,
     build_email_html,
     load_email_template,
     send_email,
@@ -275,3 +279,45 @@ class TestEmailFunctions:
         assert email.body == "Plain text version"
         assert len(email.alternatives) == 1
         assert "<h1>HTML version</h1>" in email.alternatives[0][0]
+
+
+class TestEmailTemplateCache:
+    """Testes para o cache de templates de email."""
+
+    def test_cache_reads_file_once(self, tmp_path):
+        """Testa que o template só é lido do disco na primeira vez."""
+        template_file = tmp_path / "template.html"
+        template_file.write_text("<p>{body_content}</p>", encoding="utf-8")
+        cache = EmailTemplateCache()
+
+        first = cache.get(template_file)
+        second = cache.get(template_file)
+
+        assert first is second
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_cache_reloads_when_file_changes(self, tmp_path):
+        """Testa que o template é recarregado quando o mtime muda."""
+        template_file = tmp_path / "template.html"
+        template_file.write_text("<p>{body_content}</p>", encoding="utf-8")
+        cache = EmailTemplateCache()
+        cache.get(template_file)
+
+        template_file.write_text("<div>{body_content}</div>", encoding="utf-8")
+        stat = template_file.stat()
+        os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert cache.get(template_file).render(body_content="x") == "<div>x</div>"
+        assert cache.stats()["misses"] == 2
+
+    def test_compiled_template_matches_str_format(self):
+        """Testa que a renderização compilada é idêntica ao str.format."""
+        source = load_email_template()
+        values = {
+            "title": "Título",
+            "header_content": "<h1>{Header}</h1>",
+            "body_content": "<p>Body</p>",
+            "footer_content": "Footer",
+        }
+
+        assert CompiledEmailTemplate(source).render(**values) == source.format(**values)
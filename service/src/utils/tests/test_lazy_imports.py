@@ -0,0 +1,70 @@
+"""
+Testes para o carregamento sob demanda do pacote utils.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import utils
+
+
+def _loaded_modules(code: str) -> dict:
+    """Executa `code` em um interpretador novo e retorna os módulos carregados."""
+    script = (
+        "import json, sys, django\n"
+        "django.setup()\n"
+        f"{code}\n"
+        "print(json.dumps({name: name in sys.modules "
+        "for name in ('utils.emails', 'pynliner', 'cssutils', 'bs4')}))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestLazyUtilsPackage:
+    """Testes para os nomes públicos de utils carregados via __getattr__."""
+
+    def test_setup_does_not_import_email_stack(self):
+        """Testa que django.setup() + import utils não carregam emails nem Pynliner."""
+        loaded = _loaded_modules("import utils")
+
+        assert not any(loaded.values()), loaded
+
+    def test_pynliner_is_imported_on_first_inline(self):
+        """Testa que o Pynliner só é importado ao aplicar o CSS inline."""
+        loaded = _loaded_modules(
+            "import utils\n"
+            "utils.send_email\n"
+            "assert 'pynliner' not in sys.modules\n"
+            "from utils.email_inline import inline_email_css\n"
+            "inline_email_css('<style>p {color: red}</style><p>x</p>')"
+        )
+
+        assert loaded["utils.emails"]
+        assert loaded["pynliner"]
+
+    def test_public_names_resolve(self):
+        """Testa que os nomes públicos continuam acessíveis e em __all__."""
+        from utils import emails, useful_functions
+
+        assert utils.send_email is emails.send_email
+        assert utils.validate_cpf is useful_functions.validate_cpf
+        assert "send_welcome_email" in utils.__all__
+        assert "send_welcome_email" in dir(utils)
+
+    def test_unknown_name_raises_attribute_error(self):
+        """Testa que nomes inexistentes continuam gerando AttributeError."""
+        with pytest.raises(AttributeError):
+            utils.nao_existe